@@ -3,6 +3,7 @@ import os
 from datetime import datetime, timedelta
 from typing import Optional, Dict, List
 import math
+import json
 
 # Try to import TensorFlow, but continue without it
 try:
@@ -34,8 +35,10 @@ class HealthPredictionEngine:
     
     MODEL_PATH = "ml/saved_models/tcn_v1.keras"
     MODEL_PATH_ALT = "models/tcn_model.keras"  # legacy fallback
-    NORM_PARAMS_PATH = "ml/saved_models/norm_params.pkl"
-    NORM_PARAMS_PATH_ALT = "models/norm_params.pkl"
+    NORM_PARAMS_NPZ = "ml/saved_models/norm_params.npz"
+    NORM_PARAMS_META = "ml/saved_models/norm_params.json"
+    NORM_PARAMS_PATH = "ml/saved_models/norm_params.pkl"  # deprecated
+    NORM_PARAMS_PATH_ALT = "models/norm_params.pkl"       # deprecated
     SEQUENCE_LENGTH = 30  # 30 days of history
     
     # The 8 SMART features our model uses (must match training order)
@@ -73,13 +76,10 @@ class HealthPredictionEngine:
                 self.model = keras.models.load_model(model_path)
                 print(f"[HealthEngine] ✅ TCN model loaded from {model_path}")
 
-                # Try to load normalization params
-                for norm_candidate in [self.NORM_PARAMS_PATH, self.NORM_PARAMS_PATH_ALT]:
-                    if PICKLE_AVAILABLE and os.path.exists(norm_candidate):
-                        with open(norm_candidate, 'rb') as f:
-                            self.norm_params = pickle.load(f)
-                        print("[HealthEngine] ✅ Normalization parameters loaded")
-                        break
+                # Try to load normalization params — .npz first, legacy .pkl after
+                self.norm_params = self._load_norm_params()
+                if self.norm_params:
+                    print("[HealthEngine] ✅ Normalization parameters loaded")
                 else:
                     print("[HealthEngine] ⚠️  No norm_params found — using model without normalization")
 
@@ -102,6 +102,22 @@ class HealthPredictionEngine:
             print(f"[HealthEngine] ⚠️  No trained model found at {self.MODEL_PATH}")
             print("[HealthEngine] Using rule-based scoring")
     
+    def _load_norm_params(self) -> Optional[Dict]:
+        """Load scaler mean/std, preferring the pickle-free .npz + JSON sidecar"""
+        if os.path.exists(self.NORM_PARAMS_NPZ):
+            with np.load(self.NORM_PARAMS_NPZ) as arrays:
+                norm_params = {"mean": arrays["mean"], "std": arrays["std"]}
+            if os.path.exists(self.NORM_PARAMS_META):
+                with open(self.NORM_PARAMS_META) as f:
+                    norm_params.update(json.load(f))
+            return norm_params
+
+        for norm_candidate in [self.NORM_PARAMS_PATH, self.NORM_PARAMS_PATH_ALT]:
+            if PICKLE_AVAILABLE and os.path.exists(norm_candidate):
+                with open(norm_candidate, 'rb') as f:
+                    return pickle.load(f)
+        return None
+
     def predict(self, smart_history: List[Dict]) -> Dict:
         """
         Main prediction function.
@@ -114,6 +130,8 @@ class HealthPredictionEngine:
             days to failure, risk level, key factors, and trend
         """
         
+        if not smart_history:
+            return self._no_readings_response()
         if len(smart_history) < 5:
             return self._insufficient_data_response()
         
@@ -431,6 +449,16 @@ class HealthPredictionEngine:
             "note": "Insufficient history for accurate prediction"
         }
 
+    def _no_readings_response(self) -> Dict:
+        # No SMART readings at all (e.g. a drive asleep since it was first
+        # seen, or an unknown drive): not evidence of health, so the risk is
+        # reported as unknown
+        return {
+            **self._insufficient_data_response(),
+            "risk_level": "Unknown",
+            "note": "No SMART readings available"
+        }
+
 
 # Test the engine
 if __name__ == "__main__":
@@ -11,8 +11,10 @@ All endpoints are real — no mocks, no hardcoded responses.
 """
 
 from fastapi import FastAPI, HTTPException, BackgroundTasks, Request
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
+from utils.json_response import ORJSONResponse
 from slowapi import Limiter, _rate_limit_exceeded_handler
 from slowapi.util import get_remote_address
 from slowapi.errors import RateLimitExceeded
@@ -44,6 +46,7 @@ if _sentry_dsn:
     logging.getLogger("sentinel").info("✅ Sentry error monitoring enabled")
 
 from smart_reader import SMARTReader
+from smart_collector import DEFAULT_DEVICE, start_polling, stop_polling
 from health_engine import HealthPredictionEngine
 from compression_engine import CompressionEngine
 from coordinator import IntelligentCoordinator
@@ -121,6 +124,7 @@ app = FastAPI(
     version="2.0.0",
     docs_url="/docs",
     redoc_url="/redoc",
+    default_response_class=ORJSONResponse,
 )
 
 # Attach rate limiter
@@ -236,7 +240,7 @@ async def get_system_status():
         smartctl_available = smartctl_path is not None
 
         # Drive count
-        drives = smart_reader.get_all_drives()
+        drives = await smart_reader.get_all_drives_async()
         real_drives = [d for d in drives if not d.get("is_simulated", True)]
         sim_drives  = [d for d in drives if d.get("is_simulated", True)]
 
@@ -315,7 +319,7 @@ async def get_all_drives():
     """List all detected drives with basic info."""
     try:
         data_source = app_settings.get("data_source", "auto")
-        drives = smart_reader.get_all_drives(forced_mode=data_source)
+        drives = await smart_reader.get_all_drives_async(forced_mode=data_source)
         return {
             "drives":      drives,
             "total_count": len(drives),
@@ -344,7 +348,7 @@ async def get_drive_status(drive_id: str):
         status = coordinator.run_cycle(drive_id)
 
         data_source = app_settings.get("data_source", "auto")
-        drives = smart_reader.get_all_drives(forced_mode=data_source)
+        drives = await smart_reader.get_all_drives_async(forced_mode=data_source)
         drive_info = next((d for d in drives if d["drive_id"] == drive_id), None)
 
         if not drive_info:
@@ -357,6 +361,7 @@ async def get_drive_status(drive_id: str):
                 "serial":      drive_info.get("serial", "Unknown"),
                 "smart":       drive_info.get("smart_values", {}),
                 "smart_passed": drive_info.get("smart_passed", True),
+                "standby":     drive_info.get("standby", False),
                 "is_simulated": drive_info.get("is_simulated", True),
                 "size":        drive_info.get("size", "Unknown"),
             },
@@ -768,7 +773,7 @@ async def update_settings(request: SettingsRequest):
             mode = app_settings["compression_aggressiveness"]
             if mode != "auto":
                 # Apply to all drives
-                drives = smart_reader.get_all_drives()
+                drives = await smart_reader.get_all_drives_async()
                 for d in drives:
                     drive_compression_overrides[d["drive_id"]] = mode
             else:
@@ -813,12 +818,12 @@ async def generate_drive_report(request: Request, drive_id: str):
     Generate and download a PDF Warranty Claim Report for a drive.
     Rate limited to 10 requests/minute per IP.
     """
-    from fastapi.responses import StreamingResponse
+    from fastapi.responses import Response
     from utils.pdf_generator import generate_pdf_report
 
     try:
         data_source    = app_settings.get("data_source", "auto")
-        drives         = smart_reader.get_all_drives(forced_mode=data_source)
+        drives         = await smart_reader.get_all_drives_async(forced_mode=data_source)
         drive_info     = next((d for d in drives if d["drive_id"] == drive_id), None)
 
         if not drive_info:
@@ -840,12 +845,15 @@ async def generate_drive_report(request: Request, drive_id: str):
             "smart_history":   history,
         }
 
-        pdf_buffer = generate_pdf_report(report_data)
+        # reportlab rendering is CPU-bound — keep it off the event loop
+        pdf_buffer = await run_in_threadpool(generate_pdf_report, report_data)
         safe_id    = drive_id.replace("/", "_").replace("\\", "_")
         filename   = f"SENTINEL_Warranty_Claim_{safe_id}_{datetime.now().strftime('%Y%m%d')}.pdf"
 
-        return StreamingResponse(
-            pdf_buffer,
+        # A few KB already in memory: send it in one body rather than streaming
+        # the BytesIO line by line through the threadpool
+        return Response(
+            pdf_buffer.getvalue(),
             media_type="application/pdf",
             headers={
                 "Content-Disposition": f'attachment; filename="{filename}"',
@@ -948,7 +956,7 @@ async def trigger_backup(drive_id: str):
 async def run_simulation_cycle():
     """Manually trigger coordination cycles for all drives."""
     try:
-        drives  = smart_reader.get_all_drives()
+        drives  = await smart_reader.get_all_drives_async()
         results = []
         for drive in drives:
             drive_id = drive["drive_id"]
@@ -995,6 +1003,8 @@ async def startup_event():
     smartctl = shutil.which("smartctl")
     if smartctl:
         logger.info(f"✅ smartctl found at {smartctl} — real drive data enabled")
+        # Keep the local drive's reading warm for /api/v1/status/REAL_DRIVE
+        start_polling([DEFAULT_DEVICE])
     else:
         logger.warning("⚠️  smartctl not found — using simulated drive data")
         logger.warning("   Install with: brew install smartmontools")
@@ -1013,7 +1023,7 @@ async def startup_event():
 
     # Initial coordination cycles
     logger.info("Running initial coordination cycles...")
-    drives = smart_reader.get_all_drives()
+    drives = await smart_reader.get_all_drives_async()
     for drive in drives:
         drive_id = drive["drive_id"]
         try:
@@ -1036,6 +1046,7 @@ async def startup_event():
 @app.on_event("shutdown")
 async def shutdown_event():
     logger.info("SENTINEL-DISK Pro shutting down...")
+    stop_polling()
 
 
 if __name__ == "__main__":
@@ -1,7 +1,8 @@
 """
 SENTINEL-DISK Pro — Norm Params Generator
 
-Generates ml/saved_models/norm_params.pkl without requiring a full
+Generates ml/saved_models/norm_params.npz (+ .json metadata sidecar and
+the deprecated norm_params.pkl) without requiring a full
 Backblaze dataset download. Uses published SMART attribute statistics
 from Backblaze's drive failure studies (2013-2024 dataset averages).
 
@@ -15,10 +16,13 @@ Run from backend/ directory:
 """
 
 import os
+import json
 import pickle
 import numpy as np
 
-NORM_PARAMS_PATH = "ml/saved_models/norm_params.pkl"
+NORM_PARAMS_PATH = "ml/saved_models/norm_params.pkl"   # deprecated
+NORM_PARAMS_NPZ  = "ml/saved_models/norm_params.npz"
+NORM_PARAMS_META = "ml/saved_models/norm_params.json"
 
 # Feature order must match health_engine.py FEATURE_KEYS and train_model.py FEATURES
 FEATURES = [
@@ -67,15 +71,20 @@ def generate():
         "source":          "backblaze_fleet_statistics_2013_2024",
     }
 
+    np.savez(NORM_PARAMS_NPZ, mean=means, std=stds)
+    with open(NORM_PARAMS_META, "w") as f:
+        json.dump({k: v for k, v in norm_params.items() if k not in ("mean", "std")}, f, indent=2)
+
+    # Deprecated: still written for older backends that only know the .pkl
     with open(NORM_PARAMS_PATH, "wb") as f:
         pickle.dump(norm_params, f)
 
     print("=" * 58)
-    print("  norm_params.pkl generated from Backblaze fleet stats")
+    print("  norm_params.npz generated from Backblaze fleet stats")
     print("=" * 58)
     for i, feat in enumerate(FEATURES):
         print(f"  {feat:<20}  mean={means[i]:>10.2f}  std={stds[i]:>8.2f}")
-    print(f"\n✅ Saved to {NORM_PARAMS_PATH}  ({os.path.getsize(NORM_PARAMS_PATH)} bytes)")
+    print(f"\n✅ Saved to {NORM_PARAMS_NPZ}  ({os.path.getsize(NORM_PARAMS_NPZ)} bytes)")
     print("\nRestart the backend to load the ML model.")
 
 
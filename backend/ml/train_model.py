@@ -4,7 +4,10 @@ SENTINEL-DISK Pro — TCN Training Script
 Trains a Temporal Convolutional Network on real Backblaze hard drive data.
 Downloads Q3+Q4 2024 data, preprocesses it, trains the model, and saves:
   - ml/saved_models/tcn_v1.keras       (the trained model)
-  - ml/saved_models/norm_params.pkl    (StandardScaler for inference)
+  - ml/saved_models/tcn_v1.tflite      (int8-quantized copy for serving)
+  - ml/saved_models/norm_params.npz    (scaler mean/std for inference)
+  - ml/saved_models/norm_params.json   (feature order + sequence length)
+  - ml/saved_models/norm_params.pkl    (deprecated — legacy loaders only)
 
 Run from backend/ directory:
     python ml/train_model.py
@@ -14,18 +17,26 @@ import os
 import sys
 import numpy as np
 import pandas as pd
+import json
 import pickle
 import joblib
+from joblib import Parallel, delayed
+from numpy.lib.stride_tricks import sliding_window_view
 
 # ── Paths ──────────────────────────────────────────────────────────────────────
 DATA_FILE        = "ml/data/processed/training_data.csv"
 MODEL_PATH       = "ml/saved_models/tcn_v1.keras"
-NORM_PARAMS_PATH = "ml/saved_models/norm_params.pkl"
+TFLITE_PATH      = "ml/saved_models/tcn_v1.tflite"
+NORM_PARAMS_PATH = "ml/saved_models/norm_params.pkl"   # deprecated
+NORM_PARAMS_NPZ  = "ml/saved_models/norm_params.npz"
+NORM_PARAMS_META = "ml/saved_models/norm_params.json"
 
 os.makedirs("ml/saved_models", exist_ok=True)
 
 # ── Feature config (must match data_pipeline.py) ──────────────────────────────
 SEQUENCE_LENGTH = 30
+BATCH_SIZE      = 64
+SCALER_FIT_ROWS = 1_000_000   # rows sampled to fit the normalizer
 FEATURES = [
     "smart_5_raw",   # Reallocated Sectors
     "smart_187_raw", # Uncorrectable Errors
@@ -53,7 +64,6 @@ except ImportError:
 
 try:
     from sklearn.model_selection import train_test_split
-    from sklearn.preprocessing import StandardScaler
     from sklearn.metrics import roc_auc_score, classification_report
     SKLEARN_AVAILABLE = True
 except ImportError:
@@ -61,8 +71,44 @@ except ImportError:
     sys.exit(1)
 
 
+# ── Data loading ───────────────────────────────────────────────────────────────
+
+def load_training_data(path: str) -> pd.DataFrame:
+    """
+    Read only the columns training needs, parsed straight to float32/int8.
+    Uses pyarrow's multithreaded CSV reader when installed, else the C engine.
+    """
+    read_kwargs = dict(
+        usecols=["date", "serial_number", "failure", *FEATURES],
+        dtype={**{f: np.float32 for f in FEATURES}, "failure": np.int8},
+    )
+    try:
+        return pd.read_csv(path, engine="pyarrow", **read_kwargs)
+    except ImportError:
+        return pd.read_csv(path, engine="c", **read_kwargs)
+
+
 # ── Sequence creation ──────────────────────────────────────────────────────────
 
+def _build_windows(data: np.ndarray, targets: np.ndarray, seq_len: int):
+    """
+    Build all (window, label) pairs for a single drive's date-sorted readings.
+    Returns None if the drive has too little history for a single window.
+    """
+    if len(data) < seq_len + 1:
+        return None
+
+    # All windows at once as a zero-copy view: (M, seq_len, n_features)
+    windows = sliding_window_view(data, (seq_len, data.shape[1]))[:-1, 0]
+    n_win   = len(windows)
+
+    # Label: does this drive fail in the next 7 days? (rolling OR over the horizon)
+    horizon = np.pad(targets[seq_len:], (0, 6))
+    labels  = sliding_window_view(horizon, 7).any(axis=1)[:n_win]
+
+    return windows.copy(), labels.astype(np.int32)
+
+
 def create_sequences(df: pd.DataFrame, seq_len: int = 30):
     """
     Convert per-drive daily SMART readings into (X, y) sequences.
@@ -70,37 +116,41 @@ def create_sequences(df: pd.DataFrame, seq_len: int = 30):
     X shape: (N, seq_len, n_features)
     y shape: (N,)  — 1 if drive fails within next 7 days, else 0
     """
-    X_list, y_list = [], []
-    grouped = df.groupby("serial_number")
-
-    for serial, group in grouped:
-        group = group.sort_values("date")
-        data    = group[FEATURES].values.astype(np.float32)
-        targets = group["failure"].values
-
-        if len(data) < seq_len:
-            continue
-
-        for i in range(len(data) - seq_len):
-            window  = data[i : i + seq_len]
-            # Label: does this drive fail in the next 7 days?
-            horizon = targets[i + seq_len : i + seq_len + 7]
-            label   = 1 if np.any(horizon == 1) else 0
-            X_list.append(window)
-            y_list.append(label)
-
-    if not X_list:
+    # One stable sort up front; each drive is then a contiguous slice of raw
+    # numpy arrays — no per-group DataFrames or re-sorting in the hot path.
+    df       = df.sort_values(["serial_number", "date"], kind="mergesort")
+    features = df[FEATURES].to_numpy(np.float32)
+    failures = df["failure"].to_numpy(np.int8)
+    serials  = df["serial_number"].to_numpy()
+
+    _, starts = np.unique(serials, return_index=True)
+    bounds    = np.append(np.sort(starts), len(serials))
+
+    # Drives are independent — build their windows on all cores. Threads, not
+    # processes: the window copies release the GIL and the output is ~seq_len×
+    # larger than the input, so shipping it back through pickle would dominate.
+    results = Parallel(n_jobs=-1, prefer="threads", batch_size="auto")(
+        delayed(_build_windows)(features[s:e], failures[s:e], seq_len)
+        for s, e in zip(bounds[:-1], bounds[1:])
+    )
+    results = [r for r in results if r is not None]
+
+    if not results:
         return np.array([]), np.array([])
 
-    return np.array(X_list, dtype=np.float32), np.array(y_list, dtype=np.int32)
+    return (np.concatenate([r[0] for r in results]),
+            np.concatenate([r[1] for r in results]))
 
 
 # ── Model architecture ─────────────────────────────────────────────────────────
 
-def build_tcn(input_shape):
+def build_tcn(input_shape, jit_compile: bool = True):
     """
     Temporal Convolutional Network with dilated causal convolutions.
     Dilation rates [1, 2, 4] give a receptive field of 21 time steps.
+
+    jit_compile=True lets XLA fuse each Conv1D with its bias/ReLU/BN/Dropout
+    point-wise ops — on (30, 8) inputs kernel-launch overhead dominates.
     """
     model = Sequential([
         # Block 1 — local patterns
@@ -124,27 +174,78 @@ def build_tcn(input_shape):
         # Aggregate across time
         GlobalMaxPooling1D(),
 
-        # Classification head
-        Dense(64, activation="relu"),
+        # Classification head — a single 128 → 32 projection
         Dropout(0.3),
         Dense(32, activation="relu"),
-        Dense(1, activation="sigmoid"),
+        Dense(1, activation="sigmoid", dtype="float32"),  # FP32 output under mixed precision
     ], name="TCN_v1")
 
     model.compile(
         optimizer=Adam(learning_rate=1e-3),
         loss="binary_crossentropy",
         metrics=["AUC", "accuracy"],
+        jit_compile=jit_compile,
     )
     return model
 
 
+def _xla_train_step_ok(train_ds) -> bool:
+    """
+    Run one training step of a throwaway XLA-compiled TCN on the first batch.
+    False if this TF build can't compile it (some can't XLA-compile
+    BatchNorm in training mode); any other failure is left to model.fit.
+    """
+    x, y = next(iter(train_ds))
+    probe = build_tcn(tuple(x.shape[1:]))
+    try:
+        probe.train_on_batch(x, y)
+    except (tf.errors.UnimplementedError, tf.errors.InvalidArgumentError) as e:
+        print(f"      ⚠️  XLA compilation failed ({type(e).__name__})")
+        return False
+    return True
+
+
+def export_tflite(model, X_calib: np.ndarray, path: str = TFLITE_PATH,
+                  n_calib: int = 200):
+    """
+    Convert the trained model to a full-integer (int8) TFLite flatbuffer.
+    Activation ranges are calibrated on the first n_calib training windows;
+    the output stays float32 so callers get a probability directly.
+    """
+    def representative_dataset():
+        for i in range(min(n_calib, len(X_calib))):
+            yield [X_calib[i:i + 1].astype(np.float32)]
+
+    converter = tf.lite.TFLiteConverter.from_keras_model(model)
+    converter.optimizations             = [tf.lite.Optimize.DEFAULT]
+    converter.representative_dataset    = representative_dataset
+    converter.target_spec.supported_ops = [tf.lite.OpsSet.TFLITE_BUILTINS_INT8]
+    converter.inference_input_type      = tf.int8
+
+    with open(path, "wb") as f:
+        f.write(converter.convert())
+    return path
+
+
 # ── Main training function ─────────────────────────────────────────────────────
 
+def _enable_mixed_precision():
+    """
+    Run Conv1D/Dense maths in float16 on GPUs (tensor cores, half the
+    activation bandwidth). Variables stay float32, and model.compile wraps
+    the optimizer in a LossScaleOptimizer automatically under this policy.
+    CPUs gain nothing from float16, so they keep the float32 default.
+    """
+    if tf.config.list_physical_devices("GPU"):
+        tf.keras.mixed_precision.set_global_policy("mixed_float16")
+        print("      Mixed precision: mixed_float16 (GPU detected)")
+
+
 def train():
     print("=" * 60)
     print("SENTINEL-DISK Pro — TCN Training")
     print("=" * 60)
+    _enable_mixed_precision()
 
     # 1. Load data
     if not os.path.exists(DATA_FILE):
@@ -153,7 +254,7 @@ def train():
         sys.exit(1)
 
     print(f"\n[1/7] Loading data from {DATA_FILE}...")
-    df = pd.read_csv(DATA_FILE)
+    df = load_training_data(DATA_FILE)
     print(f"      Loaded {len(df):,} rows | "
           f"{df['serial_number'].nunique():,} unique drives | "
           f"{df['failure'].sum():,} failure events")
@@ -170,29 +271,44 @@ def train():
     print(f"      Failure rate: {y.mean()*100:.2f}%  "
           f"({y.sum():,} failure / {(1-y).sum():,} healthy)")
 
-    # 3. Normalize — fit StandardScaler on training data
-    print("\n[3/7] Fitting StandardScaler on feature sequences...")
-    # Reshape to (N*seq_len, features) for scaler fitting
+    # 3. Normalize — per-feature mean/std on training data
+    print("\n[3/7] Computing feature mean/std on sequences...")
+    # Fit on a row subsample of the (N*seq_len, features) view — mean/std of
+    # 8 features converge long before the full array has been read
     N, T, F = X.shape
     X_flat = X.reshape(-1, F)
-    scaler = StandardScaler()
-    scaler.fit(X_flat)
-
-    # Save scaler as norm_params.pkl
+    rng    = np.random.default_rng(42)
+    if len(X_flat) > SCALER_FIT_ROWS:
+        X_flat = X_flat[rng.choice(len(X_flat), size=SCALER_FIT_ROWS, replace=False)]
+    # Plain float64 reductions — StandardScaler's input validation would make
+    # a float64 copy of the whole sample first
+    mean = X_flat.mean(axis=0, dtype=np.float64).astype(np.float32)
+    std  = X_flat.std(axis=0, dtype=np.float64).astype(np.float32)
+    std[std == 0] = 1.0
+
+    # Save scaler as plain arrays (.npz) + JSON metadata — no unpickling at load
     norm_params = {
-        "mean": scaler.mean_.astype(np.float32),
-        "std":  scaler.scale_.astype(np.float32),
+        "mean": mean,
+        "std":  std,
         "feature_names": FEATURES,
         "sequence_length": SEQUENCE_LENGTH,
     }
+    np.savez(NORM_PARAMS_NPZ, mean=norm_params["mean"], std=norm_params["std"])
+    with open(NORM_PARAMS_META, "w") as f:
+        json.dump({"feature_names": FEATURES, "sequence_length": SEQUENCE_LENGTH}, f, indent=2)
+    print(f"      ✅ Saved norm_params.npz → {NORM_PARAMS_NPZ}")
+
+    # Deprecated: still written for older backends that only know the .pkl
     with open(NORM_PARAMS_PATH, "wb") as f:
         pickle.dump(norm_params, f)
-    print(f"      ✅ Saved norm_params.pkl → {NORM_PARAMS_PATH}")
-    print(f"      Feature means: {scaler.mean_.round(4)}")
-    print(f"      Feature stds:  {scaler.scale_.round(4)}")
+    print(f"      Feature means: {mean.round(4)}")
+    print(f"      Feature stds:  {std.round(4)}")
 
-    # Apply normalization
-    X_norm = scaler.transform(X_flat).reshape(N, T, F).astype(np.float32)
+    # Apply normalization in place on the 3-D array — (1, 1, F) broadcast,
+    # no flattened copy and no float64 temporary
+    X_norm = X
+    np.subtract(X_norm, mean.reshape(1, 1, F), out=X_norm)
+    np.divide(X_norm, std.reshape(1, 1, F), out=X_norm)
 
     # 4. Handle class imbalance — undersample majority class
     print("\n[4/7] Balancing dataset (1:4 failure:healthy ratio)...")
@@ -206,8 +322,11 @@ def train():
     # Keep all failures + 4× as many healthy samples
     ratio = 4
     n_healthy_keep = min(len(idx_fail) * ratio, len(idx_healthy))
-    rng = np.random.default_rng(42)
-    idx_healthy_keep = rng.choice(idx_healthy, size=n_healthy_keep, replace=False)
+    # Uniform sample without replacement: the n smallest of one random key per
+    # index. argpartition is O(n) with no full permutation of idx_healthy.
+    rand = rng.random(len(idx_healthy), dtype=np.float32)
+    pick = np.argpartition(rand, n_healthy_keep - 1)[:n_healthy_keep] if n_healthy_keep else []
+    idx_healthy_keep = idx_healthy[pick]
     indices = np.concatenate([idx_fail, idx_healthy_keep])
     rng.shuffle(indices)
 
@@ -253,17 +372,40 @@ def train():
         ),
     ]
 
-    print("\nStarting training (up to 30 epochs with early stopping)...")
-    history = model.fit(
-        X_train, y_train,
-        validation_data=(X_val, y_val),
+    # Input pipeline — batches are prepared on CPU while the previous step
+    # runs. cache() sits before shuffle() so every epoch is reshuffled from
+    # the in-memory copy rather than replaying the first epoch's order.
+    train_ds = (
+        tf.data.Dataset.from_tensor_slices((X_train, y_train))
+        .cache()
+        .shuffle(buffer_size=min(100_000, len(X_train)), seed=42,
+                 reshuffle_each_iteration=True)
+        .batch(BATCH_SIZE, drop_remainder=True)  # static batch dim for XLA
+        .prefetch(tf.data.AUTOTUNE)
+    )
+    val_ds = (
+        tf.data.Dataset.from_tensor_slices((X_val, y_val))
+        .batch(BATCH_SIZE)
+        .cache()
+        .prefetch(tf.data.AUTOTUNE)
+    )
+
+    fit_kwargs = dict(
+        validation_data=val_ds,
         epochs=30,
-        batch_size=64,
         callbacks=callbacks,
         class_weight={0: 1.0, 1: ratio},  # Extra weight on failure class
         verbose=1,
     )
 
+    # Only the compile probe falls back; errors from the real fit propagate
+    if not _xla_train_step_ok(train_ds):
+        print("      Training without jit_compile")
+        model = build_tcn((SEQUENCE_LENGTH, len(FEATURES)), jit_compile=False)
+
+    print("\nStarting training (up to 30 epochs with early stopping)...")
+    history = model.fit(train_ds, **fit_kwargs)
+
     # 7. Evaluate
     print("\n[7/7] Evaluating on validation set...")
     y_pred_prob = model.predict(X_val, verbose=0).flatten()
@@ -275,8 +417,16 @@ def train():
     print(f"  Best val_auc achieved: {max(history.history['val_auc']):.4f}")
     print(f"\n{classification_report(y_val, y_pred, target_names=['Healthy','Failure'])}")
     print(f"{'='*60}")
+
+    # Serving copy — health_model.py prefers this over the .keras file
+    try:
+        export_tflite(model, X_train)
+        print(f"\n✅ TFLite int8 model saved → {TFLITE_PATH}")
+    except Exception as e:
+        print(f"\n⚠️  TFLite export failed ({e}) — backend will use the .keras model")
+
     print(f"\n✅ Model saved  → {MODEL_PATH}")
-    print(f"✅ Scaler saved → {NORM_PARAMS_PATH}")
+    print(f"✅ Scaler saved → {NORM_PARAMS_NPZ}")
     print("\nRestart the backend to load the trained model.")
 
 
@@ -6,6 +6,11 @@ Uses a rule-based classifier (simulating a trained Random Forest) that
 selects the optimal compression algorithm per file type.
 """
 
+from types import MappingProxyType
+
+import numpy as np
+import pandas as pd
+
 
 # Algorithm selection rules (simulating RF classifier output)
 COMPRESSION_ALGORITHMS = {
@@ -45,82 +50,131 @@ EXTENSION_MAP = {
 }
 
 
+def _algorithm_result(algo_key: str) -> dict:
+    algo = COMPRESSION_ALGORITHMS[algo_key]
+    return {
+        "algorithm": algo_key,
+        "algorithm_name": algo["name"],
+        "compression_ratio": algo["ratio"],
+        "best_for": algo["best_for"],
+    }
+
+
+# Per-extension selection results, built once — a real filesystem repeats a
+# handful of extensions, so classification is a single dict hit per file
+_RESULT_CACHE = {ext: _algorithm_result(key) for ext, key in EXTENSION_MAP.items()}
+_RESULT_SKIP = _algorithm_result("skip")
+_RESULT_DEFAULT = _algorithm_result("gzip")
+
+
 def select_algorithm(extension: str, entropy: float = 0.0, size_bytes: int = 0) -> dict:
     """
     Select optimal compression algorithm for a file.
     High entropy (>7.5) files are likely already compressed → skip.
+    Callers that already hold a lowercase extension skip the .lower() call.
     """
-    ext = extension.lower()
-
     # High entropy = already compressed
     if entropy > 7.5:
-        algo_key = "skip"
+        base = _RESULT_SKIP
     else:
-        algo_key = EXTENSION_MAP.get(ext, "gzip")
+        base = _RESULT_CACHE.get(extension)
+        if base is None:
+            base = _RESULT_CACHE.get(extension.lower(), _RESULT_DEFAULT)
 
-    algo = COMPRESSION_ALGORITHMS[algo_key]
     estimated_savings = 0
-    if algo_key != "skip" and size_bytes > 0:
-        estimated_savings = size_bytes * (1 - 1 / algo["ratio"])
+    if base["algorithm"] != "skip" and size_bytes > 0:
+        estimated_savings = size_bytes * (1 - 1 / base["compression_ratio"])
 
-    return {
-        "algorithm": algo_key,
-        "algorithm_name": algo["name"],
-        "compression_ratio": algo["ratio"],
-        "estimated_savings_bytes": int(estimated_savings),
-        "best_for": algo["best_for"],
-    }
+    return {**base, "estimated_savings_bytes": int(estimated_savings)}
+
+
+def select_algorithm_batch(extensions, entropies=None, sizes=None) -> pd.DataFrame:
+    """
+    Vectorized select_algorithm() over many files at once.
+    Returns one row per file with the same fields select_algorithm() returns.
+    """
+    ext = pd.Series(extensions, dtype="string").str.lower()
+    n = len(ext)
+    entropies = np.zeros(n) if entropies is None else np.asarray(entropies, dtype=np.float64)
+    sizes = np.zeros(n, dtype=np.int64) if sizes is None else np.asarray(sizes, dtype=np.int64)
+
+    # High entropy = already compressed
+    algo = ext.map(EXTENSION_MAP).fillna("gzip").astype(object)
+    algo = algo.where(entropies <= 7.5, "skip")
+
+    ratio = algo.map({k: v["ratio"] for k, v in COMPRESSION_ALGORITHMS.items()}).to_numpy(np.float64)
+    savings = np.where(
+        (algo.to_numpy() != "skip") & (sizes > 0),
+        sizes * (1 - 1 / ratio),
+        0,
+    ).astype(np.int64)
+
+    return pd.DataFrame({
+        "algorithm": algo,
+        "algorithm_name": algo.map({k: v["name"] for k, v in COMPRESSION_ALGORITHMS.items()}),
+        "compression_ratio": ratio,
+        "estimated_savings_bytes": savings,
+        "best_for": algo.map({k: v["best_for"] for k, v in COMPRESSION_ALGORITHMS.items()}),
+    })
+
+
+# Optimization modes by health bucket — built once and shared read-only
+_MODE_NORMAL = MappingProxyType({
+    "mode": "normal",
+    "description": "Standard compression — no restrictions",
+    "write_reduction_target": 0.15,
+    "actions": (
+        "Compress new text and document files",
+        "Standard log rotation",
+    ),
+})
+_MODE_CONSERVATIVE = MappingProxyType({
+    "mode": "conservative",
+    "description": "Conservative — batch writes, defer temp files",
+    "write_reduction_target": 0.35,
+    "actions": (
+        "Batch small writes into larger sequential ops",
+        "Defer temporary file creation",
+        "Compress documents and code files",
+        "Optimize database dumps",
+    ),
+})
+_MODE_AGGRESSIVE = MappingProxyType({
+    "mode": "aggressive",
+    "description": "Aggressive — read-only cold data, heavy batching",
+    "write_reduction_target": 0.55,
+    "actions": (
+        "Set cold data partitions to read-only",
+        "Heavy write batching (16KB minimum)",
+        "Consolidate all log files",
+        "Compress everything compressible",
+        "Defer non-critical writes",
+    ),
+})
+_MODE_EMERGENCY = MappingProxyType({
+    "mode": "emergency",
+    "description": "⚠️ Emergency — minimal writes, backup immediately",
+    "write_reduction_target": 0.70,
+    "actions": (
+        "BACKUP ALL CRITICAL DATA IMMEDIATELY",
+        "Minimal writes only (OS-critical)",
+        "All non-essential services paused",
+        "Data migration wizard activated",
+        "Read-only mode for all user data",
+    ),
+})
 
 
-def get_optimization_mode(health_score: float) -> dict:
+def get_optimization_mode(health_score: float) -> MappingProxyType:
     """
     Determine optimization aggressiveness based on drive health.
+    Returns a shared read-only mapping — copy it before modifying.
     """
     if health_score >= 80:
-        return {
-            "mode": "normal",
-            "description": "Standard compression — no restrictions",
-            "write_reduction_target": 0.15,
-            "actions": [
-                "Compress new text and document files",
-                "Standard log rotation",
-            ],
-        }
+        return _MODE_NORMAL
     elif health_score >= 60:
-        return {
-            "mode": "conservative",
-            "description": "Conservative — batch writes, defer temp files",
-            "write_reduction_target": 0.35,
-            "actions": [
-                "Batch small writes into larger sequential ops",
-                "Defer temporary file creation",
-                "Compress documents and code files",
-                "Optimize database dumps",
-            ],
-        }
+        return _MODE_CONSERVATIVE
     elif health_score >= 40:
-        return {
-            "mode": "aggressive",
-            "description": "Aggressive — read-only cold data, heavy batching",
-            "write_reduction_target": 0.55,
-            "actions": [
-                "Set cold data partitions to read-only",
-                "Heavy write batching (16KB minimum)",
-                "Consolidate all log files",
-                "Compress everything compressible",
-                "Defer non-critical writes",
-            ],
-        }
+        return _MODE_AGGRESSIVE
     else:
-        return {
-            "mode": "emergency",
-            "description": "⚠️ Emergency — minimal writes, backup immediately",
-            "write_reduction_target": 0.70,
-            "actions": [
-                "BACKUP ALL CRITICAL DATA IMMEDIATELY",
-                "Minimal writes only (OS-critical)",
-                "All non-essential services paused",
-                "Data migration wizard activated",
-                "Read-only mode for all user data",
-            ],
-        }
+        return _MODE_EMERGENCY
@@ -0,0 +1,18 @@
+"""
+SENTINEL-DISK Pro — SMART History Columns
+
+Column order of the (days, 8) SMART history matrices that the health scorer
+consumes. Kept free of numpy / TensorFlow so data modules can build those
+matrices without loading the model.
+"""
+
+HISTORY_COLUMNS = (
+    "smart_5",      # Reallocated Sectors
+    "smart_187",    # Reported Uncorrectable Errors
+    "smart_197",    # Current Pending Sectors
+    "smart_198",    # Offline Uncorrectable Sectors
+    "smart_188",    # Command Timeout
+    "smart_194",    # Temperature
+    "smart_9",      # Power-On Hours
+    "smart_12",     # Power Cycle Count
+)
@@ -6,13 +6,13 @@ Triggers compression optimization based on drive health.
 """
 
 from fastapi import APIRouter, HTTPException
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 from typing import List, Optional
-from datetime import datetime
 
 from models.compression_model import get_optimization_mode
 from models.coordinator import make_decision, calculate_life_extension
 from sample_data import get_drive
+from utils.timestamps import iso_now
 
 router = APIRouter()
 
@@ -22,13 +22,21 @@ class OptimizeRequest(BaseModel):
     health_score: Optional[float] = Field(None, description="Current health score. If omitted, uses stored value.")
 
 
+# Response-side models are never built from client input or mutated
+_RESPONSE_ONLY = ConfigDict(frozen=True, extra="forbid")
+
+
 class ActionItem(BaseModel):
+    model_config = _RESPONSE_ONLY
+
     priority: str
     action: str
     reason: str
 
 
 class OptimizationMode(BaseModel):
+    model_config = _RESPONSE_ONLY
+
     mode: str
     description: str
     write_reduction_target: float
@@ -36,6 +44,8 @@ class OptimizationMode(BaseModel):
 
 
 class LifeExtensionResult(BaseModel):
+    model_config = _RESPONSE_ONLY
+
     baseline_days: Optional[int]
     extended_days: Optional[int]
     days_gained: int
@@ -44,6 +54,8 @@ class LifeExtensionResult(BaseModel):
 
 
 class OptimizeResponse(BaseModel):
+    model_config = _RESPONSE_ONLY
+
     drive_id: str
     optimization_triggered: bool
     optimization_mode: OptimizationMode
@@ -53,7 +65,8 @@ class OptimizeResponse(BaseModel):
     timestamp: str
 
 
-@router.post("/optimize", response_model=OptimizeResponse)
+# OptimizeResponse is for the OpenAPI docs; the returned dict is not re-validated
+@router.post("/optimize", response_model=None, responses={200: {"model": OptimizeResponse}})
 async def optimize_drive(request: OptimizeRequest):
     """
     Trigger or evaluate compression optimization for a drive.
@@ -96,12 +109,27 @@ async def optimize_drive(request: OptimizeRequest):
 
     should_trigger = health_score < 80 or (previous_health and previous_health - health_score > 5)
 
-    return OptimizeResponse(
-        drive_id=request.drive_id,
-        optimization_triggered=should_trigger,
-        optimization_mode=OptimizationMode(**decision["optimization_mode"]),
-        expected_write_reduction=decision["optimization_mode"]["write_reduction_target"],
-        life_extension=LifeExtensionResult(**life_ext),
-        recommended_actions=[ActionItem(**a) for a in decision["recommended_actions"]],
-        timestamp=datetime.utcnow().isoformat() + "Z",
-    )
+    mode = decision["optimization_mode"]
+    return {
+        "drive_id": request.drive_id,
+        "optimization_triggered": bool(should_trigger),
+        "optimization_mode": {
+            "mode": mode["mode"],
+            "description": mode["description"],
+            "write_reduction_target": float(mode["write_reduction_target"]),
+            "actions": list(mode["actions"]),
+        },
+        "expected_write_reduction": float(mode["write_reduction_target"]),
+        "life_extension": {
+            "baseline_days": life_ext["baseline_days"],
+            "extended_days": life_ext["extended_days"],
+            "days_gained": life_ext["days_gained"],
+            "extension_percent": float(life_ext["extension_percent"]),
+            "write_reduction_rate": float(life_ext["write_reduction_rate"]),
+        },
+        "recommended_actions": [
+            {"priority": a["priority"], "action": a["action"], "reason": a["reason"]}
+            for a in decision["recommended_actions"]
+        ],
+        "timestamp": iso_now(),
+    }
@@ -6,16 +6,65 @@ GET  /api/v1/drives              — List all monitored drives
 POST /api/v1/whatif              — What-if scenario simulator
 """
 
-from fastapi import APIRouter, HTTPException
+import asyncio
+import hashlib
+import logging
+import subprocess
+import time
+
+from fastapi import APIRouter, HTTPException, Query, Request, Response
+from fastapi.concurrency import run_in_threadpool
+from fastapi.encoders import jsonable_encoder
 from pydantic import BaseModel, Field
-from typing import List, Optional, Dict, Any
-from datetime import datetime
+from typing import List, Literal, Optional, Dict, Any
 
-from models.health_model import predict_with_scenario, compute_health_score
+from models.health_model import (
+    HISTORY_COLUMNS, predict_with_scenario, compute_health_score, compute_health_score_arr,
+)
 from models.coordinator import calculate_life_extension
-from sample_data import get_drive, get_all_drives_summary
+from sample_data import DRIVE_SUMMARIES, get_drive, get_smart_matrix
+from smart_collector import get_smart_data_cached
+from utils.json_response import dumps
+from utils.timestamps import iso_now
 
 router = APIRouter()
+logger = logging.getLogger(__name__)
+
+
+# ─── Cached Response Bodies ───────────────────────────────────────────────────
+# The simulated drives never change, so their /drives and /status payloads are
+# encoded once and served as bytes. Only last_updated is filled in per request.
+
+_STATUS_PAYLOADS: Dict[str, Dict[str, Any]] = {}
+_STATUS_BODIES: Dict[tuple, tuple] = {}    # (drive_id, projection) → (body, etag)
+
+
+def _json_bytes(content: Any) -> bytes:
+    """Encode content as the app's default response class would."""
+    return dumps(jsonable_encoder(content))
+
+
+def _etag(data: bytes) -> str:
+    """Strong ETag for a response body (or whatever identifies its content)."""
+    return '"' + hashlib.md5(data, usedforsecurity=False).hexdigest() + '"'
+
+
+def _not_modified(request: Request, etag: str) -> bool:
+    """True if the client's If-None-Match already covers etag."""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    tags = [t.strip().removeprefix("W/") for t in header.split(",")]
+    return "*" in tags or etag in tags
+
+
+def _conditional(request: Request, body: bytes, etag: str) -> Response:
+    """Serve body, or an empty 304 when the client already holds this ETag."""
+    # no-cache: browsers may keep the body but must revalidate every poll
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if _not_modified(request, etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
 
 
 # ─── Drive List ────────────────────────────────────────────────────────────────
@@ -30,26 +79,82 @@ class DriveSummary(BaseModel):
     days_to_failure: Optional[int]
 
 
+REAL_DRIVE_SUMMARY = {
+    "drive_id": "REAL_DRIVE",
+    "name": "Local Disk (Real-Time)",
+    "model": "Generic",
+    "capacity_gb": 1000,
+    "health_score": 0, # Will be updated on detail view
+    "risk_level": "Unknown",
+    "days_to_failure": None
+}
+
+# Validated once through the response model, as FastAPI would per request
+_DRIVES_BODY = _json_bytes([DriveSummary(**s) for s in (*DRIVE_SUMMARIES, REAL_DRIVE_SUMMARY)])
+_DRIVES_ETAG = _etag(_DRIVES_BODY)
+
+
 @router.get("/drives", response_model=List[DriveSummary])
-async def list_drives():
+async def list_drives(request: Request):
     """List all monitored drives with summary health info."""
-    summaries = get_all_drives_summary()
-    summaries.append({
-        "drive_id": "REAL_DRIVE",
-        "name": "Local Disk (Real-Time)",
-        "model": "Generic",
-        "capacity_gb": 1000,
-        "health_score": 0, # Will be updated on detail view
-        "risk_level": "Unknown",
-        "days_to_failure": None
-    })
-    return summaries
+    return _conditional(request, _DRIVES_BODY, _DRIVES_ETAG)
 
 
 # ─── Drive Status ──────────────────────────────────────────────────────────────
 
+# Top-level /status keys, in payload order (last_updated is always appended)
+STATUS_FIELDS = (
+    "drive_id", "name", "model", "serial_number", "capacity_gb",
+    "health", "prediction", "smart_current", "smart_history", "health_history",
+    "compression", "life_extension", "optimization_active", "write_reduction",
+    "life_extended_days",
+)
+
+# ?view=summary — what the dashboard's drive card renders (~1 KB)
+SUMMARY_FIELDS = (
+    "drive_id", "name", "model", "capacity_gb", "health", "smart_current",
+    "health_history", "optimization_active", "write_reduction", "life_extended_days",
+)
+SUMMARY_HISTORY_DAYS = 7
+
+
+def _status_projection(view: str, fields: Optional[str]) -> Optional[tuple]:
+    """
+    Resolve ?view= / ?fields= into the tuple of keys to return, or None for
+    the full payload. drive_id is always kept.
+    """
+    if fields:
+        requested = {f.strip() for f in fields.split(",") if f.strip()}
+        unknown = requested.difference(STATUS_FIELDS)
+        if unknown:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Unknown fields: {', '.join(sorted(unknown))}. Available: {', '.join(STATUS_FIELDS)}"
+            )
+        requested.add("drive_id")
+        return tuple(k for k in STATUS_FIELDS if k in requested)
+    if view == "summary":
+        return SUMMARY_FIELDS
+    return None
+
+
+def _project_status(status: Dict[str, Any], keys: Optional[tuple]) -> Dict[str, Any]:
+    """Cut a full status payload down to the requested keys."""
+    if keys is None:
+        return status
+    projected = {k: status[k] for k in keys}
+    if keys is SUMMARY_FIELDS:
+        projected["health_history"] = projected["health_history"][-SUMMARY_HISTORY_DAYS:]
+    return projected
+
+
 @router.get("/status/{drive_id}")
-async def get_status(drive_id: str):
+async def get_status(
+    request: Request,
+    drive_id: str,
+    view: Literal["full", "summary"] = Query("full", description="Named payload bundle"),
+    fields: Optional[str] = Query(None, description="Comma-separated top-level keys, e.g. health,compression"),
+):
     """
     Get complete status for a specific drive including:
     - Health score and prediction
@@ -57,66 +162,24 @@ async def get_status(drive_id: str):
     - Compression statistics
     - Life extension metrics
     - Historical data for charts
+
+    ?view=summary or ?fields=... trims the payload to what the caller needs.
+    Responses carry an ETag; a matching If-None-Match gets an empty 304.
     """
+    keys = _status_projection(view, fields)
+
     # ─── Real Drive Integration ──────────────────────────────────────────────
     if drive_id == "REAL_DRIVE":
-        from smart_collector import get_smart_data
-        
-        # 1. Fetch real SMART data
-        real_smart = get_smart_data()  # Returns dict like {'smart_5': 0, ...} or None
-        
-        if not real_smart:
-           # Fallback if smartctl fails or not present
-           # For demo: Return a placeholder "Not Detected" state or similar
-           # But to avoid breaking frontend, we'll mimic a healthy drive but with a flag
-           real_smart = {"smart_5": 0, "smart_187": 0, "smart_197": 0, "smart_9": 100, "smart_194": 30}
-           
-        # 2. Construct history (Real-time often means we only have *current* point)
-        # We'll simulate a stable history by repeating current values
-        # In a full app, we'd query a database of past real readings.
-        smart_history = [real_smart] * 30 
-        
-        # 3. Compute Health
-        prediction = compute_health_score(smart_history)
-        
-        return {
-            "drive_id": "REAL_DRIVE",
-            "name": "Local Disk (Real-Time)",
-            "model": "Generic/Unknown",
-            "serial_number": "LOCAL-HW-001",
-            "capacity_gb": 1000, 
-            "health": {
-                "score": prediction["health_score"],
-                "risk_level": prediction["risk_level"],
-                "failure_probability": prediction["failure_probability"],
-                "days_to_failure": prediction["days_to_failure"],
-                "confidence_interval": prediction["confidence_interval"],
-            },
-            "prediction": prediction,
-            "smart_current": real_smart,
-            "smart_history": smart_history,
-            "health_history": [{"date": datetime.utcnow().isoformat(), "score": prediction["health_score"]}], # data for chart
-            "compression": { # Mock compression stats for real drive
-                "total_files": 100000,
-                "compressed_files": 0,
-                "total_size_gb": 500,
-                "compressed_size_gb": 500,
-                "space_saved_gb": 0,
-                "by_file_type": [],
-                "write_ops_history": [],
-                "recommendations": []
-            },
-            "life_extension": {
-                 "interventions": [],
-                 "total_days_extended": 0,
-                 "baseline_remaining_days": None,
-                 "current_remaining_days": None
-            },
-            "optimization_active": False,
-            "write_reduction": 0.0,
-            "life_extended_days": 0,
-            "last_updated": datetime.utcnow().isoformat() + "Z",
-        }
+        status = await _cached_real_status()
+        # Content only changes when the TTL cache refreshes (new last_updated)
+        etag = _etag(f"REAL_DRIVE|{status['last_updated']}|{keys}".encode())
+        if _not_modified(request, etag):
+            return _conditional(request, b"", etag)
+        if keys is not None:
+            projected = _project_status(status, keys)
+            projected["last_updated"] = status["last_updated"]
+            status = projected
+        return _conditional(request, _json_bytes(status), etag)
 
     # ─── Simulated Drive ─────────────────────────────────────────────────────
     drive = get_drive(drive_id)
@@ -126,10 +189,33 @@ async def get_status(drive_id: str):
             detail=f"Drive '{drive_id}' not found. Available: DRIVE_A_HEALTHY, DRIVE_B_WARNING, DRIVE_C_CRITICAL, REAL_DRIVE"
         )
 
-    # Compute fresh prediction from stored SMART history
-    prediction = compute_health_score(drive["smart_history"])
+    # One encoded body per drive and projection
+    cache_key = (drive_id, "summary" if keys is SUMMARY_FIELDS else keys)
+    cached = _STATUS_BODIES.get(cache_key)
+    if cached is None:
+        status = _STATUS_PAYLOADS.get(drive_id)
+        if status is None:
+            status = _STATUS_PAYLOADS[drive_id] = await run_in_threadpool(_build_status, drive)
+        # Encoded body ends just before the closing brace; last_updated goes there
+        body = _json_bytes(_project_status(status, keys))[:-1]
+        cached = _STATUS_BODIES[cache_key] = (body, _etag(body))
+    body, etag = cached
 
-    return {
+    # The data never changes, so the ETag ignores the per-request timestamp
+    if _not_modified(request, etag):
+        return _conditional(request, b"", etag)
+    stamp = iso_now().encode()
+    return _conditional(request, body + b',"last_updated":"' + stamp + b'"}', etag)
+
+
+def _build_status(drive: Dict[str, Any]) -> Dict[str, Any]:
+    """Build a simulated drive's full status payload, minus last_updated."""
+    latest = drive["smart_history"][-1] if drive["smart_history"] else {}
+    prediction = compute_health_score_arr(
+        get_smart_matrix(drive["drive_id"]), [latest.get(attr, 0) for attr in HISTORY_COLUMNS]
+    )
+
+    status = {
         "drive_id": drive["drive_id"],
         "name": drive["name"],
         "model": drive["model"],
@@ -151,7 +237,86 @@ async def get_status(drive_id: str):
         "optimization_active": drive["optimization_active"],
         "write_reduction": drive["write_reduction"],
         "life_extended_days": drive["life_extended_days"],
-        "last_updated": datetime.utcnow().isoformat() + "Z",
+    }
+    return status
+
+
+# ─── Real Drive (TTL-cached) ──────────────────────────────────────────────────
+# Each refresh shells out to smartctl, so polling clients share one reading
+# per REAL_STATUS_TTL_S window.
+
+REAL_STATUS_TTL_S = 30
+
+_real_status: tuple = (0.0, None)     # (monotonic expiry, status dict)
+_real_status_lock = asyncio.Lock()
+
+
+async def _cached_real_status() -> Dict[str, Any]:
+    global _real_status
+    async with _real_status_lock:
+        expires, status = _real_status
+        if status is None or time.monotonic() >= expires:
+            status = await run_in_threadpool(_build_real_status)
+            _real_status = (time.monotonic() + REAL_STATUS_TTL_S, status)
+        return status
+
+
+def _build_real_status() -> Dict[str, Any]:
+    """Read the local drive's SMART data and build its /status payload."""
+    # 1. Fetch real SMART data
+    real_smart = get_smart_data_cached()  # Returns dict like {'smart_5': 0, ...} or None
+    
+    if not real_smart:
+       # Fallback if smartctl fails or not present
+       # For demo: Return a placeholder "Not Detected" state or similar
+       # But to avoid breaking frontend, we'll mimic a healthy drive but with a flag
+       real_smart = {"smart_5": 0, "smart_187": 0, "smart_197": 0, "smart_9": 100, "smart_194": 30}
+       
+    # 2. Construct history (Real-time often means we only have *current* point)
+    # We'll simulate a stable history by repeating current values
+    # In a full app, we'd query a database of past real readings.
+    smart_history = [real_smart] * 30 
+    
+    # 3. Compute Health — every row is identical, so one row gives the same result
+    prediction = compute_health_score(smart_history[:1])
+    
+    return {
+        "drive_id": "REAL_DRIVE",
+        "name": "Local Disk (Real-Time)",
+        "model": "Generic/Unknown",
+        "serial_number": "LOCAL-HW-001",
+        "capacity_gb": 1000, 
+        "health": {
+            "score": prediction["health_score"],
+            "risk_level": prediction["risk_level"],
+            "failure_probability": prediction["failure_probability"],
+            "days_to_failure": prediction["days_to_failure"],
+            "confidence_interval": prediction["confidence_interval"],
+        },
+        "prediction": prediction,
+        "smart_current": real_smart,
+        "smart_history": smart_history,
+        "health_history": [{"date": iso_now(), "score": prediction["health_score"]}], # data for chart
+        "compression": { # Mock compression stats for real drive
+            "total_files": 100000,
+            "compressed_files": 0,
+            "total_size_gb": 500,
+            "compressed_size_gb": 500,
+            "space_saved_gb": 0,
+            "by_file_type": [],
+            "write_ops_history": [],
+            "recommendations": []
+        },
+        "life_extension": {
+             "interventions": [],
+             "total_days_extended": 0,
+             "baseline_remaining_days": None,
+             "current_remaining_days": None
+        },
+        "optimization_active": False,
+        "write_reduction": 0.0,
+        "life_extended_days": 0,
+        "last_updated": iso_now(),
     }
 
 
@@ -168,6 +333,8 @@ class WhatIfRequest(BaseModel):
     smart_12: int = Field(0, ge=0, description="Power Cycle Count")
     write_reduction: float = Field(0.0, ge=0, le=1.0, description="Assumed write reduction rate")
 
+_WHATIF_NON_SMART = frozenset({"write_reduction"})
+
 
 @router.post("/whatif")
 async def what_if_simulation(request: WhatIfRequest):
@@ -175,18 +342,12 @@ async def what_if_simulation(request: WhatIfRequest):
     Run a what-if prediction with custom SMART attribute values.
     Returns predicted health score, failure probability, and life extension.
     """
-    smart_values = {
-        "smart_5": request.smart_5,
-        "smart_187": request.smart_187,
-        "smart_188": request.smart_188,
-        "smart_197": request.smart_197,
-        "smart_198": request.smart_198,
-        "smart_194": request.smart_194,
-        "smart_9": request.smart_9,
-        "smart_12": request.smart_12,
-    }
+    # Every field but write_reduction is a SMART attribute, in declaration order
+    smart_values = request.model_dump(exclude=_WHATIF_NON_SMART)
 
-    prediction = predict_with_scenario(smart_values)
+    # Off the event loop: with the model loaded this waits on the inference
+    # batcher, and concurrent what-ifs can only share a batch from threads
+    prediction = await run_in_threadpool(predict_with_scenario, smart_values)
 
     # Calculate life extension with the assumed write reduction
     life_ext = None
@@ -205,55 +366,61 @@ async def what_if_simulation(request: WhatIfRequest):
         "key_factors": prediction["key_factors"],
         "attribute_scores": prediction["attribute_scores"],
         "life_extension": life_ext,
-        "timestamp": datetime.utcnow().isoformat() + "Z",
+        "timestamp": iso_now(),
     }
 
 # ─── Report Generator (Hackathon Bonus) ────────────────────────────────────────
 
+# Used when the real drive can't be read in time for a report
+REPORT_STATUS_TIMEOUT_S = 0.5
+
+_REAL_DRIVE_REPORT_FALLBACK = {
+    "drive_id": "REAL_DRIVE",
+    "name": "Local Disk (Real-Time)",
+    "model": "Generic/Unknown",
+    "serial_number": "LOCAL-HW-001",
+    "capacity_gb": 1000, 
+    "health_score": 0, # Fallback
+    "risk_level": "Unknown",
+    "days_to_failure": None,
+    "smart_history": [{"smart_5": 0, "smart_187": 0, "smart_197": 0, "smart_9": 100, "smart_194": 30}]
+}
+
+
 @router.get("/report/{drive_id}")
 async def generate_report(drive_id: str):
     """
     Generate a health report for the drive (PDF).
     """
-    from fastapi.responses import StreamingResponse
     from utils.pdf_generator import generate_pdf_report
 
     # Get data
     if drive_id == "REAL_DRIVE":
-        # ... (reuse logic from get_status, but for brevity we'll call get_status internally if possible, 
-        # or just quick-fetch since we need specific dict format)
-        # For Hackathon speed, let's mock the "REAL_DRIVE" data fetch here similar to get_status
-        drive_data = {
-            "drive_id": "REAL_DRIVE",
-            "name": "Local Disk (Real-Time)",
-            "model": "Generic/Unknown",
-            "serial_number": "LOCAL-HW-001",
-            "capacity_gb": 1000, 
-            "health_score": 0, # Fallback
-            "risk_level": "Unknown",
-            "days_to_failure": None,
-            "smart_history": [{"smart_5": 0, "smart_187": 0, "smart_197": 0, "smart_9": 100, "smart_194": 30}]
-        }
-        # Try to get real status if possible
+        drive_data = dict(_REAL_DRIVE_REPORT_FALLBACK)
+        # Try to get real status if possible — shares the TTL-cached reading.
+        # shield() lets a slow smartctl run finish and fill the cache even when
+        # this report gives up waiting and uses the fallback.
         try:
-            status = await get_status(drive_id)
+            status = await asyncio.wait_for(
+                asyncio.shield(_cached_real_status()), timeout=REPORT_STATUS_TIMEOUT_S
+            )
             if status:
                 drive_data.update(status)
                 drive_data['health_score'] = status['health']['score']
                 drive_data['risk_level'] = status['health']['risk_level']
                 drive_data['days_to_failure'] = status['health']['days_to_failure']
-        except:
-            pass
+        except (asyncio.TimeoutError, OSError, subprocess.SubprocessError, KeyError) as e:
+            logger.warning(f"Real drive status unavailable for report, using fallback: {e!r}")
     else:
         drive_data = get_drive(drive_id)
         if not drive_data:
             raise HTTPException(status_code=404, detail="Drive not found")
 
-    # Generate PDF
-    pdf_buffer = generate_pdf_report(drive_data)
+    # Generate PDF — reportlab rendering is CPU-bound, keep it off the event loop
+    pdf_buffer = await run_in_threadpool(generate_pdf_report, drive_data)
     
-    return StreamingResponse(
-        pdf_buffer, 
+    return Response(
+        pdf_buffer.getvalue(),
         media_type="application/pdf",
         headers={"Content-Disposition": f"attachment; filename=SENTINEL_REPORT_{drive_id}.pdf"}
     )
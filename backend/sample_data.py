@@ -10,36 +10,84 @@ Each drive includes 30 days of SMART history, compression stats,
 and life extension timeline data.
 """
 
-import random
 import math
+import numpy as np
 from datetime import datetime, timedelta
 
-random.seed(42)
+from models.smart_columns import HISTORY_COLUMNS
+
+# One seeded generator for all demo data; every series is drawn in one call
+_RNG = np.random.default_rng(42)
 
 BASE_DATE = datetime(2026, 2, 20)
 
+# Chart dates / SMART timestamps for the 30-day histories (oldest first),
+# formatted once and shared by every drive
+_DATES30      = [(BASE_DATE - timedelta(days=29 - i)).isoformat()[:10] for i in range(30)]
+_TIMESTAMPS30 = [(BASE_DATE - timedelta(days=29 - i)).isoformat() + "Z" for i in range(30)]
+_DAY_IDX = np.arange(30)
+
+
+# Counters and hours are non-negative integers; temperature is clamped to
+# 20–65 °C with one decimal. Anything else is left as the raw float.
+_INT_ATTRS = frozenset(("smart_5", "smart_187", "smart_188", "smart_197", "smart_198", "smart_12", "smart_9"))
+_TEMP_ATTR = "smart_194"
+
 
 def _generate_smart_history(base_values, degradation_rates, days=30):
     """Generate realistic SMART history with gradual degradation and noise."""
+    attrs = list(base_values)
+    base  = np.array([base_values[a] for a in attrs], dtype=np.float64)
+    rate  = np.array([degradation_rates.get(a, 0) for a in attrs], dtype=np.float64)
+    sigma = np.maximum(0.5, np.abs(base * 0.02))
+
+    # (days, attrs): linear degradation plus one batch of Gaussian noise
+    values = base + rate * np.arange(days)[:, None] + _RNG.normal(0, sigma, (days, len(attrs)))
+
+    columns = {}
+    for j, attr in enumerate(attrs):
+        col = values[:, j]
+        if attr in _INT_ATTRS:
+            columns[attr] = np.maximum(0, np.rint(col)).astype(np.int64).tolist()
+        elif attr == _TEMP_ATTR:
+            columns[attr] = np.round(np.clip(col, 20, 65), 1).tolist()
+        else:
+            columns[attr] = col.tolist()
+
+    timestamps = _TIMESTAMPS30 if days == 30 else [
+        (BASE_DATE - timedelta(days=days - 1 - day)).isoformat() + "Z" for day in range(days)
+    ]
+
     history = []
     for day in range(days):
-        ts = (BASE_DATE - timedelta(days=days - 1 - day)).isoformat() + "Z"
-        entry = {"timestamp": ts}
-        for attr, base_val in base_values.items():
-            rate = degradation_rates.get(attr, 0)
-            noise = random.gauss(0, max(0.5, abs(base_val * 0.02)))
-            value = base_val + rate * day + noise
-            if attr in ("smart_5", "smart_187", "smart_188", "smart_197", "smart_198", "smart_12"):
-                value = max(0, int(round(value)))
-            elif attr == "smart_194":
-                value = round(max(20, min(65, value)), 1)
-            elif attr == "smart_9":
-                value = max(0, int(round(value)))
-            entry[attr] = value
+        entry = {"timestamp": timestamps[day]}
+        for attr in attrs:
+            entry[attr] = columns[attr][day]
         history.append(entry)
     return history
 
 
+def _daily_ints(low, high):
+    """One uniform integer in [low, high] per chart day."""
+    return _RNG.integers(low, high, size=30, endpoint=True)
+
+
+def _declining_health(start, low, high, floor=0.0):
+    """Daily health scores dropping by uniform(low, high) per day, clamped at floor."""
+    scores = np.maximum(floor, start - np.cumsum(_RNG.uniform(low, high, 30)))
+    return [
+        {"date": d, "score": score}
+        for d, score in zip(_DATES30, np.round(scores, 1).tolist())
+    ]
+
+
+def _write_ops_history(writes_before, writes_after):
+    return [
+        {"date": d, "writes_before": int(b), "writes_after": int(a)}
+        for d, b, a in zip(_DATES30, writes_before, writes_after)
+    ]
+
+
 # ─── Drive A: Healthy ─────────────────────────────────────────────────────────
 
 DRIVE_A = {
@@ -67,9 +115,8 @@ DRIVE_A = {
         }
     ),
     "health_history": [
-        {"date": (BASE_DATE - timedelta(days=29-i)).isoformat()[:10],
-         "score": round(93 + random.gauss(0, 0.5), 1)}
-        for i in range(30)
+        {"date": d, "score": score}
+        for d, score in zip(_DATES30, np.round(93 + _RNG.normal(0, 0.5, 30), 1).tolist())
     ],
     "compression_stats": {
         "total_files": 142350,
@@ -85,12 +132,10 @@ DRIVE_A = {
             {"type": "Databases", "original_gb": 52.3, "compressed_gb": 51.9, "saved_gb": 0.4},
             {"type": "Other", "original_gb": 288.5, "compressed_gb": 288.5, "saved_gb": 0.0}
         ],
-        "write_ops_history": [
-            {"date": (BASE_DATE - timedelta(days=29-i)).isoformat()[:10],
-             "writes_before": random.randint(8000, 12000),
-             "writes_after": random.randint(7500, 11500)}
-            for i in range(30)
-        ],
+        "write_ops_history": _write_ops_history(
+            _daily_ints(8000, 12000),
+            _daily_ints(7500, 11500),
+        ),
         "recommendations": [
             {"action": "Compress log files in /var/log", "potential_savings_gb": 8.2, "file_count": 340},
             {"action": "Optimize PNG images in ~/Photos", "potential_savings_gb": 2.1, "file_count": 1250},
@@ -107,14 +152,7 @@ DRIVE_A = {
 
 # ─── Drive B: Warning ─────────────────────────────────────────────────────────
 
-_drive_b_health = []
-_score_b = 75.0
-for i in range(30):
-    _score_b -= random.uniform(0.1, 0.4)
-    _drive_b_health.append({
-        "date": (BASE_DATE - timedelta(days=29-i)).isoformat()[:10],
-        "score": round(_score_b, 1)
-    })
+_drive_b_health = _declining_health(75.0, 0.1, 0.4)
 
 DRIVE_B = {
     "drive_id": "DRIVE_B_WARNING",
@@ -156,12 +194,10 @@ DRIVE_B = {
             {"type": "Databases", "original_gb": 145.0, "compressed_gb": 121.0, "saved_gb": 24.0},
             {"type": "Other", "original_gb": 112.0, "compressed_gb": 111.9, "saved_gb": 0.1}
         ],
-        "write_ops_history": [
-            {"date": (BASE_DATE - timedelta(days=29-i)).isoformat()[:10],
-             "writes_before": random.randint(15000, 22000),
-             "writes_after": random.randint(10000, 16000) if i > 14 else random.randint(14000, 21000)}
-            for i in range(30)
-        ],
+        "write_ops_history": _write_ops_history(
+            _daily_ints(15000, 22000),
+            np.where(_DAY_IDX > 14, _daily_ints(10000, 16000), _daily_ints(14000, 21000)),
+        ),
         "recommendations": [
             {"action": "Compress database dumps in /backups", "potential_savings_gb": 42.5, "file_count": 85},
             {"action": "Batch small writes in temp directories", "potential_savings_gb": 18.3, "file_count": 12400},
@@ -196,14 +232,7 @@ DRIVE_B = {
 
 # ─── Drive C: Critical ────────────────────────────────────────────────────────
 
-_drive_c_health = []
-_score_c = 58.0
-for i in range(30):
-    _score_c -= random.uniform(0.5, 1.2)
-    _drive_c_health.append({
-        "date": (BASE_DATE - timedelta(days=29-i)).isoformat()[:10],
-        "score": round(max(30, _score_c), 1)
-    })
+_drive_c_health = _declining_health(58.0, 0.5, 1.2, floor=30)
 
 DRIVE_C = {
     "drive_id": "DRIVE_C_CRITICAL",
@@ -246,12 +275,10 @@ DRIVE_C = {
             {"type": "Databases", "original_gb": 198.8, "compressed_gb": 52.5, "saved_gb": 146.3},
             {"type": "Other", "original_gb": 141.0, "compressed_gb": 40.0, "saved_gb": 101.0}
         ],
-        "write_ops_history": [
-            {"date": (BASE_DATE - timedelta(days=29-i)).isoformat()[:10],
-             "writes_before": random.randint(25000, 38000),
-             "writes_after": random.randint(10000, 18000) if i > 10 else random.randint(22000, 35000)}
-            for i in range(30)
-        ],
+        "write_ops_history": _write_ops_history(
+            _daily_ints(25000, 38000),
+            np.where(_DAY_IDX > 10, _daily_ints(10000, 18000), _daily_ints(22000, 35000)),
+        ),
         "recommendations": [
             {"action": "⚠️ URGENT: Backup all critical data immediately", "potential_savings_gb": 0, "file_count": 0},
             {"action": "Enable read-only mode for cold data partitions", "potential_savings_gb": 85.2, "file_count": 45000},
@@ -308,23 +335,48 @@ ALL_DRIVES = {
     "DRIVE_C_CRITICAL": DRIVE_C,
 }
 
+# The histories never change, so each drive's is also kept as the (days, 8)
+# matrix the health scorer consumes — no per-request dict → array conversion.
+# Kept apart from the drive dicts, which get_drive() hands on to JSON encoders.
+def _history_matrix(history: list) -> np.ndarray:
+    matrix = np.array(
+        [[entry.get(attr, 0) for attr in HISTORY_COLUMNS] for entry in history],
+        dtype=np.float64,
+    )
+    matrix.flags.writeable = False
+    return matrix
+
+
+_SMART_MATRICES = {
+    drive_id: _history_matrix(drive["smart_history"]) for drive_id, drive in ALL_DRIVES.items()
+}
+
 
 def get_drive(drive_id: str):
     """Get drive data by ID. Returns None if not found."""
     return ALL_DRIVES.get(drive_id)
 
 
+def get_smart_matrix(drive_id: str):
+    """Read-only (days, 8) SMART history matrix for a drive. None if not found."""
+    return _SMART_MATRICES.get(drive_id)
+
+
+# Drive selector summaries — static, so built once
+DRIVE_SUMMARIES = tuple(
+    {
+        "drive_id": d["drive_id"],
+        "name": d["name"],
+        "model": d["model"],
+        "capacity_gb": d["capacity_gb"],
+        "health_score": d["health_score"],
+        "risk_level": d["risk_level"],
+        "days_to_failure": d["days_to_failure"],
+    }
+    for d in ALL_DRIVES.values()
+)
+
+
 def get_all_drives_summary():
     """Get summary of all drives for the drive selector."""
-    return [
-        {
-            "drive_id": d["drive_id"],
-            "name": d["name"],
-            "model": d["model"],
-            "capacity_gb": d["capacity_gb"],
-            "health_score": d["health_score"],
-            "risk_level": d["risk_level"],
-            "days_to_failure": d["days_to_failure"],
-        }
-        for d in ALL_DRIVES.values()
-    ]
+    return [dict(s) for s in DRIVE_SUMMARIES]
@@ -1,67 +1,533 @@
+import ctypes
+import errno
+import functools
+import os
+import shutil
 import subprocess
 import json
 import logging
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from utils.smart_layouts import ATA_ATTR, ATA_TABLE, NVME_HEALTH
+
+try:
+    import fcntl                 # POSIX only; the ioctl path is Linux-only anyway
+except ImportError:
+    fcntl = None
 
 logger = logging.getLogger(__name__)
 
-def get_smart_data(device_path: str = "/dev/disk0"):
+# smartctl's JSON is decoded with orjson when available (bytes in, no str copy)
+try:
+    from orjson import loads as _json_loads
+except ImportError:
+    _json_loads = json.loads
+
+# ijson's C backend lets the smartctl path stream just the fields it maps
+# instead of materialising the whole document
+try:
+    import ijson
+    _ijson = ijson.get_backend("yajl2_c")
+    _JSON_ERRORS = (json.JSONDecodeError, ijson.JSONError)
+except ImportError:
+    _ijson = None
+    _JSON_ERRORS = (json.JSONDecodeError,)
+
+
+# smartctl's nvme_smart_health_information_log field → our SMART key
+# (NVMe has no ATA attribute IDs; simplified mapping for the demo)
+_NVME_FIELDS = {
+    "media_errors": "smart_5",
+    "temperature": "smart_194",
+    "power_on_hours": "smart_9",
+    "power_cycles": "smart_12",
+}
+_NVME_PREFIX = "nvme_smart_health_information_log."
+
+# 'smart_<id>' for every possible ATA attribute ID, built once
+_SMART_KEYS = tuple(sys.intern(f"smart_{i}") for i in range(256))
+
+
+# ─── Direct SMART reads (Linux ioctl) ─────────────────────────────────────────
+# Reading the 512-byte SMART page straight from the device skips forking
+# smartctl and decoding its JSON. Any OSError (no permission, not a SCSI/NVMe
+# node, unsupported pass-through) falls back to smartctl.
+
+SG_IO                = 0x2285
+SG_DXFER_FROM_DEV    = -3
+NVME_IOCTL_ADMIN_CMD = 0xC0484E41   # _IOWR('N', 0x41, struct nvme_passthru_cmd)
+
+
+class _SgIoHdr(ctypes.Structure):
+    """struct sg_io_hdr from <scsi/sg.h>."""
+    _fields_ = [
+        ("interface_id",    ctypes.c_int),
+        ("dxfer_direction", ctypes.c_int),
+        ("cmd_len",         ctypes.c_ubyte),
+        ("mx_sb_len",       ctypes.c_ubyte),
+        ("iovec_count",     ctypes.c_ushort),
+        ("dxfer_len",       ctypes.c_uint),
+        ("dxferp",          ctypes.c_void_p),
+        ("cmdp",            ctypes.c_void_p),
+        ("sbp",             ctypes.c_void_p),
+        ("timeout",         ctypes.c_uint),
+        ("flags",           ctypes.c_uint),
+        ("pack_id",         ctypes.c_int),
+        ("usr_ptr",         ctypes.c_void_p),
+        ("status",          ctypes.c_ubyte),
+        ("masked_status",   ctypes.c_ubyte),
+        ("msg_status",      ctypes.c_ubyte),
+        ("sb_len_wr",       ctypes.c_ubyte),
+        ("host_status",     ctypes.c_ushort),
+        ("driver_status",   ctypes.c_ushort),
+        ("resid",           ctypes.c_int),
+        ("duration",        ctypes.c_uint),
+        ("info",            ctypes.c_uint),
+    ]
+
+
+class _NvmePassthruCmd(ctypes.Structure):
+    """struct nvme_passthru_cmd from <linux/nvme_ioctl.h>."""
+    _fields_ = [
+        ("opcode",       ctypes.c_uint8),
+        ("flags",        ctypes.c_uint8),
+        ("rsvd1",        ctypes.c_uint16),
+        ("nsid",         ctypes.c_uint32),
+        ("cdw2",         ctypes.c_uint32),
+        ("cdw3",         ctypes.c_uint32),
+        ("metadata",     ctypes.c_uint64),
+        ("addr",         ctypes.c_uint64),
+        ("metadata_len", ctypes.c_uint32),
+        ("data_len",     ctypes.c_uint32),
+        ("cdw10",        ctypes.c_uint32),
+        ("cdw11",        ctypes.c_uint32),
+        ("cdw12",        ctypes.c_uint32),
+        ("cdw13",        ctypes.c_uint32),
+        ("cdw14",        ctypes.c_uint32),
+        ("cdw15",        ctypes.c_uint32),
+        ("timeout_ms",   ctypes.c_uint32),
+        ("result",       ctypes.c_uint32),
+    ]
+
+
+# ATA PASS-THROUGH(16): PIO data-in, one 512-byte block, SMART READ DATA
+_ATA_SMART_READ_CDB = bytes([
+    0x85, 4 << 1, 0x0E, 0x00, 0xD0, 0x00, 0x01, 0x00,
+    0x00, 0x00, 0x4F, 0x00, 0xC2, 0x00, 0xB0, 0x00,
+])
+
+
+def _read_ata_smart(fd: int) -> dict:
+    """SMART READ DATA over SG_IO; returns the raw 48-bit value of every attribute."""
+    data  = ctypes.create_string_buffer(512)
+    cdb   = ctypes.create_string_buffer(_ATA_SMART_READ_CDB, len(_ATA_SMART_READ_CDB))
+    sense = ctypes.create_string_buffer(32)
+
+    hdr = _SgIoHdr(
+        interface_id=ord("S"), dxfer_direction=SG_DXFER_FROM_DEV,
+        cmd_len=len(cdb), mx_sb_len=len(sense), dxfer_len=512,
+        dxferp=ctypes.addressof(data), cmdp=ctypes.addressof(cdb),
+        sbp=ctypes.addressof(sense), timeout=5000,
+    )
+    fcntl.ioctl(fd, SG_IO, hdr)
+    if hdr.status or hdr.host_status or hdr.driver_status & 0x0F:
+        raise OSError(errno.EIO, "ATA pass-through SMART READ DATA failed")
+
+    page = data.raw
+    if sum(page) & 0xFF:
+        raise OSError(errno.EIO, "SMART data checksum mismatch")
+
+    return decode_ata_attrs(page)
+
+
+def decode_ata_attrs(page: bytes) -> dict:
+    """Decode the 30-entry attribute table of a 512-byte SMART READ DATA page."""
+    return {
+        _SMART_KEYS[attr_id]: raw_lo | raw_hi << 32
+        for attr_id, _, _, _, raw_lo, raw_hi in ATA_ATTR.iter_unpack(page[ATA_TABLE])
+        if attr_id
+    }
+
+
+def _read_nvme_smart(fd: int) -> dict:
+    """Get Log Page (SMART / Health Information, LID 0x02) via the NVMe admin ioctl."""
+    log = ctypes.create_string_buffer(512)
+    cmd = _NvmePassthruCmd(
+        opcode=0x02, nsid=0xFFFFFFFF,
+        addr=ctypes.addressof(log), data_len=512,
+        cdw10=(512 // 4 - 1) << 16 | 0x02,
+    )
+    fcntl.ioctl(fd, NVME_IOCTL_ADMIN_CMD, cmd)
+
+    kelvin, power_cycles, power_on_hours, media_errors = NVME_HEALTH.unpack_from(log)
+    # Same mapping smartctl's nvme_smart_health_information_log gets
+    return {
+        "smart_5":   media_errors,
+        "smart_194": kelvin - 273,
+        "smart_9":   power_on_hours,
+        "smart_12":  power_cycles,
+    }
+
+
+def _read_smart_direct(device_path: str):
+    """Read SMART values with an ioctl, or None if this isn't a Linux block device."""
+    if fcntl is None or not sys.platform.startswith("linux"):
+        return None
+    fd = os.open(device_path, os.O_RDONLY | os.O_NONBLOCK)
+    try:
+        if os.path.basename(device_path).startswith("nvme"):
+            return _read_nvme_smart(fd)
+        return _read_ata_smart(fd)
+    finally:
+        os.close(fd)
+
+
+# ─── Cached entry point ───────────────────────────────────────────────────────
+# SMART counters move over minutes to hours, so reads within SMART_CACHE_TTL_S
+# of each other reuse the last result per device. Failed reads are remembered
+# for SMART_NEGATIVE_TTL_S so tight polling doesn't keep probing a dead path.
+
+DEFAULT_DEVICE       = "/dev/disk0"
+SMART_CACHE_TTL_S    = 60
+SMART_NEGATIVE_TTL_S = 5
+SMART_READ_WORKERS   = 8
+
+_cache = {}                      # device_path → (monotonic read time, smart values)
+_device_locks = {}               # device_path → Lock; one read in flight per device
+_locks_guard = threading.Lock()
+
+
+def _device_lock(device_path: str) -> threading.Lock:
+    with _locks_guard:
+        lock = _device_locks.get(device_path)
+        if lock is None:
+            lock = _device_locks[device_path] = threading.Lock()
+        return lock
+
+
+def get_smart_data(device_path: str = DEFAULT_DEVICE):
     """
-    Run smartctl to get SMART data from a local drive.
+    Read SMART data from a local drive — directly via ioctl on Linux,
+    otherwise (or if that fails) by running smartctl.
     Returns a dictionary of raw SMART values keyed by 'smart_X'.
     """
+    with _device_lock(device_path):
+        read_at, smart_values = _cache.get(device_path, (float("-inf"), None))
+        ttl = SMART_CACHE_TTL_S if smart_values is not None else SMART_NEGATIVE_TTL_S
+        if time.monotonic() - read_at >= ttl:
+            smart_values = _read_smart_data(device_path)
+            _cache[device_path] = (time.monotonic(), smart_values)
+    return dict(smart_values) if smart_values is not None else None
+
+
+def get_smart_data_many(device_paths: list) -> dict:
+    """
+    Read several drives concurrently; returns {device_path: smart values or None}.
+    Each device is read on its own thread, so N drives cost about one read's
+    latency instead of N.
+    """
+    paths = list(dict.fromkeys(device_paths))
+    if len(paths) <= 1:
+        return {path: get_smart_data(path) for path in paths}
+    # Reads wait on the drive or on smartctl, not the CPU
+    workers = min(len(paths), SMART_READ_WORKERS)
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="smart") as pool:
+        return dict(zip(paths, pool.map(get_smart_data, paths)))
+
+
+# ─── Background polling ───────────────────────────────────────────────────────
+# A poller re-reads a fixed set of devices on a timer and publishes the results
+# as one dict; get_smart_data_cached() is then a dict lookup instead of a read.
+
+class SmartPoller(threading.Thread):
+    """Daemon thread refreshing `snapshot` ({device_path: smart values or None})."""
+
+    def __init__(self, devices: list, interval: float = SMART_CACHE_TTL_S):
+        super().__init__(name="smart-poller", daemon=True)
+        self.devices  = list(dict.fromkeys(devices))
+        self.interval = interval
+        self.snapshot = {}
+        self._stopped = threading.Event()
+
+    def run(self):
+        while not self._stopped.is_set():
+            try:
+                # Swapped in whole, so readers never see a half-updated dict
+                self.snapshot = get_smart_data_many(self.devices)
+            except Exception as e:
+                logger.error(f"SMART poll failed: {e}")
+            self._stopped.wait(self.interval)
+
+    def stop(self):
+        self._stopped.set()
+
+
+_poller = None
+
+
+def start_polling(devices: list, interval: float = SMART_CACHE_TTL_S) -> SmartPoller:
+    """Start (or replace) the background poller for `devices`."""
+    global _poller
+    stop_polling()
+    _poller = SmartPoller(devices, interval)
+    _poller.start()
+    return _poller
+
+
+def stop_polling():
+    global _poller
+    if _poller is not None:
+        _poller.stop()
+        _poller = None
+
+
+def get_smart_data_cached(device_path: str = DEFAULT_DEVICE):
+    """
+    Latest polled SMART values for device_path; reads directly (through the
+    TTL cache) if the device isn't polled or has no successful reading yet.
+    """
+    poller = _poller
+    if poller is not None:
+        smart_values = poller.snapshot.get(device_path)
+        if smart_values is not None:
+            return dict(smart_values)
+    return get_smart_data(device_path)
+
+
+def cache_clear():
+    """Forget all cached SMART reads and the resolved smartctl path."""
+    _cache.clear()
+    _smartctl_path.cache_clear()
+
+
+get_smart_data.cache_clear = cache_clear
+
+
+# smartctl can't do better than our own open() when the node is missing or
+# unreadable, so these skip spawning it
+_UNREADABLE = (errno.ENOENT, errno.ENXIO, errno.EACCES, errno.EPERM)
+
+
+def _read_smart_data(device_path: str):
+    """Uncached read: ioctl first, smartctl as the fallback."""
     try:
-        # Check if smartctl exists
-        # In a real deployment, we'd ensure this path or use 'smartctl' from PATH
-        cmd = ["smartctl", "-j", "-a", device_path]
+        smart_values = _read_smart_direct(device_path)
+        if smart_values:
+            return smart_values
+    except OSError as e:
+        if e.errno in _UNREADABLE:
+            logger.error(f"Cannot read {device_path}: {e.strerror}")
+            return None
+        logger.debug(f"Direct SMART read failed for {device_path}, using smartctl: {e}")
+
+    # macOS smartctl goes through IOKit, so only check the node exists there
+    if sys.platform == "darwin" and not os.path.exists(device_path):
+        logger.error(f"Cannot read {device_path}: No such file or directory")
+        return None
+
+    return _get_smart_data_smartctl(device_path)
+
+
+# ─── smartctl JSON parsing ────────────────────────────────────────────────────
+# Each parser returns None when its section is absent. A device's type is
+# remembered after the first successful parse so later reads go straight to
+# its parser.
+
+def _parse_ata(data: dict):
+    attrs = data.get('ata_smart_attributes')
+    if attrs is None:
+        return None
+    smart_values = {}
+    for item in attrs['table']:
+        # smartctl always emits raw.value; the default only covers odd output
+        try:
+            raw = item['raw']['value']
+        except (KeyError, TypeError):
+            raw = 0
+        smart_values[_SMART_KEYS[item['id']]] = raw
+    return smart_values
+
+
+def _parse_nvme(data: dict):
+    # NVMe mapping (different IDs, simplified for demo)
+    nvme = data.get('nvme_smart_health_information_log')
+    if nvme is None:
+        return None
+    return {key: nvme.get(field, 0) for field, key in _NVME_FIELDS.items()}
+
+
+_PARSERS = {"ata": _parse_ata, "nvme": _parse_nvme}
+_device_types = {}    # device_path → key into _PARSERS
+
+
+def _parse_smartctl(device_path: str, data: dict) -> dict:
+    """Map smartctl's JSON to 'smart_X' keys (ATA attributes, else NVMe health log)."""
+    kind = _device_types.get(device_path)
+    if kind is not None:
+        smart_values = _PARSERS[kind](data)
+        if smart_values is not None:
+            return smart_values
+
+    for kind, parse in _PARSERS.items():
+        smart_values = parse(data)
+        if smart_values is not None:
+            _device_types[device_path] = kind
+            return smart_values
+    return {}
+
+
+# smartctl is run with posix_spawn and a bare pipe, skipping Popen's
+# bookkeeping and the stdin/stderr pipes subprocess.run would set up.
+# Platforms without posix_spawn (Windows) use Popen with the same redirects.
+
+if hasattr(os, "posix_spawn"):
+    def _spawn_smartctl(cmd: list):
+        """Start cmd with stdout on a pipe; returns (pid, binary stdout reader)."""
+        r, w = os.pipe()
+        try:
+            pid = os.posix_spawn(cmd[0], cmd, os.environ, file_actions=[
+                (os.POSIX_SPAWN_OPEN, 0, os.devnull, os.O_RDONLY, 0),
+                (os.POSIX_SPAWN_DUP2, w, 1),
+                (os.POSIX_SPAWN_OPEN, 2, os.devnull, os.O_WRONLY, 0),
+            ])
+        except BaseException:
+            os.close(r)
+            raise
+        finally:
+            os.close(w)
+        return pid, os.fdopen(r, "rb")
+
+    def _reap(pid) -> int:
+        return os.waitstatus_to_exitcode(os.waitpid(pid, 0)[1])
+else:
+    def _spawn_smartctl(cmd: list):
+        """Start cmd with stdout on a pipe; returns (process, binary stdout reader)."""
+        proc = subprocess.Popen(cmd, stdin=subprocess.DEVNULL,
+                                stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+        return proc, proc.stdout
+
+    def _reap(proc) -> int:
+        return proc.wait()
+
+
+# smartctl's exit code is a bitmask. Bits 0-1 (bad command line, device open
+# failed) mean the read itself went wrong; bit 2 is a failed SMART command;
+# bits 3-7 report the disk's own state (failing, thresholds, error/self-test
+# logs), which is normal on worn drives and already visible in the attributes.
+_SMARTCTL_FAILED  = 0x03
+_SMARTCTL_CMD_ERR = 0x04
+_SMARTCTL_STATUS  = 0xF8
+
+
+def _log_smartctl_exit(returncode: int):
+    if returncode & _SMARTCTL_FAILED:
+        logger.warning("smartctl command line / device open failure (exit %d)", returncode)
+    elif returncode & _SMARTCTL_CMD_ERR:
+        logger.info("smartctl: a SMART command failed (exit %d)", returncode)
+    elif returncode & _SMARTCTL_STATUS:
+        logger.info("smartctl disk status bits: %#x", returncode)
+
+
+@functools.lru_cache(maxsize=1)
+def _smartctl_path():
+    """Absolute path to smartctl, resolved once (None if not installed)."""
+    return shutil.which("smartctl")
+
+
+def _get_smart_data_smartctl(device_path: str):
+    """Run smartctl and map its JSON attributes to 'smart_X' keys."""
+    try:
+        # Resolved once so each call is a direct exec with no PATH walk, and
+        # hosts without smartmontools don't attempt a spawn on every poll
+        smartctl = _smartctl_path()
+        if smartctl is None:
+            raise FileNotFoundError("smartctl")
+
+        # -A prints only the attribute table (ATA) / health log (NVMe) — the
+        # parts _parse_smartctl maps — instead of -a's identify, self-test and error logs
+        cmd = [smartctl, "-j", "-A", device_path]
         
+        if _ijson is not None:
+            return _stream_smartctl(cmd)
+
         # Run command
-        result = subprocess.run(cmd, capture_output=True, text=True)
-        
-        if result.returncode != 0:
-            logger.warning(f"smartctl returned non-zero exit code: {result.returncode}")
-            # Smartctl returns bitmask exit codes, so non-zero isn't always fatal 
-            # but usually implies some issue or just "disk failing" status.
-            
-        output = result.stdout
+        child, stdout = _spawn_smartctl(cmd)
+        try:
+            with stdout:
+                output = stdout.read()
+        finally:
+            returncode = _reap(child)
+
+        _log_smartctl_exit(returncode)
+
         if not output:
              logger.error("smartctl returned no output")
              return None
 
-        data = json.loads(output)
-        
-        # Parse ATA SMART attributes
-        smart_values = {}
+        data = _json_loads(output)
         
-        # Handle different smartctl output formats (ATA vs NVMe)
-        # For this MVP, we focus on ATA/SATA attributes as defined in our model
-        if 'ata_smart_attributes' in data:
-            table = data['ata_smart_attributes']['table']
-            for item in table:
-                id_ = item.get('id')
-                raw = item.get('raw', {}).get('value', 0)
-                smart_values[f"smart_{id_}"] = raw
-        
-        elif 'nvme_smart_health_information_log' in data:
-            # NVMe mapping (different IDs, simplified for demo)
-            nvme = data['nvme_smart_health_information_log']
-            smart_values['smart_5'] = nvme.get('media_errors', 0)
-            smart_values['smart_194'] = nvme.get('temperature', 0)
-            smart_values['smart_9'] = nvme.get('power_on_hours', 0)
-            smart_values['smart_12'] = nvme.get('power_cycles', 0)
-            # Map others if possible or leave 0
-            
-        return smart_values
+        return _parse_smartctl(device_path, data)
 
     except FileNotFoundError:
         logger.error("smartctl not found. Please install smartmontools.")
         return None
-    except json.JSONDecodeError:
+    except _JSON_ERRORS:
         logger.error("Failed to decode smartctl JSON output.")
         return None
     except Exception as e:
         logger.error(f"Error running smartctl: {e}")
         return None
 
+def _stream_smartctl(cmd: list):
+    """
+    Same mapping as the json.loads path, but pulls only the ATA attribute
+    table and the four NVMe health fields out of smartctl's stdout as it
+    is parsed; nothing else in the document is turned into Python objects.
+    """
+    child, stdout = _spawn_smartctl(cmd)
+    try:
+        with stdout:
+            smart_values = _map_smartctl_events(_ijson.parse(stdout)) if stdout.peek(1) else None
+    finally:
+        returncode = _reap(child)
+
+    if smart_values is None:
+        logger.error("smartctl returned no output")
+        return None
+    _log_smartctl_exit(returncode)
+    return smart_values
+
+
+def _map_smartctl_events(events) -> dict:
+    """Build 'smart_X' values from ijson (prefix, event, value) parse events."""
+    ata = nvme = None
+    attr_id = None
+    for prefix, event, value in events:
+        if prefix == "ata_smart_attributes.table.item.id":
+            attr_id = value
+            ata[_SMART_KEYS[attr_id]] = 0     # as _parse_ata, for an entry without raw.value
+        elif prefix == "ata_smart_attributes.table.item.raw.value":
+            ata[_SMART_KEYS[attr_id]] = value
+        elif prefix.startswith(_NVME_PREFIX):
+            key = _NVME_FIELDS.get(prefix[len(_NVME_PREFIX):])
+            if key and nvme is not None:
+                nvme[key] = value
+        elif event == "start_map":
+            if prefix == "ata_smart_attributes":
+                ata = {}
+            elif prefix == "nvme_smart_health_information_log":
+                nvme = {}
+
+    if ata is not None:
+        return ata
+    if nvme is not None:
+        return {key: nvme.get(key, 0) for key in _NVME_FIELDS.values()}
+    return {}
+
+
 if __name__ == "__main__":
     # Test run
     data = get_smart_data()
@@ -1,12 +1,270 @@
+import asyncio
+import copy
+import functools
+from collections import OrderedDict
+import ctypes
+import ctypes.wintypes as wintypes
 import subprocess
 import json
+import locale
+import os
 import platform
+import plistlib
 import re
+import signal
+import sys
+import threading
 import time
+import zlib
 from datetime import datetime, timedelta
 from typing import Optional, List, Dict
-import random
 import math
+import numpy as np
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError as FuturesTimeout
+
+from utils.smart_layouts import ATA_ATTR, ATA_ATTR_COUNT, NVME_HEALTH
+
+# JSON from smartctl is read as raw bytes and decoded with orjson
+# when available — no intermediate str. Its stderr is never used, so it goes
+# to DEVNULL and only stdout is piped (one reader, not two)
+try:
+    from orjson import loads as _json_loads
+except ImportError:
+    _json_loads = json.loads
+
+# psutil — only to scale the history cache TTL under memory pressure
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+# pywin32 (Windows only) — WMI over COM for Layers 2 and 4
+try:
+    import pythoncom
+    import win32com.client
+except ImportError:
+    pythoncom = None
+
+# _find_smartctl_windows hasn't looked yet (None means it looked and found nothing)
+_NOT_PROBED = object()
+
+# subprocess.run options for the Windows-only tools (smartctl.exe, wmic): no
+# console window flashes up per call. close_fds stays at its default (True) —
+# the per-disk reads run concurrently, and inheritable pipe handles would leak
+# between the sibling children
+_WIN_RUN_KW = {"creationflags": getattr(subprocess, "CREATE_NO_WINDOW", 0)}
+
+# Bounded waits for Windows Layers 2-4 (which run side by side): a cold WMI
+# repository or a stuck IOCTL fails that layer instead of stalling the whole scan
+WIN_IOCTL_TIMEOUT_S = 1.5
+WIN_WMI_TIMEOUT_S   = 5.0
+# Shared by every scan; a layer that timed out keeps its worker until it returns
+_WIN_LAYER_POOL = ThreadPoolExecutor(max_workers=4, thread_name_prefix="smart-win-layer")
+
+# wbemFlagReturnImmediately | wbemFlagForwardOnly: WMI rows stream to the
+# caller as they are produced instead of being buffered into a rewindable set
+_WBEM_FORWARD_STREAM = 0x10 | 0x20
+
+# Win32_DiskDrive columns Layer 4 reads from each row, with their defaults
+_WMIC_FIELDS = (
+    ("deviceid",      ""),
+    ("model",         "Unknown"),
+    ("serialnumber",  "Unknown"),
+    ("interfacetype", "Unknown"),
+    ("size",          "0"),
+)
+
+# Whole-disk identifiers from `diskutil list` (disk0, disk1...), not partitions (disk0s1)
+_MACOS_DISK_RE = re.compile(r"^disk\d+$")
+
+# smartctl invocation for one device: attributes + health verdict as JSON.
+# -n standby: a spun-down disk is reported as such instead of being woken up
+_SMARTCTL_READ = ["smartctl", "-n", "standby", "-A", "-H", "-j"]
+_SMARTCTL_TIMEOUT_S = 15    # per device; a hung disk costs this long, and only itself
+
+# smartctl's note when -n skipped the device ("Device is in STANDBY mode, exit(2)")
+_POWER_MODE_SKIP = re.compile(r"Device is in \w+ mode")
+
+# Up to this many disks are read by a single sh child looping over smartctl
+# (one spawn instead of N); larger arrays get one smartctl per disk in parallel.
+# Each read runs under timeout(1), so a hung disk gets its own separator (exit
+# 124) and the loop moves on to the next one
+SMARTCTL_BATCH_MAX = 4
+_SMARTCTL_BATCH_SCRIPT = (
+    f'for d; do timeout {_SMARTCTL_TIMEOUT_S} {" ".join(_SMARTCTL_READ)} "$d"; '
+    'printf "\\n===SEP=== %d\\n" $?; done'
+)
+# Overall deadline for a batch, on top of the per-device timeouts
+_SMARTCTL_BATCH_SLACK_S = 5
+_SMARTCTL_BATCH_SEP = re.compile(rb"^===SEP=== (\d+)\n", re.MULTILINE)
+
+# /sys/block entries that lsblk doesn't list as TYPE=disk (loop, rom, lvm/crypt, raid)
+_NON_DISK_PREFIXES = ("loop", "ram", "sr", "dm-", "md")
+
+
+def _read_sysfs(path: str) -> Optional[str]:
+    """Stripped contents of a sysfs attribute, None if the device doesn't have it."""
+    try:
+        with open(path) as f:
+            return f.read().strip()
+    except OSError:
+        return None
+
+
+def _lsblk_size(size_bytes: int) -> str:
+    """Human-readable size exactly as `lsblk -o SIZE` prints it (256G, 465.8G, 0B)."""
+    exp = 0
+    while exp < 60 and size_bytes >= 1 << (exp + 10):
+        exp += 10
+    whole, frac = size_bytes >> exp, size_bytes & ((1 << exp) - 1)
+    if frac:
+        # One decimal, rounded the way util-linux does it
+        frac = ((frac >> (exp - 10)) + 50) // 100
+        if frac == 10:
+            whole, frac = whole + 1, 0
+    suffix = "BKMGTPE"[exp // 10]
+    return f"{whole}.{frac}{suffix}" if frac else f"{whole}{suffix}"
+
+
+@functools.lru_cache(maxsize=128)
+def _history_seed(drive_id: str) -> int:
+    """Stable RNG seed for a drive's simulated history (crc32; hash() is salted per process)."""
+    return zlib.crc32(drive_id.encode("utf-8"))
+
+
+def _batch_timeout(device_paths: List[str]) -> float:
+    """Deadline for one batched smartctl child over device_paths."""
+    return _SMARTCTL_TIMEOUT_S * len(device_paths) + _SMARTCTL_BATCH_SLACK_S
+
+
+def _kill_process_group(pid: int):
+    """SIGKILL a child started with start_new_session and everything it spawned."""
+    try:
+        os.killpg(pid, signal.SIGKILL)
+    except ProcessLookupError:
+        pass
+
+
+def _run_process_group(cmd: List[str], timeout: float) -> tuple:
+    """
+    Run cmd in its own session; returns (returncode, stdout bytes). On timeout
+    the whole process group is killed, so no smartctl is left running under a
+    dead sh, and subprocess.TimeoutExpired.stdout holds everything read.
+    """
+    with subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL,
+                          start_new_session=True) as proc:
+        try:
+            stdout, _ = proc.communicate(timeout=timeout)
+        except subprocess.TimeoutExpired:
+            _kill_process_group(proc.pid)
+            stdout, _ = proc.communicate()
+            raise subprocess.TimeoutExpired(cmd, timeout, output=stdout) from None
+        return proc.returncode, stdout
+
+
+def _running_loop() -> Optional[asyncio.AbstractEventLoop]:
+    """The event loop running in this thread, None outside one."""
+    try:
+        return asyncio.get_running_loop()
+    except RuntimeError:
+        return None
+
+# ─── Windows Layer 3 (DeviceIoControl) definitions ───
+# Plain ctypes declarations, importable everywhere; only ctypes.windll is Windows-only
+
+GENERIC_READ = 0x80000000
+GENERIC_WRITE = 0x40000000
+FILE_SHARE_READ = 0x00000001
+FILE_SHARE_WRITE = 0x00000002
+OPEN_EXISTING = 3
+INVALID_HANDLE_VALUE = ctypes.c_void_p(-1).value
+
+# IOCTL codes
+IOCTL_STORAGE_QUERY_PROPERTY = 0x002D1400
+SMART_RCV_DRIVE_DATA = 0x0007C088
+
+# NVMe health log through IOCTL_STORAGE_QUERY_PROPERTY (winioctl.h enum values)
+StorageAdapterProtocolSpecificProperty = 49
+ProtocolTypeNvme = 3
+NVMeDataTypeLogPage = 2
+NVME_LOG_PAGE_HEALTH_INFO = 0x02
+NVME_HEALTH_LOG_SIZE = 512
+
+# QueryDosDeviceW(NULL, ...) lists every DOS device name, NUL-separated
+_DOS_DEVICE_BUF_CHARS = 65536
+_PHYSICAL_DRIVE_RE = re.compile(r"PhysicalDrive(\d+)")
+
+
+class STORAGE_PROPERTY_QUERY(ctypes.Structure):
+    _fields_ = [
+        ("PropertyId", ctypes.c_uint),     # 0 = StorageDeviceProperty
+        ("QueryType",  ctypes.c_uint),     # 0 = PropertyStandardQuery
+        ("AdditionalParameters", ctypes.c_ubyte * 1),
+    ]
+
+
+class STORAGE_DEVICE_DESCRIPTOR_HEADER(ctypes.Structure):
+    _fields_ = [
+        ("Version",               ctypes.c_uint),
+        ("Size",                  ctypes.c_uint),
+        ("DeviceType",            ctypes.c_ubyte),
+        ("DeviceTypeModifier",    ctypes.c_ubyte),
+        ("RemovableMedia",        ctypes.c_bool),
+        ("CommandQueueing",       ctypes.c_bool),
+        ("VendorIdOffset",        ctypes.c_uint),
+        ("ProductIdOffset",       ctypes.c_uint),
+        ("ProductRevisionOffset", ctypes.c_uint),
+        ("SerialNumberOffset",    ctypes.c_uint),
+        ("BusType",               ctypes.c_uint),
+        ("RawPropertiesLength",   ctypes.c_uint),
+    ]
+
+
+class STORAGE_PROTOCOL_SPECIFIC_DATA(ctypes.Structure):
+    _fields_ = [
+        ("ProtocolType",                 ctypes.c_uint),
+        ("DataType",                     ctypes.c_uint),
+        ("ProtocolDataRequestValue",     ctypes.c_uint),
+        ("ProtocolDataRequestSubValue",  ctypes.c_uint),
+        ("ProtocolDataOffset",           ctypes.c_uint),   # from the start of this struct
+        ("ProtocolDataLength",           ctypes.c_uint),
+        ("FixedProtocolReturnData",      ctypes.c_uint),
+        ("ProtocolDataRequestSubValue2", ctypes.c_uint),
+        ("ProtocolDataRequestSubValue3", ctypes.c_uint),
+        ("ProtocolDataRequestSubValue4", ctypes.c_uint),
+    ]
+
+
+class NVME_HEALTH_QUERY(ctypes.Structure):
+    # In: STORAGE_PROPERTY_QUERY + protocol request. Out, in the same buffer:
+    # STORAGE_PROTOCOL_DATA_DESCRIPTOR (Version, Size, protocol data) + the log
+    _fields_ = [
+        ("PropertyId",       ctypes.c_uint),
+        ("QueryType",        ctypes.c_uint),
+        ("ProtocolSpecific", STORAGE_PROTOCOL_SPECIFIC_DATA),
+        ("Log",              ctypes.c_ubyte * NVME_HEALTH_LOG_SIZE),
+    ]
+
+
+# SENDCMDINPARAMS structure (from Windows SDK)
+class SENDCMDINPARAMS(ctypes.Structure):
+    _fields_ = [
+        ("cBufferSize",  ctypes.c_ulong),
+        ("irDriveRegs",  ctypes.c_ubyte * 8),
+        ("bDriveNumber", ctypes.c_ubyte),
+        ("bReserved",    ctypes.c_ubyte * 3),
+        ("dwReserved",   ctypes.c_ulong * 4),
+        ("bBuffer",      ctypes.c_ubyte * 1),
+    ]
+
+
+# Layouts are fixed, so size them once rather than on every IOCTL
+_PROPERTY_QUERY_SIZE = ctypes.sizeof(STORAGE_PROPERTY_QUERY)
+_PROTOCOL_DATA_SIZE  = ctypes.sizeof(STORAGE_PROTOCOL_SPECIFIC_DATA)
+_NVME_QUERY_SIZE     = ctypes.sizeof(NVME_HEALTH_QUERY)
+_NVME_PROTOCOL_BASE  = NVME_HEALTH_QUERY.ProtocolSpecific.offset
+_SENDCMD_SIZE        = ctypes.sizeof(SENDCMDINPARAMS)
+
 
 class SMARTReader:
     """
@@ -31,15 +289,150 @@ class SMARTReader:
         9:   {"name": "Power-On Hours",                 "threshold": 50000, "unit": "hours"},
         12:  {"name": "Power Cycle Count",              "threshold": 5000,  "unit": "count"},
     }
+    # Membership set for the attribute-table loops
+    CRITICAL_IDS = frozenset(CRITICAL_ATTRIBUTES)
+    # Interned "smart_N" keys, so decoding doesn't format a new string per attribute
+    SMART_KEYS = {attr_id: sys.intern(f"smart_{attr_id}") for attr_id in CRITICAL_ATTRIBUTES}
     
-    def get_all_drives(self, forced_mode: str = "auto") -> List[Dict]:
+    def __init__(self, cache_ttl: float = 120):
+        # Real-drive scans shell out to diskutil/smartctl for every disk,
+        # and each SMART query stalls an HDD's I/O queue, so polls within
+        # cache_ttl seconds reuse the previous scan
+        self._cache_ttl  = cache_ttl
+        self._cache      = None     # (monotonic scan time, drives)
+        self._cache_lock = threading.Lock()
+        # Singleflight: a scan in progress that concurrent callers (sync or
+        # async) wait on instead of starting a second smartctl fan-out
+        self._inflight   = None     # Future of the running scan
+        self._inflight_loop = None  # event loop an async owner runs it on, else None
+        self._drive_index_cache = None  # (scanned drives list, {drive_id: drive})
+        self._smartctl_win_path = _NOT_PROBED   # None once probed and not found
+        # WMI connections, kept per thread: COM objects belong to the apartment
+        # of the thread that created them
+        self._wmi = threading.local()
+        # Demo history per (drive_id, days) → (time.time() cached, history), LRU order
+        self._history_cache = OrderedDict()
+        self._history_lock  = threading.Lock()
+
+    def get_all_drives(self, forced_mode: str = "auto", refresh: bool = False) -> List[Dict]:
         """Returns list of all drives with their SMART data"""
         
         # Force simulation if requested by settings
         if forced_mode == "simulated":
             print("[SMARTReader] Forced simulation mode active")
             return self._get_simulated_drives()
-            
+
+        # Callers annotate the drive dicts they get back
+        return copy.deepcopy(self._scanned_drives(refresh))
+
+    def _scanned_drives(self, refresh: bool = False) -> List[Dict]:
+        """The shared (uncopied) result of the last scan, scanning if it is stale"""
+        drives = self._cached_drives(refresh)
+        if drives is None:
+            scan, owner, scan_loop = self._join_scan()
+            if owner:
+                try:
+                    self._finish_scan(scan, self._detect_drives())
+                except BaseException as e:
+                    self._finish_scan(scan, error=e)
+                    raise
+            elif scan_loop is not None and scan_loop is _running_loop():
+                # A sync call from a handler on the loop an async owner needs
+                # to finish its scan: blocking on the future would never
+                # return. Serve the previous scan, or scan privately if none
+                cached = self._cache
+                return cached[1] if cached is not None else self._detect_drives()
+            drives = scan.result()
+        return drives
+
+    def _drive_index(self) -> Dict[str, Dict]:
+        """drive_id → drive for the current scan; read-only, rebuilt only when a new scan lands"""
+        drives = self._scanned_drives()
+        index = self._drive_index_cache
+        if index is None or index[0] is not drives:
+            index = self._drive_index_cache = (drives, {d["drive_id"]: d for d in drives})
+        return index[1]
+
+    async def get_all_drives_async(self, forced_mode: str = "auto", refresh: bool = False) -> List[Dict]:
+        """
+        Awaitable get_all_drives for the API handlers. Shares the same scan
+        cache; on Linux a cache miss runs the smartctl reads as asyncio
+        subprocesses gathered together, elsewhere the blocking scan runs in a
+        worker thread so the event loop keeps serving requests meanwhile.
+        """
+        if forced_mode == "simulated":
+            print("[SMARTReader] Forced simulation mode active")
+            return self._get_simulated_drives()
+
+        drives = self._cached_drives(refresh)
+        if drives is None:
+            scan, owner, _ = self._join_scan(asyncio.get_running_loop())
+            if owner:
+                try:
+                    if platform.system() == "Linux":
+                        print("[SMARTReader] Detecting drives on Linux...")
+                        self._finish_scan(scan, await self._get_drives_linux_async())
+                    else:
+                        self._finish_scan(scan, await asyncio.to_thread(self._detect_drives))
+                except BaseException as e:
+                    self._finish_scan(scan, error=e)
+                    raise
+            drives = await asyncio.wrap_future(scan)
+        return copy.deepcopy(drives)
+
+    def _cached_drives(self, refresh: bool) -> Optional[List[Dict]]:
+        """Drives from the last scan while it is within cache_ttl, else None"""
+        cached = self._cache
+        if refresh or cached is None or time.monotonic() - cached[0] >= self._cache_ttl:
+            return None
+        return cached[1]
+
+    def _join_scan(self, loop: Optional[asyncio.AbstractEventLoop] = None):
+        """
+        (scan future, True if this caller must run the scan and finish it,
+        loop the owner runs it on). loop is the caller's event loop when it
+        is an async caller, recorded for callers that join its scan.
+        """
+        with self._cache_lock:
+            if self._inflight is not None:
+                return self._inflight, False, self._inflight_loop
+            self._inflight = Future()
+            self._inflight_loop = loop
+            return self._inflight, True, loop
+
+    def _finish_scan(self, scan: Future, drives: Optional[List[Dict]] = None, error: BaseException = None):
+        """Publish the owner's scan result (or failure) to the cache and every waiter"""
+        if error is None:
+            drives = self._keep_last_readings(drives)
+        with self._cache_lock:
+            if error is None:
+                self._cache = (time.monotonic(), drives)
+            self._inflight = None
+            self._inflight_loop = None
+        if error is None:
+            scan.set_result(drives)
+        else:
+            scan.set_exception(error)
+
+    def _keep_last_readings(self, drives: List[Dict]) -> List[Dict]:
+        """
+        drives with each standby placeholder replaced by that drive's last real
+        reading (flagged standby), so a sleeping disk keeps its attributes
+        instead of scoring as a blank, healthy one
+        """
+        if self._cache is None or not any(d.get("standby") for d in drives):
+            return drives
+        previous = {d["drive_id"]: d for d in self._cache[1]}
+        kept = []
+        for drive in drives:
+            last = previous.get(drive["drive_id"]) if drive.get("standby") else None
+            if last is not None and last["smart_values"]:
+                drive = {**last, "standby": True}
+            kept.append(drive)
+        return kept
+
+    def _detect_drives(self) -> List[Dict]:
+        """Uncached scan of the drives on this platform."""
         system = platform.system()
         
         print(f"[SMARTReader] Detecting drives on {system}...")
@@ -54,32 +447,45 @@ class SMARTReader:
             print("[SMARTReader] Unknown system, using simulated data")
             return self._get_simulated_drives()
     
+    def _scan_devices_parallel(self, device_paths: List[str], reader_fn, max_workers: int = 8) -> List:
+        """
+        Call reader_fn(path) for every device concurrently (each call mostly
+        waits on a subprocess / the drive). Results come back in input order;
+        a reader that raises yields None for its device only.
+        """
+        if not device_paths:
+            return []
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(device_paths))) as pool:
+            futures = [pool.submit(reader_fn, path) for path in device_paths]
+            results = []
+            for path, future in zip(device_paths, futures):
+                try:
+                    results.append(future.result())
+                except Exception as e:
+                    print(f"[SMARTReader] read failed for {path}: {e}")
+                    results.append(None)
+            return results
+
     def _get_drives_linux(self) -> List[Dict]:
         """Read drives on Linux using smartctl"""
         drives = []
         
         try:
             # Find all block devices
-            result = subprocess.run(
-                ["lsblk", "-J", "-o", "NAME,TYPE,SIZE,MODEL"],
-                capture_output=True, text=True, timeout=10
-            )
-            
-            if result.returncode != 0:
-                print("[SMARTReader] lsblk failed, using simulated data")
-                return self._get_simulated_drives()
-            
-            devices = json.loads(result.stdout)
-            
-            for device in devices.get("blockdevices", []):
-                if device.get("type") == "disk":
-                    drive_path = f"/dev/{device['name']}"
-                    smart_data = self._read_smartctl(drive_path)
-                    
-                    if smart_data:
-                        smart_data["model"] = device.get("model", "Unknown Drive")
-                        smart_data["size"] = device.get("size", "Unknown")
-                        drives.append(smart_data)
+            disks = self._list_block_disks()
+
+            # One child for a few disks; past that, one smartctl per disk side by side
+            paths = [f"/dev/{device['name']}" for device in disks]
+            if len(paths) <= SMARTCTL_BATCH_MAX:
+                readings = self._read_smartctl_batch(paths)
+            else:
+                readings = self._scan_devices_parallel(paths, self._read_smartctl)
+
+            for device, smart_data in zip(disks, readings):
+                if smart_data:
+                    smart_data["model"] = device.get("model", "Unknown Drive")
+                    smart_data["size"] = device.get("size", "Unknown")
+                    drives.append(smart_data)
         
         except Exception as e:
             print(f"[SMARTReader] Linux drive detection failed: {e}")
@@ -87,42 +493,217 @@ class SMARTReader:
         
         return drives if drives else self._get_simulated_drives()
     
+    def _list_block_disks(self) -> List[Dict]:
+        """
+        Whole disks from /sys/block — what `lsblk -o NAME,TYPE,SIZE,MODEL`
+        reports for TYPE=disk, without spawning it. Same name/size strings,
+        same order (by device number); "model" only when the device has one.
+        """
+        disks = []
+        for entry in os.scandir("/sys/block"):
+            if entry.name.startswith(_NON_DISK_PREFIXES):
+                continue
+            sectors = _read_sysfs(f"{entry.path}/size")
+            if sectors is None:
+                continue
+            # size is always in 512-byte units, whatever the logical block size
+            disk = {"name": entry.name, "size": _lsblk_size(int(sectors) * 512)}
+            model = _read_sysfs(f"{entry.path}/device/model")
+            if model:
+                disk["model"] = model
+            major, _, minor = (_read_sysfs(f"{entry.path}/dev") or "0:0").partition(":")
+            disks.append(((int(major), int(minor)), disk))
+        disks.sort(key=lambda devno_disk: devno_disk[0])
+        return [disk for _, disk in disks]
+
     def _read_smartctl(self, device_path: str) -> Optional[Dict]:
         """Read SMART data for a specific device"""
         try:
             # Run smartctl with JSON output
             result = subprocess.run(
-                ["smartctl", "-A", "-H", "-j", device_path],
-                capture_output=True, text=True, timeout=15
+                _SMARTCTL_READ + [device_path],
+                stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, timeout=_SMARTCTL_TIMEOUT_S
             )
-            
-            data = json.loads(result.stdout)
-            
-            # Extract SMART attributes
-            smart_values = {}
-            
-            for attr in data.get("ata_smart_attributes", {}).get("table", []):
-                attr_id = attr.get("id")
-                if attr_id in self.CRITICAL_ATTRIBUTES:
-                    smart_values[f"smart_{attr_id}"] = attr.get("raw", {}).get("value", 0)
-            
-            # Get device info
-            smart_status = data.get("smart_status", {})
-            
-            return {
-                "drive_id": device_path.replace("/", "_"),
-                "device_path": device_path,
-                "model": data.get("model_name", "Unknown"),
-                "serial": data.get("serial_number", "Unknown"),
-                "smart_values": smart_values,
-                "smart_passed": smart_status.get("passed", True),
-                "timestamp": datetime.now().isoformat(),
-                "is_simulated": False
-            }
+            return self._parse_smartctl_output(device_path, result.stdout, result.returncode)
         
         except Exception as e:
             print(f"[SMARTReader] smartctl failed for {device_path}: {e}")
             return None
+
+    def _skipped_in_standby(self, returncode: int, data: Dict) -> bool:
+        """True when `-n standby` left the drive asleep (exit bit 1 is also 'open failed')"""
+        if not returncode & 0x02:
+            return False
+        messages = data.get("smartctl", {}).get("messages", [])
+        return any(_POWER_MODE_SKIP.search(message.get("string", "")) for message in messages)
+
+    def _standby_reading(self, drive_id: str, device_path: str) -> Dict:
+        """
+        Placeholder for a drive left spun down — no attributes, no verdict.
+        _finish_scan swaps in the drive's last real reading when there is one.
+        """
+        return {
+            "drive_id": drive_id,
+            "device_path": device_path,
+            "model": "Unknown",
+            "serial": "Unknown",
+            "smart_values": {},
+            "smart_passed": None,
+            "standby": True,
+            "timestamp": datetime.now().isoformat(),
+            "is_simulated": False
+        }
+
+    def _read_smartctl_batch(self, device_paths: List[str]) -> List[Optional[Dict]]:
+        """_read_smartctl for several devices from one sh child, in input order"""
+        if not device_paths:
+            return []
+        try:
+            _, stdout = _run_process_group(
+                ["sh", "-c", _SMARTCTL_BATCH_SCRIPT, "sh", *device_paths],
+                timeout=_batch_timeout(device_paths)
+            )
+        except subprocess.TimeoutExpired as e:
+            # Keep the devices that finished before the deadline
+            print(f"[SMARTReader] batched smartctl timed out: {e}")
+            stdout = e.stdout or b""
+        except Exception as e:
+            print(f"[SMARTReader] batched smartctl failed: {e}")
+            return [None] * len(device_paths)
+        return self._parse_smartctl_batch(device_paths, stdout)
+
+    def _parse_smartctl_batch(self, device_paths: List[str], stdout: bytes) -> List[Optional[Dict]]:
+        """Split batched smartctl output on its separator lines and parse each device's part"""
+        readings = []
+        start = 0
+        separators = _SMARTCTL_BATCH_SEP.finditer(stdout)
+        for device_path in device_paths:
+            separator = next(separators, None)
+            if separator is None:
+                readings.append(None)
+                continue
+            try:
+                readings.append(self._parse_smartctl_output(
+                    device_path, stdout[start:separator.start()], int(separator.group(1))
+                ))
+            except Exception as e:
+                print(f"[SMARTReader] smartctl failed for {device_path}: {e}")
+                readings.append(None)
+            start = separator.end()
+        return readings
+
+    def _parse_smartctl_output(self, device_path: str, stdout: bytes, returncode: int = 0) -> Dict:
+        """Build a drive dict from `smartctl -A -H -j` output"""
+        data = _json_loads(stdout)
+        if self._skipped_in_standby(returncode, data):
+            return self._standby_reading(device_path.replace("/", "_"), device_path)
+        
+        # Extract SMART attributes
+        smart_values = {}
+        critical = self.CRITICAL_IDS
+        smart_keys = self.SMART_KEYS
+        
+        for attr in data.get("ata_smart_attributes", {}).get("table", []):
+            attr_id = attr.get("id")
+            if attr_id in critical:
+                smart_values[smart_keys[attr_id]] = attr.get("raw", {}).get("value", 0)
+        
+        # Get device info
+        smart_status = data.get("smart_status", {})
+        
+        return {
+            "drive_id": device_path.replace("/", "_"),
+            "device_path": device_path,
+            "model": data.get("model_name", "Unknown"),
+            "serial": data.get("serial_number", "Unknown"),
+            "smart_values": smart_values,
+            "smart_passed": smart_status.get("passed", True),
+            "timestamp": datetime.now().isoformat(),
+            "is_simulated": False
+        }
+
+    # ─── Async Linux scan ───
+
+    async def _run_async(self, cmd: List[str], timeout: float) -> tuple:
+        """
+        Awaitable _run_process_group: (returncode, stdout bytes). On timeout
+        the process group is killed and subprocess.TimeoutExpired carries the
+        output read until then.
+        """
+        proc = await asyncio.create_subprocess_exec(
+            *cmd, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.DEVNULL,
+            start_new_session=True
+        )
+        chunks = []
+
+        async def drain():
+            while chunk := await proc.stdout.read(65536):
+                chunks.append(chunk)
+            await proc.wait()
+
+        try:
+            await asyncio.wait_for(drain(), timeout)
+        except asyncio.TimeoutError:
+            _kill_process_group(proc.pid)
+            chunks.append(await proc.stdout.read())
+            await proc.wait()
+            raise subprocess.TimeoutExpired(cmd, timeout, output=b"".join(chunks)) from None
+        return proc.returncode, b"".join(chunks)
+
+    async def _get_drives_linux_async(self) -> List[Dict]:
+        """_get_drives_linux with the smartctl reads awaited instead of blocking"""
+        drives = []
+
+        try:
+            # sysfs reads don't block long enough to be worth awaiting
+            disks = self._list_block_disks()
+
+            paths = [f"/dev/{device['name']}" for device in disks]
+            if len(paths) <= SMARTCTL_BATCH_MAX:
+                readings = await self._read_smartctl_batch_async(paths)
+            else:
+                readings = await asyncio.gather(*map(self._read_smartctl_async, paths))
+
+            for device, smart_data in zip(disks, readings):
+                if smart_data:
+                    smart_data["model"] = device.get("model", "Unknown Drive")
+                    smart_data["size"] = device.get("size", "Unknown")
+                    drives.append(smart_data)
+
+        except Exception as e:
+            print(f"[SMARTReader] Linux drive detection failed: {e}")
+            return self._get_simulated_drives()
+
+        return drives if drives else self._get_simulated_drives()
+
+    async def _read_smartctl_async(self, device_path: str) -> Optional[Dict]:
+        """Awaitable _read_smartctl; a timeout or failure affects only this device"""
+        try:
+            returncode, stdout = await self._run_async(
+                _SMARTCTL_READ + [device_path], timeout=_SMARTCTL_TIMEOUT_S
+            )
+            return self._parse_smartctl_output(device_path, stdout, returncode)
+
+        except Exception as e:
+            print(f"[SMARTReader] smartctl failed for {device_path}: {e}")
+            return None
+
+    async def _read_smartctl_batch_async(self, device_paths: List[str]) -> List[Optional[Dict]]:
+        """Awaitable _read_smartctl_batch"""
+        if not device_paths:
+            return []
+        try:
+            _, stdout = await self._run_async(
+                ["sh", "-c", _SMARTCTL_BATCH_SCRIPT, "sh", *device_paths],
+                timeout=_batch_timeout(device_paths)
+            )
+        except subprocess.TimeoutExpired as e:
+            print(f"[SMARTReader] batched smartctl timed out: {e}")
+            stdout = e.stdout or b""
+        except Exception as e:
+            print(f"[SMARTReader] batched smartctl failed: {e}")
+            return [None] * len(device_paths)
+        return self._parse_smartctl_batch(device_paths, stdout)
     
     def _get_drives_macos(self) -> List[Dict]:
         """
@@ -130,7 +711,6 @@ class SMARTReader:
         Opportunistically enriches with SMART data if available (requires root/smartctl).
         """
         drives = []
-        import plistlib
 
         try:
             # Get list of all disks
@@ -140,56 +720,26 @@ class SMARTReader:
             )
 
             if result.returncode != 0:
-                print(f"[SMARTReader] diskutil failed: {result.stderr}")
+                print(f"[SMARTReader] diskutil failed: {result.stderr.decode('utf-8', 'replace').strip()}")
                 return self._get_simulated_drives()
 
             plist = plistlib.loads(result.stdout)
             print(f"[SMARTReader DEBUG] Found {len(plist.get('AllDisksAndPartitions', []))} disks in plist")
 
+            disk_ids = []
             for disk in plist.get("AllDisksAndPartitions", []):
                 disk_id = disk.get("DeviceIdentifier", "")
                 print(f"[SMARTReader DEBUG] Checking disk: {disk_id}")
                 
                 # Filter for physical disks (disk0, disk1...) excluding partitions (s1, s2...)
-                # Regex: starts with "disk" followed by one or more digits, and ENDS there.
                 # This excludes "disk0s1", "disk2s2", etc.
-                if re.match(r"^disk\d+$", disk_id):
+                if _MACOS_DISK_RE.match(disk_id):
                     print(f"[SMARTReader DEBUG] -> Matched physical disk filter: {disk_id}")
-                    device_path = f"/dev/{disk_id}"
-                    
-                    # 1. Get base info via diskutil info (No root needed)
-                    base_info = self._get_diskutil_detailed_info(disk_id)
-                    if not base_info:
-                        print(f"[SMARTReader DEBUG] -> Failed to get base info for {disk_id}")
-                        continue
-
-                    # 2. Try to get SMART data (Root needed)
-                    smart_data = self._read_smartctl(device_path)
-                    
-                    if smart_data:
-                        # Merge SMART data with base info
-                        # Save the human-readable model first — smartctl may overwrite it with "Unknown"
-                        good_model = base_info.get("media_name") or base_info.get("model")
-                        base_info.update(smart_data)
-                        # Restore model if smartctl returned nothing useful (Apple Silicon without root)
-                        if base_info.get("model") in (None, "Unknown", "Unknown Model", ""):
-                            base_info["model"] = good_model or "Unknown Model"
-                        print(f"[SMARTReader DEBUG] -> SMART data obtained for {disk_id}")
-                    else:
-                        # SMART failed (permissions/missing). 
-                        # ADAPTATION: If it's an Apple drive, trust the OS "Success" from diskutil as a "Pass".
-                        is_apple = "APPLE" in base_info.get("model", "").upper() or "APPLE" in base_info.get("media_name", "").upper()
-                        
-                        if is_apple:
-                            base_info["smart_passed"] = True  # Verified by OS
-                            base_info["smart_values"] = {}    # No details, triggers "Apple Verified" UI
-                            print(f"[SMARTReader DEBUG] -> Apple Drive detected. Setting status to Verified (No Detail).")
-                        else:
-                            base_info["smart_passed"] = None  # Unknown
-                            base_info["smart_values"] = {}    # Triggers "Unavailable" UI
-                            print(f"[SMARTReader DEBUG] -> SMART data missing for {disk_id}, using fallback.")
-                    
-                    drives.append(base_info)
+                    disk_ids.append(disk_id)
+
+            # diskutil info + smartctl for every disk at once
+            readings = self._scan_devices_parallel(disk_ids, self._read_macos_disk)
+            drives = [base_info for base_info in readings if base_info]
         
         except Exception as e:
             print(f"[SMARTReader] macOS drive detection error: {e}")
@@ -204,13 +754,50 @@ class SMARTReader:
              print("[SMARTReader DEBUG] No drives found after filtering. Returning simulation.")
         return drives if drives else self._get_simulated_drives()
 
+    def _read_macos_disk(self, disk_id: str) -> Optional[Dict]:
+        """diskutil base info for one physical disk, enriched with SMART data when readable."""
+        device_path = f"/dev/{disk_id}"
+
+        # 1. Get base info via diskutil info (No root needed)
+        base_info = self._get_diskutil_detailed_info(disk_id)
+        if not base_info:
+            print(f"[SMARTReader DEBUG] -> Failed to get base info for {disk_id}")
+            return None
+
+        # 2. Try to get SMART data (Root needed)
+        smart_data = self._read_smartctl(device_path)
+
+        if smart_data:
+            # Merge SMART data with base info
+            # Save the human-readable model first — smartctl may overwrite it with "Unknown"
+            good_model = base_info.get("media_name") or base_info.get("model")
+            base_info.update(smart_data)
+            # Restore model if smartctl returned nothing useful (Apple Silicon without root)
+            if base_info.get("model") in (None, "Unknown", "Unknown Model", ""):
+                base_info["model"] = good_model or "Unknown Model"
+            print(f"[SMARTReader DEBUG] -> SMART data obtained for {disk_id}")
+        else:
+            # SMART failed (permissions/missing). 
+            # ADAPTATION: If it's an Apple drive, trust the OS "Success" from diskutil as a "Pass".
+            is_apple = "APPLE" in base_info.get("model", "").upper() or "APPLE" in base_info.get("media_name", "").upper()
+
+            if is_apple:
+                base_info["smart_passed"] = True  # Verified by OS
+                base_info["smart_values"] = {}    # No details, triggers "Apple Verified" UI
+                print(f"[SMARTReader DEBUG] -> Apple Drive detected. Setting status to Verified (No Detail).")
+            else:
+                base_info["smart_passed"] = None  # Unknown
+                base_info["smart_values"] = {}    # Triggers "Unavailable" UI
+                print(f"[SMARTReader DEBUG] -> SMART data missing for {disk_id}, using fallback.")
+
+        return base_info
+
     def _get_diskutil_detailed_info(self, disk_id: str) -> Optional[Dict]:
         """Get model, serial, size from diskutil info"""
         try:
-            import plistlib
             result = subprocess.run(
                 ["diskutil", "info", "-plist", disk_id],
-                capture_output=True, text=False, timeout=5
+                stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, timeout=5
             )
             if result.returncode != 0:
                 return None
@@ -267,33 +854,52 @@ class SMARTReader:
             print(f"[SMARTReader-Win] Layer 1 (smartctl.exe) succeeded: {len(drives)} drives")
             return drives
 
-        # ── Layer 2: Python WMI ──────────────────────────────────────────────
-        drives = self._try_wmi_windows()
-        if drives:
-            print(f"[SMARTReader-Win] Layer 2 (WMI) succeeded: {len(drives)} drives")
-            return drives
-
-        # ── Layer 3: ctypes + DeviceIoControl ───────────────────────────────
-        drives = self._try_ctypes_windows()
-        if drives:
-            print(f"[SMARTReader-Win] Layer 3 (ctypes DeviceIoControl) succeeded: {len(drives)} drives")
-            return drives
+        # ── Layers 2-4: started together, best successful one wins ───────────
+        # Each is slow in its own subsystem; run one after another, their
+        # timeouts added up
+        started = time.monotonic()
+        layers = [
+            ("Layer 2 (WMI)",                    self._try_wmi_windows,          WIN_WMI_TIMEOUT_S),
+            ("Layer 3 (ctypes DeviceIoControl)", self._try_ctypes_windows,       WIN_IOCTL_TIMEOUT_S),
+            ("Layer 4 (wmic basic)",             self._try_wmic_basic_windows,   WIN_WMI_TIMEOUT_S),
+        ]
+        futures = [_WIN_LAYER_POOL.submit(layer_fn) for _, layer_fn, _ in layers]
 
-        # ── Layer 4: wmic basic (always returns something real) ──────────────
-        drives = self._try_wmic_basic_windows()
-        if drives:
-            print(f"[SMARTReader-Win] Layer 4 (wmic basic) succeeded: {len(drives)} drives")
-            return drives
+        # Richest layer first: a lower one is only used when every layer above
+        # it failed, by which time its result is usually already in
+        for (name, layer_fn, timeout_s), future in zip(layers, futures):
+            drives = self._layer_result(future, layer_fn, started + timeout_s)
+            if drives:
+                print(f"[SMARTReader-Win] {name} succeeded: {len(drives)} drives")
+                return drives
 
         # Only arrive here if ALL 4 layers fail (extremely unlikely)
         print("[SMARTReader-Win] All layers failed, falling back to simulation.")
         return self._get_simulated_drives()
 
+    def _layer_result(self, future: Future, layer_fn, deadline: float) -> List[Dict]:
+        """Result of a Windows layer running on the shared pool; [] if it is still running at deadline (monotonic)."""
+        try:
+            return future.result(timeout=max(0.0, deadline - time.monotonic()))
+        except FuturesTimeout:
+            print(f"[SMARTReader-Win] {layer_fn.__name__} timed out, trying next layer")
+            return []
+
     # ─────────────────────────────────────────────────────────────────────────
     # LAYER 1 — smartctl.exe (Best: native Windows binary, JSON output)
     # ─────────────────────────────────────────────────────────────────────────
 
     def _find_smartctl_windows(self) -> Optional[str]:
+        """Location of smartctl.exe, probed once per reader (see rescan_binaries)."""
+        if self._smartctl_win_path is _NOT_PROBED:
+            self._smartctl_win_path = self._probe_smartctl_windows()
+        return self._smartctl_win_path
+
+    def rescan_binaries(self):
+        """Forget the located smartctl.exe, e.g. after smartmontools is installed."""
+        self._smartctl_win_path = _NOT_PROBED
+
+    def _probe_smartctl_windows(self) -> Optional[str]:
         """Find smartctl.exe on Windows — checks PATH and common install locations."""
         import shutil
         import os
@@ -334,31 +940,26 @@ class SMARTReader:
             # Scan for all drives
             scan_result = subprocess.run(
                 [smartctl_path, "--scan", "-j"],
-                capture_output=True, text=True, timeout=15,
-                creationflags=0x08000000  # CREATE_NO_WINDOW — no console flash
+                stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, timeout=15,
+                **_WIN_RUN_KW
             )
             if scan_result.returncode not in (0, 4, 64):  # smartctl exit codes
                 print(f"[SMARTReader-Win] Layer 1 scan failed (code {scan_result.returncode})")
                 return []
 
-            scan_data = json.loads(scan_result.stdout or '{"devices":[]}')
+            scan_data = _json_loads(scan_result.stdout or b'{"devices":[]}')
             devices = scan_data.get("devices", [])
 
             if not devices:
                 # Fallback: try common Windows device paths directly
                 devices = [{"name": f"/dev/pd{i}"} for i in range(4)]
 
-            drives = []
-            for device in devices:
-                device_name = device.get("name", "")
-                if not device_name:
-                    continue
-
-                data = self._read_smartctl_windows(smartctl_path, device_name)
-                if data:
-                    drives.append(data)
-
-            return drives
+            names = [device.get("name", "") for device in devices]
+            readings = self._scan_devices_parallel(
+                [name for name in names if name],
+                lambda name: self._read_smartctl_windows(smartctl_path, name),
+            )
+            return [data for data in readings if data]
 
         except json.JSONDecodeError as e:
             print(f"[SMARTReader-Win] Layer 1 JSON parse failed: {e}")
@@ -371,25 +972,31 @@ class SMARTReader:
         """Run smartctl for a specific Windows device and parse results."""
         try:
             result = subprocess.run(
-                [smartctl_path, "-A", "-H", "-i", "-j", device],
-                capture_output=True, text=True, timeout=20,
-                creationflags=0x08000000  # CREATE_NO_WINDOW
+                [smartctl_path, "-n", "standby", "-A", "-H", "-i", "-j", device],
+                stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, timeout=20,
+                **_WIN_RUN_KW
             )
 
             if not result.stdout.strip():
                 return None
 
-            data = json.loads(result.stdout)
+            data = _json_loads(result.stdout)
+            drive_id = device.replace("/", "_").replace("\\", "_").replace(".", "_").strip("_")
+
+            if self._skipped_in_standby(result.returncode, data):
+                return {**self._standby_reading(drive_id, device), "source": "smartctl_windows"}
 
             # Skip if it's not a real device
             if "device" not in data and "model_name" not in data:
                 return None
 
             smart_values = {}
+            critical = self.CRITICAL_IDS
+            smart_keys = self.SMART_KEYS
             for attr in data.get("ata_smart_attributes", {}).get("table", []):
                 attr_id = attr.get("id")
-                if attr_id in self.CRITICAL_ATTRIBUTES:
-                    smart_values[f"smart_{attr_id}"] = attr.get("raw", {}).get("value", 0)
+                if attr_id in critical:
+                    smart_values[smart_keys[attr_id]] = attr.get("raw", {}).get("value", 0)
 
             # NVMe uses different structure
             if not smart_values:
@@ -401,7 +1008,6 @@ class SMARTReader:
                     smart_values["smart_12"] = nvme.get("power_cycles", 0)
 
             smart_status = data.get("smart_status", {})
-            drive_id = device.replace("/", "_").replace("\\", "_").replace(".", "_").strip("_")
 
             # Get size from user_capacity if available
             capacity = data.get("user_capacity", {})
@@ -429,34 +1035,52 @@ class SMARTReader:
     # LAYER 2 — Python WMI (MSStorageDriver_FailurePredictData)
     # ─────────────────────────────────────────────────────────────────────────
 
+    def _wmi_services(self):
+        """
+        This thread's (root\\cimv2, root\\wmi) WMI connections. Connecting costs
+        a DCOM handshake, so they are reused across scans; callers reset
+        self._wmi.services to None after a failure to reconnect next time.
+        """
+        if getattr(self._wmi, "services", None) is None:
+            if not getattr(self._wmi, "com_initialized", False):
+                pythoncom.CoInitialize()
+                self._wmi.com_initialized = True
+            self._wmi.services = (
+                win32com.client.GetObject("winmgmts:root\\cimv2"),
+                win32com.client.GetObject("winmgmts:root\\wmi"),
+            )
+        return self._wmi.services
+
     def _try_wmi_windows(self) -> List[Dict]:
         """
-        Layer 2: WMI via Python `wmi` package (pywin32).
+        Layer 2: WMI queried through pywin32's COM client.
         - Win32_DiskDrive for drive enumeration + model/serial
         - MSSMARTStatus for SMART pass/fail
         - MSStorageDriver_FailurePredictData for raw SMART byte array
         - Requires: Administrator privileges + pywin32 installed
         """
-        try:
-            import wmi
-        except ImportError:
-            print("[SMARTReader-Win] Layer 2 skip: `wmi` package not installed (pip install pywin32)")
+        if pythoncom is None:
+            print("[SMARTReader-Win] Layer 2 skip: pywin32 not installed (pip install pywin32)")
             return []
 
         try:
-            c = wmi.WMI()
-            c_wmi = wmi.WMI(namespace="root\\wmi")
+            c, c_wmi = self._wmi_services()
             drives = []
 
             # Get all physical disks
-            disks = list(c.Win32_DiskDrive())
+            disks = list(c.ExecQuery(
+                "SELECT DeviceID, PNPDeviceID, Model, SerialNumber, FirmwareRevision, Size, InterfaceType "
+                "FROM Win32_DiskDrive", "WQL", _WBEM_FORWARD_STREAM
+            ))
             if not disks:
                 return []
 
             # Get SMART pass/fail status per disk
             smart_status_map = {}
             try:
-                for s in c_wmi.MSStorageDriver_ATAPISmartData():
+                for s in c_wmi.ExecQuery(
+                    "SELECT InstanceName FROM MSStorageDriver_ATAPISmartData", "WQL", _WBEM_FORWARD_STREAM
+                ):
                     # Map InstanceName to pass/fail
                     smart_status_map[s.InstanceName] = True  # presence = no failure predicted
             except Exception:
@@ -465,38 +1089,43 @@ class SMARTReader:
             # Get raw SMART attribute bytes per disk
             smart_data_map = {}
             try:
-                for item in c_wmi.MSStorageDriver_FailurePredictData():
+                for item in c_wmi.ExecQuery(
+                    "SELECT InstanceName, VendorSpecific FROM MSStorageDriver_FailurePredictData",
+                    "WQL", _WBEM_FORWARD_STREAM
+                ):
                     smart_data_map[item.InstanceName] = item.VendorSpecific
             except Exception as e:
                 print(f"[SMARTReader-Win] WMI SMART data query failed: {e}")
 
+            # InstanceName is the disk's PNPDeviceID plus an "_N" suffix; keep the
+            # normalized names as a fallback for drivers that don't follow that
+            pnp_data = {
+                (key.rsplit("_", 1)[0] if "_" in key else key).upper(): raw
+                for key, raw in smart_data_map.items()
+            }
+            normalized_data = [
+                (key.replace("\\", "").replace(".", ""), raw)
+                for key, raw in smart_data_map.items()
+            ]
+
             for disk in disks:
                 device_id = disk.DeviceID or ""
                 drive_id = device_id.replace("\\", "_").replace(".", "_").replace(" ", "").strip("_")
 
                 # Parse raw SMART bytes (30 attributes × 12 bytes each, starting at offset 2)
                 smart_values = {}
-                instance_key = None
-                for key in smart_data_map:
-                    if drive_id.replace("_", "") in key.replace("\\", "").replace(".", ""):
-                        instance_key = key
-                        break
-
-                if instance_key and smart_data_map[instance_key]:
-                    raw = smart_data_map[instance_key]
-                    for i in range(30):
-                        offset = 2 + (i * 12)
-                        if offset + 12 > len(raw):
-                            break
-                        attr_id = raw[offset]
-                        if attr_id == 0:
-                            continue
-                        if attr_id in self.CRITICAL_ATTRIBUTES:
-                            # Bytes 5-10 are the 6-byte raw value (little-endian)
-                            raw_value = int.from_bytes(
-                                bytes(raw[offset + 5: offset + 11]), 'little'
-                            )
-                            smart_values[f"smart_{attr_id}"] = raw_value
+                raw = pnp_data.get((disk.PNPDeviceID or "").upper())
+                if raw is None:
+                    needle = drive_id.replace("_", "")
+                    raw = next((raw for key, raw in normalized_data if needle in key), None)
+
+                if raw:
+                    # COM hands VendorSpecific over as a tuple of ints: one bytes
+                    # conversion, then a zero-copy view of the whole entries only
+                    # (a short blob just yields fewer attributes)
+                    blob = memoryview(bytes(raw))
+                    count = min(ATA_ATTR_COUNT, (len(blob) - 2) // ATA_ATTR.size)
+                    smart_values = self._critical_ata_values(blob[2:2 + count * ATA_ATTR.size])
 
                 if not smart_values:
                     smart_values = self._get_default_smart_values()
@@ -526,6 +1155,7 @@ class SMARTReader:
 
         except Exception as e:
             print(f"[SMARTReader-Win] Layer 2 (WMI) exception: {e}")
+            self._wmi.services = None
             return []
 
     # ─────────────────────────────────────────────────────────────────────────
@@ -535,170 +1165,142 @@ class SMARTReader:
     def _try_ctypes_windows(self) -> List[Dict]:
         r"""
         Layer 3: Direct Windows kernel API via ctypes.
-        - Opens \\.\PhysicalDriveN handles (tries 0-15)
+        - Opens every \\.\PhysicalDriveN listed by QueryDosDeviceW, in parallel
         - IOCTL_STORAGE_QUERY_PROPERTY → StorageDeviceProperty (model, serial, bus type)
         - SMART_RCV_DRIVE_DATA → raw SMART attribute table for HDDs/SSDs
         - NVMe: IOCTL_STORAGE_QUERY_PROPERTY with StorageAdapterProtocolSpecificProperty
         - Requires: Administrator privileges (CreateFile with GENERIC_READ needs admin)
         """
         try:
-            import ctypes
-            import ctypes.wintypes as wintypes
-        except ImportError:
-            print("[SMARTReader-Win] Layer 3 skip: ctypes unavailable")
+            kernel32 = ctypes.windll.kernel32
+        except AttributeError:
+            print("[SMARTReader-Win] Layer 3 skip: ctypes.windll unavailable")
             return []
 
-        kernel32 = ctypes.windll.kernel32
-        drives = []
-
-        # Windows constants
-        GENERIC_READ = 0x80000000
-        GENERIC_WRITE = 0x40000000
-        FILE_SHARE_READ = 0x00000001
-        FILE_SHARE_WRITE = 0x00000002
-        OPEN_EXISTING = 3
-        INVALID_HANDLE_VALUE = ctypes.c_void_p(-1).value
-
-        # IOCTL codes
-        IOCTL_STORAGE_QUERY_PROPERTY = 0x002D1400
-        SMART_RCV_DRIVE_DATA = 0x0007C088
-
-        class STORAGE_PROPERTY_QUERY(ctypes.Structure):
-            _fields_ = [
-                ("PropertyId", ctypes.c_uint),     # 0 = StorageDeviceProperty
-                ("QueryType",  ctypes.c_uint),     # 0 = PropertyStandardQuery
-                ("AdditionalParameters", ctypes.c_ubyte * 1),
-            ]
-
-        class STORAGE_DEVICE_DESCRIPTOR_HEADER(ctypes.Structure):
-            _fields_ = [
-                ("Version",               ctypes.c_uint),
-                ("Size",                  ctypes.c_uint),
-                ("DeviceType",            ctypes.c_ubyte),
-                ("DeviceTypeModifier",    ctypes.c_ubyte),
-                ("RemovableMedia",        ctypes.c_bool),
-                ("CommandQueueing",       ctypes.c_bool),
-                ("VendorIdOffset",        ctypes.c_uint),
-                ("ProductIdOffset",       ctypes.c_uint),
-                ("ProductRevisionOffset", ctypes.c_uint),
-                ("SerialNumberOffset",    ctypes.c_uint),
-                ("BusType",               ctypes.c_uint),
-                ("RawPropertiesLength",   ctypes.c_uint),
-            ]
-
-        for drive_num in range(16):
-            drive_path = f"\\\\.\\PhysicalDrive{drive_num}"
+        # Open only the PhysicalDriveN devices that exist, all at once — each
+        # probe ends in a SMART IOCTL that blocks on its own drive
+        drive_nums = self._list_physical_drives(kernel32)
+        probes = self._scan_devices_parallel(
+            drive_nums, lambda drive_num: self._probe_physical_drive(kernel32, drive_num)
+        )
+        return [drive for drive in probes if drive]
+
+    def _list_physical_drives(self, kernel32) -> List[int]:
+        """PhysicalDriveN numbers from the DOS device namespace (0-15 if that can't be read)."""
+        buf = ctypes.create_unicode_buffer(_DOS_DEVICE_BUF_CHARS)
+        length = kernel32.QueryDosDeviceW(None, buf, _DOS_DEVICE_BUF_CHARS)
+        if not length:
+            return list(range(16))
+        return sorted(
+            int(match.group(1))
+            for match in map(_PHYSICAL_DRIVE_RE.fullmatch, buf[:length].split("\0"))
+            if match
+        )
+
+    def _probe_physical_drive(self, kernel32, drive_num: int) -> Optional[Dict]:
+        r"""Descriptor + SMART read for one \\.\PhysicalDriveN; None if it can't be opened."""
+        drive_path = f"\\\\.\\PhysicalDrive{drive_num}"
+        handle = kernel32.CreateFileW(
+            drive_path,
+            GENERIC_READ | GENERIC_WRITE,
+            FILE_SHARE_READ | FILE_SHARE_WRITE,
+            None, OPEN_EXISTING, 0, None
+        )
+
+        if handle == INVALID_HANDLE_VALUE or handle is None:
+            # Drive doesn't exist or no access — try read-only
             handle = kernel32.CreateFileW(
-                drive_path,
-                GENERIC_READ | GENERIC_WRITE,
+                drive_path, GENERIC_READ,
                 FILE_SHARE_READ | FILE_SHARE_WRITE,
                 None, OPEN_EXISTING, 0, None
             )
-
             if handle == INVALID_HANDLE_VALUE or handle is None:
-                # Drive doesn't exist or no access — try read-only
-                handle = kernel32.CreateFileW(
-                    drive_path, GENERIC_READ,
-                    FILE_SHARE_READ | FILE_SHARE_WRITE,
-                    None, OPEN_EXISTING, 0, None
-                )
-                if handle == INVALID_HANDLE_VALUE or handle is None:
-                    break  # No more drives
-                read_only = True
-            else:
-                read_only = False
+                return None
+            read_only = True
+        else:
+            read_only = False
 
-            try:
-                # Query device properties (model, serial, bus type)
-                query = STORAGE_PROPERTY_QUERY()
-                query.PropertyId = 0   # StorageDeviceProperty
-                query.QueryType = 0    # PropertyStandardQuery
-
-                buf_size = 1024
-                buf = ctypes.create_string_buffer(buf_size)
-                bytes_returned = wintypes.DWORD(0)
-
-                success = kernel32.DeviceIoControl(
-                    handle,
-                    IOCTL_STORAGE_QUERY_PROPERTY,
-                    ctypes.byref(query), ctypes.sizeof(query),
-                    buf, buf_size,
-                    ctypes.byref(bytes_returned), None
-                )
+        try:
+            # Query device properties (model, serial, bus type)
+            query = STORAGE_PROPERTY_QUERY()
+            query.PropertyId = 0   # StorageDeviceProperty
+            query.QueryType = 0    # PropertyStandardQuery
 
-                if not success:
-                    continue
+            buf_size = 1024
+            buf = ctypes.create_string_buffer(buf_size)
+            bytes_returned = wintypes.DWORD(0)
 
-                # Parse the descriptor header to find string offsets
-                header = STORAGE_DEVICE_DESCRIPTOR_HEADER.from_buffer_copy(buf)
+            success = kernel32.DeviceIoControl(
+                handle,
+                IOCTL_STORAGE_QUERY_PROPERTY,
+                ctypes.byref(query), _PROPERTY_QUERY_SIZE,
+                buf, buf_size,
+                ctypes.byref(bytes_returned), None
+            )
 
-                def _read_string(offset):
-                    if offset == 0 or offset >= buf_size:
-                        return ""
-                    end = buf.raw.find(b'\x00', offset)
-                    if end < 0:
-                        end = buf_size
-                    return buf.raw[offset:end].decode('ascii', errors='replace').strip()
+            if not success:
+                return None
 
-                model = _read_string(header.ProductIdOffset)
-                serial = _read_string(header.SerialNumberOffset)
-                vendor = _read_string(header.VendorIdOffset)
+            # Parse the descriptor header to find string offsets
+            header = STORAGE_DEVICE_DESCRIPTOR_HEADER.from_buffer_copy(buf)
 
-                if vendor and model:
-                    model = f"{vendor} {model}".strip()
+            # One copy of the descriptor for all three string lookups
+            raw = buf.raw
 
-                # Bus types: 3=ATA, 7=USB, 11=SATA, 17=NVMe, 18=SCM
-                bus_type_map = {3: "ATA", 7: "USB", 11: "SATA", 17: "NVMe", 18: "SCM"}
-                bus_type = bus_type_map.get(header.BusType, f"Type{header.BusType}")
+            def _read_string(offset):
+                if offset == 0 or offset >= buf_size:
+                    return ""
+                end = raw.find(b'\x00', offset)
+                if end < 0:
+                    end = buf_size
+                return raw[offset:end].decode('ascii', errors='replace').strip()
 
-                # Query SMART data (ATA/SATA only — NVMe uses different IOCTL)
-                smart_values = {}
-                if not read_only and header.BusType in (3, 11):  # ATA or SATA
-                    smart_values = self._ctypes_read_ata_smart(kernel32, handle, SMART_RCV_DRIVE_DATA)
+            model = _read_string(header.ProductIdOffset)
+            serial = _read_string(header.SerialNumberOffset)
+            vendor = _read_string(header.VendorIdOffset)
 
-                if not smart_values:
-                    smart_values = self._get_default_smart_values()
+            if vendor and model:
+                model = f"{vendor} {model}".strip()
 
-                drive_id = f"PhysicalDrive{drive_num}"
-                drives.append({
-                    "drive_id": drive_id,
-                    "device_path": drive_path,
-                    "model": model or f"Disk {drive_num}",
-                    "serial": serial or "Unknown",
-                    "protocol": bus_type,
-                    "smart_values": smart_values,
-                    "smart_passed": True,  # ctypes layer can't easily get SMART pass/fail
-                    "timestamp": datetime.now().isoformat(),
-                    "is_simulated": False,
-                    "source": "ctypes_deviceiocontrol"
-                })
+            # Bus types: 3=ATA, 7=USB, 11=SATA, 17=NVMe, 18=SCM
+            bus_type_map = {3: "ATA", 7: "USB", 11: "SATA", 17: "NVMe", 18: "SCM"}
+            bus_type = bus_type_map.get(header.BusType, f"Type{header.BusType}")
 
-            except Exception as e:
-                print(f"[SMARTReader-Win] Layer 3 drive {drive_num} error: {e}")
-            finally:
-                kernel32.CloseHandle(handle)
+            # Query SMART data — ATA/SATA via SMART_RCV_DRIVE_DATA, NVMe via its health log
+            smart_values = {}
+            if not read_only and header.BusType in (3, 11):  # ATA or SATA
+                smart_values = self._ctypes_read_ata_smart(kernel32, handle, SMART_RCV_DRIVE_DATA)
+            elif not read_only and header.BusType == 17:     # NVMe
+                smart_values = self._ctypes_read_nvme_smart(kernel32, handle)
 
-        return drives
+            if not smart_values:
+                smart_values = self._get_default_smart_values()
+
+            drive_id = f"PhysicalDrive{drive_num}"
+            return {
+                "drive_id": drive_id,
+                "device_path": drive_path,
+                "model": model or f"Disk {drive_num}",
+                "serial": serial or "Unknown",
+                "protocol": bus_type,
+                "smart_values": smart_values,
+                "smart_passed": True,  # ctypes layer can't easily get SMART pass/fail
+                "timestamp": datetime.now().isoformat(),
+                "is_simulated": False,
+                "source": "ctypes_deviceiocontrol"
+            }
+
+        except Exception as e:
+            print(f"[SMARTReader-Win] Layer 3 drive {drive_num} error: {e}")
+            return None
+        finally:
+            kernel32.CloseHandle(handle)
 
     def _ctypes_read_ata_smart(self, kernel32, handle, SMART_RCV_DRIVE_DATA: int) -> Dict:
         """
         Read ATA SMART attributes via SMART_RCV_DRIVE_DATA IOCTL.
         Returns dict of {smart_N: value} for CRITICAL_ATTRIBUTES.
         """
-        import ctypes
-        import ctypes.wintypes as wintypes
-
-        # SENDCMDINPARAMS structure (from Windows SDK)
-        class SENDCMDINPARAMS(ctypes.Structure):
-            _fields_ = [
-                ("cBufferSize",  ctypes.c_ulong),
-                ("irDriveRegs",  ctypes.c_ubyte * 8),
-                ("bDriveNumber", ctypes.c_ubyte),
-                ("bReserved",    ctypes.c_ubyte * 3),
-                ("dwReserved",   ctypes.c_ulong * 4),
-                ("bBuffer",      ctypes.c_ubyte * 1),
-            ]
-
         READ_ATTRIBUTES = 0xD0
         SMART_CYL_LOW   = 0x4F
         SMART_CYL_HI    = 0xC2
@@ -722,7 +1324,7 @@ class SMARTReader:
         try:
             success = kernel32.DeviceIoControl(
                 handle, SMART_RCV_DRIVE_DATA,
-                ctypes.byref(cmd), ctypes.sizeof(cmd),
+                ctypes.byref(cmd), _SENDCMD_SIZE,
                 out_buf, out_buf_size,
                 ctypes.byref(bytes_returned), None
             )
@@ -732,22 +1334,10 @@ class SMARTReader:
 
             # SMART attribute table starts at offset 4 (after SENDCMDOUTPARAMS header)
             # Each entry: [ID(1), Flags(2), Current(1), Worst(1), RawValue(6), Reserved(1)] = 12 bytes
-            raw = out_buf.raw
-            smart_values = {}
             table_offset = 4
-
-            for i in range(30):
-                offset = table_offset + (i * 12)
-                if offset + 12 > len(raw):
-                    break
-                attr_id = raw[offset]
-                if attr_id == 0:
-                    continue
-                if attr_id in self.CRITICAL_ATTRIBUTES:
-                    raw_value = int.from_bytes(raw[offset + 5: offset + 11], 'little')
-                    smart_values[f"smart_{attr_id}"] = raw_value
-
-            return smart_values
+            return self._critical_ata_values(
+                memoryview(out_buf)[table_offset:table_offset + ATA_ATTR_COUNT * ATA_ATTR.size]
+            )
 
         except Exception as e:
             print(f"[SMARTReader-Win] ATA SMART IOCTL failed: {e}")
@@ -757,54 +1347,99 @@ class SMARTReader:
     # LAYER 4 — wmic diskdrive (Basic info, always works, no SMART attributes)
     # ─────────────────────────────────────────────────────────────────────────
 
+    def _ctypes_read_nvme_smart(self, kernel32, handle) -> Dict:
+        """
+        Read the NVMe SMART / Health Information log page (0x02) via
+        IOCTL_STORAGE_QUERY_PROPERTY + StorageAdapterProtocolSpecificProperty.
+        Returns dict of {smart_N: value} mapped like smartctl's NVMe log.
+        """
+        query = NVME_HEALTH_QUERY()
+        query.PropertyId = StorageAdapterProtocolSpecificProperty
+        query.QueryType = 0    # PropertyStandardQuery
+        request = query.ProtocolSpecific
+        request.ProtocolType = ProtocolTypeNvme
+        request.DataType = NVMeDataTypeLogPage
+        request.ProtocolDataRequestValue = NVME_LOG_PAGE_HEALTH_INFO
+        request.ProtocolDataOffset = _PROTOCOL_DATA_SIZE
+        request.ProtocolDataLength = NVME_HEALTH_LOG_SIZE
+        bytes_returned = wintypes.DWORD(0)
+
+        try:
+            success = kernel32.DeviceIoControl(
+                handle, IOCTL_STORAGE_QUERY_PROPERTY,
+                ctypes.byref(query), _NVME_QUERY_SIZE,
+                ctypes.byref(query), _NVME_QUERY_SIZE,
+                ctypes.byref(bytes_returned), None
+            )
+
+            if not success:
+                return {}
+
+            # The driver reports where it put the log, relative to the protocol data
+            returned = query.ProtocolSpecific
+            log_offset = _NVME_PROTOCOL_BASE + returned.ProtocolDataOffset
+            if (returned.ProtocolDataLength < NVME_HEALTH_LOG_SIZE
+                    or log_offset + NVME_HEALTH_LOG_SIZE > _NVME_QUERY_SIZE):
+                return {}
+
+            kelvin, power_cycles, power_on_hours, media_errors = NVME_HEALTH.unpack_from(
+                memoryview(query), log_offset
+            )
+            return {
+                "smart_5":   media_errors,
+                "smart_194": kelvin - 273,   # Kelvin → Celsius
+                "smart_9":   power_on_hours,
+                "smart_12":  power_cycles,
+            }
+
+        except Exception as e:
+            print(f"[SMARTReader-Win] NVMe health log IOCTL failed: {e}")
+            return {}
+
+    def _critical_ata_values(self, table) -> Dict:
+        """
+        {smart_N: raw value} for the critical attributes in a buffer of whole
+        12-byte ATA attribute entries, decoded in one struct.iter_unpack pass.
+        Bytes 5-10 of an entry are its 6-byte little-endian raw value.
+        """
+        critical = self.CRITICAL_IDS
+        smart_keys = self.SMART_KEYS
+        return {
+            smart_keys[attr_id]: raw_lo | raw_hi << 32
+            for attr_id, _, _, _, raw_lo, raw_hi in ATA_ATTR.iter_unpack(table)
+            if attr_id in critical
+        }
+
     def _try_wmic_basic_windows(self) -> List[Dict]:
         """
-        Layer 4: LAST RESORT. Uses `wmic diskdrive` subprocess call.
+        Layer 4: LAST RESORT. Win32_DiskDrive basics, queried in-process over
+        COM when pywin32 is available, else via a `wmic diskdrive` subprocess.
         - Always returns at least the real drive names, models, and serials
         - Does NOT return SMART attributes (fills with safe defaults)
         - Uses default SMART values so health engine gives neutral score
         - Marks drives with source='wmic_basic' so UI can show 'Limited SMART'
         """
         try:
-            result = subprocess.run(
-                ["wmic", "diskdrive", "get",
-                 "DeviceID,Model,SerialNumber,Size,MediaType,InterfaceType",
-                 "/format:csv"],
-                capture_output=True, text=True, timeout=15,
-                creationflags=0x08000000  # CREATE_NO_WINDOW
-            )
-
-            if result.returncode != 0 or not result.stdout.strip():
+            rows = self._wmi_disk_rows()
+            if rows is None:
+                rows = self._wmic_disk_rows()
+            if not rows:
                 print("[SMARTReader-Win] Layer 4 (wmic) failed or returned nothing")
                 return []
 
             drives = []
-            lines = [l.strip() for l in result.stdout.strip().splitlines() if l.strip()]
-
-            # First line is headers, CSV format from wmic has leading blank/node column
-            if len(lines) < 2:
-                return []
-
-            headers = [h.lower() for h in lines[0].split(",")]
-
-            for line in lines[1:]:
-                parts = line.split(",")
-                if len(parts) < len(headers):
-                    continue
-
-                row = dict(zip(headers, parts))
-                device_id = row.get("deviceid", "").strip()
+            for row in rows:
+                device_id, model, serial, interface, size = map(
+                    str.strip, [row.get(key, default) for key, default in _WMIC_FIELDS]
+                )
                 if not device_id:
                     continue
 
                 drive_id = device_id.replace("\\", "_").replace(".", "_").strip("_")
-                model = row.get("model", "Unknown").strip()
-                serial = row.get("serialnumber", "Unknown").strip()
-                interface = row.get("interfacetype", "Unknown").strip()
 
                 size_bytes = 0
                 try:
-                    size_bytes = int(row.get("size", "0").strip())
+                    size_bytes = int(size)
                 except (ValueError, TypeError):
                     pass
 
@@ -833,148 +1468,243 @@ class SMARTReader:
             print(f"[SMARTReader-Win] Layer 4 (wmic) exception: {e}")
             return []
 
-    
+    def _wmi_disk_rows(self) -> Optional[List[Dict]]:
+        """Win32_DiskDrive rows over this thread's WMI connection; None without pywin32 or on failure."""
+        if pythoncom is None:
+            return None
+        try:
+            c, _ = self._wmi_services()
+            return [
+                {
+                    "deviceid":      disk.DeviceID or "",
+                    "model":         disk.Model or "Unknown",
+                    "serialnumber":  disk.SerialNumber or "Unknown",
+                    "interfacetype": disk.InterfaceType or "Unknown",
+                    "size":          str(disk.Size or 0),
+                }
+                for disk in c.ExecQuery(
+                    "SELECT DeviceID, Model, SerialNumber, Size, InterfaceType FROM Win32_DiskDrive",
+                    "WQL", _WBEM_FORWARD_STREAM
+                )
+            ]
+        except Exception as e:
+            print(f"[SMARTReader-Win] Layer 4 WMI query failed, trying wmic.exe: {e}")
+            self._wmi.services = None
+            return None
+
+    def _wmic_disk_rows(self) -> List[Dict]:
+        """Win32_DiskDrive rows from wmic.exe's Key=Value list output (keys lowercased)."""
+        result = subprocess.run(
+            ["wmic", "diskdrive", "get",
+             "DeviceID,Model,SerialNumber,Size,MediaType,InterfaceType",
+             "/format:list"],
+            stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, timeout=15,
+            **_WIN_RUN_KW
+        )
+
+        if result.returncode != 0 or not result.stdout.strip():
+            return []
+
+        # Decoded once as a whole: UTF-16 when wmic writes a BOM, otherwise the
+        # ANSI code page text=True would have used
+        raw = result.stdout
+        encoding = "utf-16" if raw.startswith(b"\xff\xfe") else locale.getpreferredencoding(False)
+        text = raw.decode(encoding, errors="replace")
+
+        # One Key=Value line per property, blank lines between disks; values are
+        # taken verbatim after the first "=", so no quoting rules to honour.
+        # wmic ends lines with \r\r\n, which splitlines() would read as two
+        rows, row = [], {}
+        for line in text.replace("\r", "").split("\n"):
+            key, sep, value = line.partition("=")
+            if sep:
+                row[key.strip().lower()] = value
+            elif row and not line.strip():
+                rows.append(row)
+                row = {}
+        if row:
+            rows.append(row)
+        return rows
+
+    # Demo-mode drives; _get_simulated_drives hands out fresh copies of these
+    SIMULATED_DRIVES = [
+        {
+            "drive_id": "DRIVE_A",
+            "model": "ST4000DM004 (4000GB)",
+            "serial": "WFK3XXXX",
+            "is_simulated": True,
+            "smart_passed": True,
+            "smart_values": {
+                "smart_5":   0,      # Reallocated sectors: 0 = GOOD
+                "smart_187": 0,      # Uncorrectable: 0 = GOOD
+                "smart_188": 0,      # Command timeout: 0 = GOOD
+                "smart_197": 0,      # Pending sectors: 0 = GOOD
+                "smart_198": 0,      # Offline uncorrectable: 0 = GOOD
+                "smart_194": 36,     # Temperature: 36°C = GOOD
+                "smart_9":   11760,  # Power-on hours: ~1.3 years
+                "smart_12":  305,    # Power cycles: moderate
+            }
+        },
+        {
+            "drive_id": "DRIVE_B",
+            "model": "WDC WD20EZRZ (2000GB)",
+            "serial": "WD-WMAZ8XXXX",
+            "is_simulated": True,
+            "smart_passed": True,
+            "smart_values": {
+                "smart_5":   15,     # 15 reallocated sectors = WARNING
+                "smart_187": 2,      # 2 uncorrectable = WARNING
+                "smart_188": 0,
+                "smart_197": 3,      # 3 pending = WARNING
+                "smart_198": 1,
+                "smart_194": 42,     # 42°C = slightly warm
+                "smart_9":   28000,  # ~3.2 years old
+                "smart_12":  650,
+            }
+        },
+        {
+            "drive_id": "DRIVE_C",
+            "model": "HDWD130 (3000GB)",
+            "serial": "X6XXXXXX",
+            "is_simulated": True,
+            "smart_passed": False,  # SMART test failing
+            "smart_values": {
+                "smart_5":   87,     # 87 reallocated = CRITICAL
+                "smart_187": 15,     # 15 uncorrectable = CRITICAL
+                "smart_188": 8,      # 8 timeouts = CRITICAL
+                "smart_197": 12,
+                "smart_198": 6,
+                "smart_194": 48,     # 48°C = HOT
+                "smart_9":   45000,  # ~5.1 years old
+                "smart_12":  1200,
+            }
+        }
+    ]
+
     def _get_simulated_drives(self) -> List[Dict]:
         """
         FALLBACK: Returns realistic simulated drive data
         when real SMART data is unavailable.
         """
         print("[SMARTReader] Using simulated drive data (Demo Mode)")
-        
+
+        # Callers annotate the result, so each gets its own dicts
+        timestamp = datetime.now().isoformat()
         return [
-            {
-                "drive_id": "DRIVE_A",
-                "model": "ST4000DM004 (4000GB)",
-                "serial": "WFK3XXXX",
-                "is_simulated": True,
-                "smart_passed": True,
-                "smart_values": {
-                    "smart_5":   0,      # Reallocated sectors: 0 = GOOD
-                    "smart_187": 0,      # Uncorrectable: 0 = GOOD
-                    "smart_188": 0,      # Command timeout: 0 = GOOD
-                    "smart_197": 0,      # Pending sectors: 0 = GOOD
-                    "smart_198": 0,      # Offline uncorrectable: 0 = GOOD
-                    "smart_194": 36,     # Temperature: 36°C = GOOD
-                    "smart_9":   11760,  # Power-on hours: ~1.3 years
-                    "smart_12":  305,    # Power cycles: moderate
-                },
-                "timestamp": datetime.now().isoformat()
-            },
-            {
-                "drive_id": "DRIVE_B",
-                "model": "WDC WD20EZRZ (2000GB)",
-                "serial": "WD-WMAZ8XXXX",
-                "is_simulated": True,
-                "smart_passed": True,
-                "smart_values": {
-                    "smart_5":   15,     # 15 reallocated sectors = WARNING
-                    "smart_187": 2,      # 2 uncorrectable = WARNING
-                    "smart_188": 0,
-                    "smart_197": 3,      # 3 pending = WARNING
-                    "smart_198": 1,
-                    "smart_194": 42,     # 42°C = slightly warm
-                    "smart_9":   28000,  # ~3.2 years old
-                    "smart_12":  650,
-                },
-                "timestamp": datetime.now().isoformat()
-            },
-            {
-                "drive_id": "DRIVE_C",
-                "model": "HDWD130 (3000GB)",
-                "serial": "X6XXXXXX",
-                "is_simulated": True,
-                "smart_passed": False,  # SMART test failing
-                "smart_values": {
-                    "smart_5":   87,     # 87 reallocated = CRITICAL
-                    "smart_187": 15,     # 15 uncorrectable = CRITICAL
-                    "smart_188": 8,      # 8 timeouts = CRITICAL
-                    "smart_197": 12,
-                    "smart_198": 6,
-                    "smart_194": 48,     # 48°C = HOT
-                    "smart_9":   45000,  # ~5.1 years old
-                    "smart_12":  1200,
-                },
-                "timestamp": datetime.now().isoformat()
-            }
+            {**drive, "smart_values": dict(drive["smart_values"]), "timestamp": timestamp}
+            for drive in self.SIMULATED_DRIVES
         ]
     
+    # Template for _get_default_smart_values; copied because it ends up in drive dicts
+    DEFAULT_SMART_VALUES = {
+        "smart_5": 0, "smart_187": 0, "smart_188": 0,
+        "smart_197": 0, "smart_198": 0, "smart_194": 35,
+        "smart_9": 10000, "smart_12": 200
+    }
+
     def _get_default_smart_values(self) -> Dict:
         """Default SMART values when reading fails"""
-        return {
-            "smart_5": 0, "smart_187": 0, "smart_188": 0,
-            "smart_197": 0, "smart_198": 0, "smart_194": 35,
-            "smart_9": 10000, "smart_12": 200
-        }
+        return dict(self.DEFAULT_SMART_VALUES)
     
-    # In-memory cache: {cache_key: (timestamp, history_list)}
-    _history_cache: Dict = {}
+    # In-memory cache: {cache_key: (timestamp, smart_values_fingerprint, history_list)}
     CACHE_DURATION_SECONDS = 300  # 5 minutes
+    HISTORY_CACHE_MAX      = 64   # (drive_id, days) entries kept
+    # History TTL shrinks linearly to 0 as system memory use goes 70% → 90%
+    MEM_PRESSURE_LOW       = 0.7
+    MEM_PRESSURE_HIGH      = 0.9
+
+    def _history_ttl(self) -> float:
+        """CACHE_DURATION_SECONDS, scaled down under memory pressure."""
+        if psutil is None:
+            return self.CACHE_DURATION_SECONDS
+        pressure = psutil.virtual_memory().percent / 100
+        excess = (pressure - self.MEM_PRESSURE_LOW) / (self.MEM_PRESSURE_HIGH - self.MEM_PRESSURE_LOW)
+        return self.CACHE_DURATION_SECONDS * (1 - min(1.0, max(0.0, excess)))
+
+    def invalidate(self, drive_id: str):
+        """Drop every cached history window for drive_id, e.g. once the drive is removed."""
+        with self._history_lock:
+            for key in [key for key in self._history_cache if key[0] == drive_id]:
+                del self._history_cache[key]
 
     def get_smart_history(self, drive_id: str, days: int = 30) -> List[Dict]:
         """
         Returns 30-day history of SMART readings for a drive.
 
-        STABILITY FIX: Uses seeded random (seed = hash(drive_id)) so the same
-        drive always produces the same historical values. Results are cached for
+        STABILITY FIX: Uses seeded random (seed = crc32(drive_id)) so the same
+        drive always produces the same historical values, across restarts too. Results are cached for
         5 minutes so repeated API polls return identical data → stable health score.
 
         In production: Read from InfluxDB/database
         For demo: Generate deterministic historical data
         """
-        cache_key = f"{drive_id}_{days}"
+        cache_key = (drive_id, days)
         now = time.time()
 
-        # Return cached data if still fresh
-        if cache_key in self._history_cache:
-            cached_at, cached_history = self._history_cache[cache_key]
-            if now - cached_at < self.CACHE_DURATION_SECONDS:
-                return cached_history
-
-        # Find the drive
-        drives = self.get_all_drives()
-        drive = next((d for d in drives if d["drive_id"] == drive_id), None)
+        # Find the drive (only read here, so no copy of the scan is needed)
+        drive = self._drive_index().get(drive_id)
 
         if not drive:
             print(f"[SMARTReader] Drive {drive_id} not found")
             return []
 
         current_smart = drive["smart_values"]
+        if not current_smart and drive.get("standby"):
+            # Asleep since before its first reading: no history to derive.
+            # Drives that never report attributes (macOS) keep the derived one
+            return []
+        # History is derived from the current readings, so a cached window is
+        # only reusable while they are unchanged
+        fingerprint = hash(tuple(sorted(current_smart.items())))
+
+        # Return cached data if still fresh
+        with self._history_lock:
+            cached = self._history_cache.get(cache_key)
+            if (cached is not None and cached[1] == fingerprint
+                    and now - cached[0] < self._history_ttl()):
+                self._history_cache.move_to_end(cache_key)
+                return cached[2]
+
         history = []
         today = datetime.now()
 
-        # CRITICAL: Seed with drive_id hash so same drive = same random sequence
-        seed_value = abs(hash(drive_id)) % (2 ** 31)
-        rng = random.Random(seed_value)
-
-        for day in range(days - 1, -1, -1):
-            date = today - timedelta(days=day)
-            decay_factor = day / days  # Higher = further in past = healthier
-
-            day_smart = {}
-            for key, current_val in current_smart.items():
-                if key == "smart_9":        # Power-on hours increases over time
-                    past_val = max(0, current_val - (day * 24))
-                elif key == "smart_12":     # Power cycles increase slowly
-                    past_val = max(0, current_val - day)
-                elif key == "smart_194":    # Temperature: small deterministic variation
-                    variation = rng.uniform(-3.0, 3.0)
-                    past_val = round(current_val + variation, 1)
-                else:
-                    # Error counts were lower in the past
-                    past_val = max(0, int(current_val * (1 - decay_factor * 0.8)))
-                    noise = rng.randint(-1, 2) if current_val > 0 else 0
-                    past_val = max(0, past_val + noise)
-
-                day_smart[key] = past_val
+        # CRITICAL: Seed with a stable drive_id checksum so same drive = same random sequence
+        rng = np.random.default_rng(_history_seed(drive_id))
+
+        # One column per attribute across all days, oldest first
+        days_ago = np.arange(days - 1, -1, -1)
+        decay = days_ago / days     # Higher = further in past = healthier
+        columns = {}
+        for key, current_val in current_smart.items():
+            if key == "smart_9":        # Power-on hours increases over time
+                column = np.maximum(0, current_val - days_ago * 24)
+            elif key == "smart_12":     # Power cycles increase slowly
+                column = np.maximum(0, current_val - days_ago)
+            elif key == "smart_194":    # Temperature: small deterministic variation
+                column = np.round(current_val + rng.uniform(-3.0, 3.0, days), 1)
+            else:
+                # Error counts were lower in the past
+                column = np.maximum(0, (current_val * (1 - decay * 0.8)).astype(np.int64))
+                if current_val > 0:
+                    column = np.maximum(0, column + rng.integers(-1, 3, days))
+            columns[key] = column.tolist()
+
+        # One isoformat per day; the date is its YYYY-MM-DD prefix (no strftime)
+        timestamps = [(today - timedelta(days=day)).isoformat() for day in days_ago.tolist()]
 
+        for i, timestamp in enumerate(timestamps):
             history.append({
-                "date": date.strftime("%Y-%m-%d"),
-                "timestamp": date.isoformat(),
-                "smart_values": day_smart
+                "date": timestamp[:10],
+                "timestamp": timestamp,
+                "smart_values": {key: column[i] for key, column in columns.items()}
             })
 
-        # Store in cache
-        self._history_cache[cache_key] = (now, history)
+        # Store in cache, evicting the least recently used windows past the cap
+        with self._history_lock:
+            self._history_cache[cache_key] = (now, fingerprint, history)
+            self._history_cache.move_to_end(cache_key)
+            while len(self._history_cache) > self.HISTORY_CACHE_MAX:
+                self._history_cache.popitem(last=False)
 
         return history
 
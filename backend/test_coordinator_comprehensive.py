@@ -9,9 +9,11 @@ This test suite validates the closed-loop system from ALL angles:
 - Non-technical validation (does it make sense?)
 """
 
+import math
 import sys
-import json
 from datetime import datetime
+from time import perf_counter_ns
+from typing import NamedTuple
 
 # Import the engines
 from smart_reader import SMARTReader
@@ -19,10 +21,22 @@ from health_engine import HealthPredictionEngine
 from compression_engine import CompressionEngine
 from coordinator import IntelligentCoordinator
 
+BANNER   = "=" * 70
+PASS_TAG = "✅ PASS"
+FAIL_TAG = "❌ FAIL"
+
+
+class Result(NamedTuple):
+    """One logged check"""
+    test: str
+    passed: bool
+    details: str
+
 class CoordinatorTester:
     """Comprehensive test suite for the intelligent coordinator"""
     
-    def __init__(self):
+    def __init__(self, verbose=True):
+        self.verbose = verbose    # False: details are only printed for failures
         self.smart_reader = SMARTReader()
         self.health_engine = HealthPredictionEngine()
         self.compression_engine = CompressionEngine()
@@ -32,82 +46,100 @@ class CoordinatorTester:
             self.smart_reader
         )
         self.test_results = []
+        self._cycle_cache = {}    # drive_id → run_cycle() status, shared by the integration tests
+        
+        # Drives, their 30-day histories and health predictions, read once and
+        # shared by every test (nothing below mutates them)
+        self._drives = self.smart_reader.get_all_drives()
+        self._histories = {
+            d['drive_id']: self.smart_reader.get_smart_history(d['drive_id'], days=30)
+            for d in self._drives
+        }
+        self._predictions = {
+            drive_id: self.health_engine.predict(history)
+            for drive_id, history in self._histories.items()
+        }
     
     def log_test(self, test_name, passed, details=""):
-        """Log a test result"""
-        status = "✅ PASS" if passed else "❌ FAIL"
-        self.test_results.append({
-            "test": test_name,
-            "passed": passed,
-            "details": details
-        })
-        print(f"{status} - {test_name}")
-        if details:
+        """
+        Log a test result. details may be a callable returning the string, so
+        it is only built when it gets printed (always, unless quiet and passing)
+        """
+        if callable(details):
+            details = details() if self.verbose or not passed else ""
+        status = PASS_TAG if passed else FAIL_TAG
+        self.test_results.append(Result(test_name, passed, details))
+        print(status + " - " + test_name)
+        if details and (self.verbose or not passed):
             print(f"   {details}")
     
+    def _section(self, title):
+        """Print a section header: banner, title, banner (one write, not three)"""
+        print(f"\n{BANNER}\n{title}\n{BANNER}")
+    
+    def _try_cycle(self, drive_id):
+        """(True, health summary) for a drive whose cycle runs, (False, the error) otherwise"""
+        try:
+            status = self._get_cycle(drive_id)
+            return True, (
+                f"{drive_id}: Health={status['health']['current_score']}, "
+                f"Interventions={status['cumulative_impact']['total_interventions']}"
+            )
+        except Exception as e:
+            return False, f"{drive_id}: ERROR: {str(e)}"
+    
+    def _get_cycle(self, drive_id):
+        """run_cycle() for a drive, run once and reused by every test that needs it"""
+        if drive_id not in self._cycle_cache:
+            self._cycle_cache[drive_id] = self.coordinator.run_cycle(drive_id)
+        return self._cycle_cache[drive_id]
+    
     # =====================================================
     # TECHNICAL TESTS: Formula & Math Validation
     # =====================================================
     
+    # (log name, baseline_days, write_reduction)
+    _FORMULA_CASES = (
+        ("Formula: extended_days = baseline × (1 + write_reduction × 0.4)", 100, 0.50),
+        ("Formula: Maximum reduction (80%)",                                 50, 0.80),
+        ("Formula: Minimum reduction (10%)",                                200, 0.10),
+    )
+    
+    # (health_score, expected mode, max write reduction)
+    _COMPRESSION_CASES = (
+        (95, "normal", 0.20),        # Health 80-100 → Normal (max 20%)
+        (75, "conservative", 0.40),  # Health 60-79 → Conservative (max 40%)
+        (55, "aggressive", 0.60),    # Health 40-59 → Aggressive (max 60%)
+        (25, "emergency", 0.80),     # Health 0-39 → Emergency (max 80%)
+    )
+    
     def test_life_extension_formula(self):
         """Test 1: Validate the life extension formula is mathematically correct"""
-        print("\n" + "="*70)
-        print("TEST 1: LIFE EXTENSION FORMULA VALIDATION")
-        print("="*70)
-        
-        # Test case 1: 50% write reduction on 100 day baseline
-        result = self.coordinator._calculate_life_extension(
-            baseline_days=100,
-            write_reduction=0.50
-        )
-        
-        expected = 100 * (1 + 0.50 * 0.4)  # = 100 * 1.2 = 120
-        expected_gain = expected - 100  # = 20
-        
-        formula_correct = abs(result['extended_days'] - expected) < 0.1
-        gain_correct = abs(result['days_gained'] - expected_gain) < 0.1
-        
-        self.log_test(
-            "Formula: extended_days = baseline × (1 + write_reduction × 0.4)",
-            formula_correct and gain_correct,
-            f"100 days × (1 + 0.50 × 0.4) = {result['extended_days']} (expected {expected})"
-        )
-        
-        # Test case 2: Maximum write reduction (80%)
-        result = self.coordinator._calculate_life_extension(
-            baseline_days=50,
-            write_reduction=0.80
-        )
-        
-        expected = 50 * (1 + 0.80 * 0.4)  # = 50 * 1.32 = 66
-        formula_correct = abs(result['extended_days'] - expected) < 0.1
-        
-        self.log_test(
-            "Formula: Maximum reduction (80%)",
-            formula_correct,
-            f"50 days × (1 + 0.80 × 0.4) = {result['extended_days']} (expected {expected})"
-        )
+        self._section("TEST 1: LIFE EXTENSION FORMULA VALIDATION")
         
-        # Test case 3: Minimum write reduction (10%)
-        result = self.coordinator._calculate_life_extension(
-            baseline_days=200,
-            write_reduction=0.10
-        )
-        
-        expected = 200 * (1 + 0.10 * 0.4)  # = 200 * 1.04 = 208
-        formula_correct = abs(result['extended_days'] - expected) < 0.1
-        
-        self.log_test(
-            "Formula: Minimum reduction (10%)",
-            formula_correct,
-            f"200 days × (1 + 0.10 × 0.4) = {result['extended_days']} (expected {expected})"
-        )
+        for name, baseline, reduction in self._FORMULA_CASES:
+            result = self.coordinator._calculate_life_extension(
+                baseline_days=baseline,
+                write_reduction=reduction
+            )
+            
+            expected = baseline * (1 + reduction * 0.4)  # e.g. 100 * 1.2 = 120
+            expected_gain = expected - baseline
+            
+            formula_correct = (
+                abs(result['extended_days'] - expected) < 0.1 and
+                abs(result['days_gained'] - expected_gain) < 0.1
+            )
+            
+            self.log_test(
+                name,
+                formula_correct,
+                f"{baseline} days × (1 + {reduction:.2f} × 0.4) = {result['extended_days']} (expected {expected})"
+            )
     
     def test_intervention_thresholds(self):
         """Test 2: Validate intervention decision logic"""
-        print("\n" + "="*70)
-        print("TEST 2: INTERVENTION DECISION LOGIC")
-        print("="*70)
+        self._section("TEST 2: INTERVENTION DECISION LOGIC")
         
         # Test Case A: Critical health (< 50) should ALWAYS trigger
         should_intervene = self.coordinator._should_intervene(
@@ -161,18 +193,9 @@ class CoordinatorTester:
     
     def test_compression_modes(self):
         """Test 3: Validate compression mode selection based on health"""
-        print("\n" + "="*70)
-        print("TEST 3: COMPRESSION MODE SELECTION")
-        print("="*70)
-        
-        test_cases = [
-            (95, "normal", 0.20),    # Health 80-100 → Normal (max 20%)
-            (75, "conservative", 0.40),  # Health 60-79 → Conservative (max 40%)
-            (55, "aggressive", 0.60),    # Health 40-59 → Aggressive (max 60%)
-            (25, "emergency", 0.80),     # Health 0-39 → Emergency (max 80%)
-        ]
-        
-        for health, expected_mode, expected_max in test_cases:
+        self._section("TEST 3: COMPRESSION MODE SELECTION")
+        
+        for health, expected_mode, expected_max in self._COMPRESSION_CASES:
             result = self.compression_engine.calculate_write_reduction(
                 health_score=health,
                 compression_potential=0.70  # 70% compressible
@@ -193,18 +216,17 @@ class CoordinatorTester:
     
     def test_cumulative_impact(self):
         """Test 4: Validate cumulative impact tracking"""
-        print("\n" + "="*70)
-        print("TEST 4: CUMULATIVE IMPACT TRACKING")
-        print("="*70)
+        self._section("TEST 4: CUMULATIVE IMPACT TRACKING")
         
         # Get DRIVE_C which has interventions
         impact = self.coordinator.get_cumulative_impact("DRIVE_C")
         
         # Logical check: Total days should equal sum of individual interventions
-        individual_sum = sum(
-            i['impact']['life_extended_days'] 
+        # fsum: exact, so any mismatch is the coordinator's, not this check's rounding
+        individual_sum = math.fsum([
+            i['impact']['life_extended_days']
             for i in impact['interventions']
-        )
+        ])
         
         cumulative_correct = abs(impact['total_days_extended'] - individual_sum) < 0.1
         
@@ -225,17 +247,9 @@ class CoordinatorTester:
     
     def test_health_to_intervention_correlation(self):
         """Test 5: Lower health should result in more aggressive interventions"""
-        print("\n" + "="*70)
-        print("TEST 5: HEALTH-TO-INTERVENTION CORRELATION")
-        print("="*70)
-        
-        # Test healthy drive
-        drives = self.smart_reader.get_all_drives()
+        self._section("TEST 5: HEALTH-TO-INTERVENTION CORRELATION")
         
-        for drive in drives:
-            drive_id = drive['drive_id']
-            history = self.smart_reader.get_smart_history(drive_id, days=30)
-            prediction = self.health_engine.predict(history)
+        for drive_id, prediction in self._predictions.items():
             impact = self.coordinator.get_cumulative_impact(drive_id)
             
             health = prediction['health_score']
@@ -262,9 +276,7 @@ class CoordinatorTester:
     
     def test_zero_baseline(self):
         """Test 6: Edge case - Zero baseline days"""
-        print("\n" + "="*70)
-        print("TEST 6: EDGE CASE - ZERO BASELINE")
-        print("="*70)
+        self._section("TEST 6: EDGE CASE - ZERO BASELINE")
         
         result = self.coordinator._calculate_life_extension(
             baseline_days=0,
@@ -282,9 +294,7 @@ class CoordinatorTester:
     
     def test_very_large_baseline(self):
         """Test 7: Edge case - Very large baseline"""
-        print("\n" + "="*70)
-        print("TEST 7: EDGE CASE - VERY LARGE BASELINE")
-        print("="*70)
+        self._section("TEST 7: EDGE CASE - VERY LARGE BASELINE")
         
         result = self.coordinator._calculate_life_extension(
             baseline_days=10000,
@@ -302,36 +312,18 @@ class CoordinatorTester:
     
     def test_minimum_compression_potential(self):
         """Test 8: Edge case - Minimum compression threshold"""
-        print("\n" + "="*70)
-        print("TEST 8: EDGE CASE - MINIMUM COMPRESSION THRESHOLD")
-        print("="*70)
-        
-        # Coordinator requires >= 20% compression potential
-        # Test with 15% (below threshold) - should NOT intervene even if health is bad
-        
-        # Simulate low compression potential
-        original_method = self.compression_engine.analyze_filesystem
+        self._section("TEST 8: EDGE CASE - MINIMUM COMPRESSION THRESHOLD")
         
-        def mock_low_compression(*args, **kwargs):
-            result = original_method(*args, **kwargs)
-            result['compression_potential'] = 0.15  # 15% - below 20% threshold
-            return result
-        
-        self.compression_engine.analyze_filesystem = mock_low_compression
-        
-        # This would normally trigger, but compression is too low
-        # Note: We can't easily test this without mocking, so we'll check the threshold constant
-        threshold_exists = hasattr(self.coordinator, 'MIN_COMPRESSION_POTENTIAL')
-        threshold_value = self.coordinator.MIN_COMPRESSION_POTENTIAL if threshold_exists else None
+        # Coordinator requires >= 20% compression potential; below that it should
+        # NOT intervene even if health is bad. Exercising that needs a mocked
+        # filesystem analysis, so we check the threshold constant instead
+        threshold_value = getattr(self.coordinator, 'MIN_COMPRESSION_POTENTIAL', None)
         
         self.log_test(
             "Edge Case: Minimum compression threshold exists",
-            threshold_exists and threshold_value == 0.20,
+            threshold_value == 0.20,
             f"MIN_COMPRESSION_POTENTIAL = {threshold_value}"
         )
-        
-        # Restore original method
-        self.compression_engine.analyze_filesystem = original_method
     
     # =====================================================
     # NON-TECHNICAL TESTS: Common Sense Validation
@@ -339,9 +331,7 @@ class CoordinatorTester:
     
     def test_common_sense_life_extension(self):
         """Test 9: Non-technical - Does the life extension make intuitive sense?"""
-        print("\n" + "="*70)
-        print("TEST 9: COMMON SENSE - LIFE EXTENSION MAGNITUDE")
-        print("="*70)
+        self._section("TEST 9: COMMON SENSE - LIFE EXTENSION MAGNITUDE")
         
         # Common sense: 50% write reduction should extend life by ~20%
         result = self.coordinator._calculate_life_extension(
@@ -374,9 +364,7 @@ class CoordinatorTester:
     
     def test_intervention_trigger_reason(self):
         """Test 10: Non-technical - Intervention reasons are clear and actionable"""
-        print("\n" + "="*70)
-        print("TEST 10: NON-TECHNICAL - INTERVENTION CLARITY")
-        print("="*70)
+        self._section("TEST 10: NON-TECHNICAL - INTERVENTION CLARITY")
         
         # Check DRIVE_C interventions have clear reasons
         impact = self.coordinator.get_cumulative_impact("DRIVE_C")
@@ -411,13 +399,11 @@ class CoordinatorTester:
     
     def test_full_cycle_integration(self):
         """Test 11: Integration - Full coordinator cycle works end-to-end"""
-        print("\n" + "="*70)
-        print("TEST 11: INTEGRATION - FULL COORDINATOR CYCLE")
-        print("="*70)
+        self._section("TEST 11: INTEGRATION - FULL COORDINATOR CYCLE")
         
         # Run a full cycle for DRIVE_C
         try:
-            status = self.coordinator.run_cycle("DRIVE_C")
+            status = self._get_cycle("DRIVE_C")
             
             # Should return all required fields
             has_drive_id = 'drive_id' in status
@@ -456,40 +442,16 @@ class CoordinatorTester:
     
     def test_multiple_drives_coordination(self):
         """Test 12: Integration - Coordinator handles multiple drives correctly"""
-        print("\n" + "="*70)
-        print("TEST 12: INTEGRATION - MULTIPLE DRIVE COORDINATION")
-        print("="*70)
-        
-        drives = self.smart_reader.get_all_drives()
-        
-        all_successful = True
-        drive_statuses = []
-        
-        for drive in drives:
-            try:
-                status = self.coordinator.run_cycle(drive['drive_id'])
-                drive_statuses.append({
-                    'id': drive['drive_id'],
-                    'health': status['health']['current_score'],
-                    'interventions': status['cumulative_impact']['total_interventions']
-                })
-            except Exception as e:
-                all_successful = False
-                self.log_test(
-                    f"Integration: {drive['drive_id']} cycle",
-                    False,
-                    f"ERROR: {str(e)}"
-                )
-        
-        if all_successful:
-            self.log_test(
-                "Integration: All drives processed successfully",
-                True,
-                f"Processed {len(drives)} drives"
-            )
-            
-            for ds in drive_statuses:
-                print(f"   {ds['id']}: Health={ds['health']}, Interventions={ds['interventions']}")
+        self._section("TEST 12: INTEGRATION - MULTIPLE DRIVE COORDINATION")
+        
+        # One (ok, summary line) per drive; a failing drive doesn't stop the others
+        results = [self._try_cycle(d['drive_id']) for d in self._drives]
+        
+        self.log_test(
+            "Integration: All drives processed successfully",
+            all(ok for ok, _ in results),
+            lambda: "\n   ".join([f"Processed {len(results)} drives"] + [line for _, line in results])
+        )
     
     # =====================================================
     # RUN ALL TESTS
@@ -497,10 +459,9 @@ class CoordinatorTester:
     
     def run_all_tests(self):
         """Execute all tests and generate report"""
-        print("\n" + "="*70)
-        print("SENTINEL-DISK PRO - COMPREHENSIVE TEST SUITE")
-        print("="*70)
+        self._section("SENTINEL-DISK PRO - COMPREHENSIVE TEST SUITE")
         print(f"Started: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
+        started_ns = perf_counter_ns()
         
         # Run all test methods
         self.test_life_extension_formula()
@@ -517,30 +478,30 @@ class CoordinatorTester:
         self.test_multiple_drives_coordination()
         
         # Generate summary
-        print("\n" + "="*70)
-        print("TEST SUMMARY")
-        print("="*70)
+        self._section("TEST SUMMARY")
         
+        # One pass: the failures are listed below, the counts follow from them
+        failures = [t for t in self.test_results if not t.passed]
         total_tests = len(self.test_results)
-        passed_tests = sum(1 for t in self.test_results if t['passed'])
-        failed_tests = total_tests - passed_tests
+        failed_tests = len(failures)
+        passed_tests = total_tests - failed_tests
         
         pass_rate = (passed_tests / total_tests * 100) if total_tests > 0 else 0
         
         print(f"\nTotal Tests: {total_tests}")
         print(f"✅ Passed: {passed_tests}")
         print(f"❌ Failed: {failed_tests}")
-        print(f"Pass Rate: {pass_rate:.1f}%\n")
+        print(f"Pass Rate: {pass_rate:.1f}%")
+        print(f"Elapsed: {(perf_counter_ns() - started_ns) / 1e9:.3f}s\n")
         
-        if failed_tests > 0:
+        if failures:
             print("FAILED TESTS:")
-            for test in self.test_results:
-                if not test['passed']:
-                    print(f"  ❌ {test['test']}")
-                    if test['details']:
-                        print(f"     {test['details']}")
+            for test in failures:
+                print(f"  ❌ {test.test}")
+                if test.details:
+                    print(f"     {test.details}")
         
-        print("\n" + "="*70)
+        print("\n" + BANNER)
         
         if pass_rate == 100:
             print("🎉 ALL TESTS PASSED - CORE INNOVATION VALIDATED! 🎉")
@@ -551,13 +512,14 @@ class CoordinatorTester:
         else:
             print("❌ CRITICAL - Core innovation has significant issues")
         
-        print("="*70 + "\n")
+        print(BANNER + "\n")
         
         return pass_rate == 100
 
 
 if __name__ == "__main__":
-    tester = CoordinatorTester()
+    # -q: only print the details of failing checks
+    tester = CoordinatorTester(verbose="-q" not in sys.argv[1:])
     all_passed = tester.run_all_tests()
     
     # Exit with appropriate code
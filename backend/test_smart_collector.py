@@ -0,0 +1,220 @@
+"""
+SENTINEL-DISK Pro — smart_collector parser tests
+
+Fixture bytes for the direct ioctl reads (ATA SMART READ DATA page, NVMe
+SMART / Health log) are laid out by hand from the specs, so they check the
+struct formats rather than reuse them.
+
+Run with: python -m pytest -q test_smart_collector.py
+"""
+
+import ctypes
+import errno
+import json
+import types
+
+import pytest
+
+import smart_collector
+
+
+# ─── ATA SMART READ DATA page ───
+# 12-byte attribute entries: id, flags (LE16), current, worst, raw (LE48), reserved
+ATA_ENTRIES = bytes.fromhex(
+    "05 3300 64 64 030000000000 00"     # Reallocated sectors: 3
+    "09 3200 5f 5f 785600000100 00"     # Power-on hours: 0x1_0000_5678 (raw high word used)
+    "0c 3200 64 64 e80300000000 00"     # Power cycles: 1000
+    "00 0000 00 00 000000000000 00"     # empty slot, skipped
+    "c2 2200 23 28 230014002d00 00"     # Temperature: 35 °C, with min 20 / max 45 packed above it
+    "c5 3200 64 64 000000000000 00"     # Pending sectors: 0
+)
+
+
+def _ata_page(entries: bytes = ATA_ENTRIES) -> bytes:
+    """512-byte page: revision 0x0010, the entries, zero padding, checksum in byte 511"""
+    page = bytearray(b"\x10\x00" + entries)
+    page += bytes(511 - len(page))
+    page.append(-sum(page) & 0xFF)
+    return bytes(page)
+
+
+EXPECTED_ATA = {
+    "smart_5":   3,
+    "smart_9":   0x1_0000_5678,
+    "smart_12":  1000,
+    "smart_194": 0x2D_0014_0023,
+    "smart_197": 0,
+}
+
+
+def test_decode_ata_attrs_known_page():
+    page = _ata_page()
+    assert len(page) == 512 and sum(page) & 0xFF == 0
+    assert smart_collector.decode_ata_attrs(page) == EXPECTED_ATA
+
+
+def test_decode_ata_attrs_full_table():
+    entries = b"".join(
+        bytes([attr_id]) + bytes(4) + attr_id.to_bytes(6, "little") + b"\x00"
+        for attr_id in range(1, 31)
+    )
+    decoded = smart_collector.decode_ata_attrs(_ata_page(entries))
+    assert decoded == {f"smart_{i}": i for i in range(1, 31)}
+
+
+def _fake_fcntl(monkeypatch, respond):
+    """Route smart_collector's ioctl calls to respond(request, arg)"""
+    monkeypatch.setattr(smart_collector, "fcntl", types.SimpleNamespace(ioctl=respond))
+
+
+def test_read_ata_smart_over_sg_io(monkeypatch):
+    page = _ata_page()
+
+    def ioctl(fd, request, hdr):
+        assert request == smart_collector.SG_IO
+        assert hdr.interface_id == ord("S")
+        assert hdr.dxfer_direction == smart_collector.SG_DXFER_FROM_DEV
+        assert hdr.dxfer_len == 512
+        cdb = ctypes.string_at(hdr.cmdp, hdr.cmd_len)
+        # ATA PASS-THROUGH(16), PIO data-in, SMART READ DATA (B0h / D0h, LBA C24Fh)
+        assert cdb == bytes.fromhex("85 08 0e 00 d0 00 01 00 00 00 4f 00 c2 00 b0 00")
+        ctypes.memmove(hdr.dxferp, page, len(page))
+
+    _fake_fcntl(monkeypatch, ioctl)
+    assert smart_collector._read_ata_smart(3) == EXPECTED_ATA
+
+
+def test_read_ata_smart_rejects_bad_checksum(monkeypatch):
+    page = bytearray(_ata_page())
+    page[511] ^= 0xFF
+    _fake_fcntl(monkeypatch, lambda fd, request, hdr: ctypes.memmove(hdr.dxferp, bytes(page), 512))
+    with pytest.raises(OSError) as exc:
+        smart_collector._read_ata_smart(3)
+    assert exc.value.errno == errno.EIO
+
+
+def test_read_ata_smart_rejects_failed_command(monkeypatch):
+    def ioctl(fd, request, hdr):
+        ctypes.memmove(hdr.dxferp, _ata_page(), 512)
+        hdr.status = 0x02           # CHECK CONDITION
+    _fake_fcntl(monkeypatch, ioctl)
+    with pytest.raises(OSError):
+        smart_collector._read_ata_smart(3)
+
+
+# ─── NVMe SMART / Health Information log (LID 02h) ───
+
+def _nvme_log() -> bytes:
+    log = bytearray(512)
+    log[0] = 0x00                                       # critical warning
+    log[1:3] = (308).to_bytes(2, "little")              # composite temperature, K
+    log[3] = 100                                        # available spare
+    log[32:48] = (123456).to_bytes(16, "little")        # data units read (not mapped)
+    log[112:128] = (1500).to_bytes(16, "little")        # power cycles
+    log[128:144] = (9876).to_bytes(16, "little")        # power on hours
+    log[144:160] = (42).to_bytes(16, "little")          # unsafe shutdowns (not mapped)
+    log[160:176] = (7).to_bytes(16, "little")           # media errors
+    return bytes(log)
+
+
+def test_read_nvme_smart_health_log(monkeypatch):
+    log = _nvme_log()
+
+    def ioctl(fd, request, cmd):
+        assert request == smart_collector.NVME_IOCTL_ADMIN_CMD
+        assert cmd.opcode == 0x02                       # Get Log Page
+        assert cmd.nsid == 0xFFFFFFFF
+        assert cmd.data_len == 512
+        assert cmd.cdw10 == (127 << 16) | 0x02          # NUMDL = 128 dwords - 1, LID 02h
+        ctypes.memmove(cmd.addr, log, len(log))
+
+    _fake_fcntl(monkeypatch, ioctl)
+    assert smart_collector._read_nvme_smart(3) == {
+        "smart_5":   7,
+        "smart_194": 35,
+        "smart_9":   9876,
+        "smart_12":  1500,
+    }
+
+
+def test_ioctl_struct_sizes_match_the_kernel():
+    # x86-64 / aarch64 layouts of struct sg_io_hdr and struct nvme_passthru_cmd
+    assert ctypes.sizeof(smart_collector._SgIoHdr) == 88
+    assert ctypes.sizeof(smart_collector._NvmePassthruCmd) == 72
+    assert smart_collector.NVME_IOCTL_ADMIN_CMD >> 16 & 0x3FFF == 72
+
+
+# ─── smartctl JSON: streamed (ijson events) and whole-document parses ───
+
+SMARTCTL_ATA = {
+    "json_format_version": [1, 0],
+    "smartctl": {"version": [7, 3], "exit_status": 0},
+    "device": {"name": "/dev/sda", "type": "sat"},
+    "ata_smart_attributes": {
+        "revision": 16,
+        "table": [
+            {"id": 5, "name": "Reallocated_Sector_Ct", "value": 100,
+             "flags": {"value": 51, "string": "PO--CK "}, "raw": {"value": 3, "string": "3"}},
+            {"id": 9, "name": "Power_On_Hours", "raw": {"value": 12034, "string": "12034"}},
+            {"id": 194, "name": "Temperature_Celsius",
+             "raw": {"value": 193275871267, "string": "35 (Min/Max 20/45)"}},
+            {"id": 199, "name": "UDMA_CRC_Error_Count"},     # no raw block
+        ],
+    },
+    "power_on_time": {"hours": 12034},
+    "temperature": {"current": 35},
+}
+
+SMARTCTL_NVME = {
+    "device": {"name": "/dev/nvme0", "type": "nvme"},
+    "nvme_smart_health_information_log": {
+        "critical_warning": 0,
+        "temperature": 41,
+        "available_spare": 100,
+        "power_cycles": 812,
+        "power_on_hours": 4410,
+        "unsafe_shutdowns": 19,
+        "media_errors": 2,
+    },
+    "temperature": {"current": 41},
+}
+
+
+def _events(document):
+    ijson = pytest.importorskip("ijson")
+    return ijson.parse(json.dumps(document).encode())
+
+
+@pytest.mark.parametrize("document, expected", [
+    (SMARTCTL_ATA, {"smart_5": 3, "smart_9": 12034, "smart_194": 193275871267, "smart_199": 0}),
+    (SMARTCTL_NVME, {"smart_5": 2, "smart_194": 41, "smart_9": 4410, "smart_12": 812}),
+    ({"smartctl": {"exit_status": 2}}, {}),
+])
+def test_map_smartctl_events_matches_whole_document_parse(document, expected):
+    assert smart_collector._map_smartctl_events(_events(document)) == expected
+    assert smart_collector._parse_smartctl("/dev/test", document) == expected
+
+
+def test_map_smartctl_events_nvme_missing_field_defaults_to_zero():
+    document = {"nvme_smart_health_information_log": {"temperature": 30}}
+    assert smart_collector._map_smartctl_events(_events(document)) == {
+        "smart_5": 0, "smart_194": 30, "smart_9": 0, "smart_12": 0,
+    }
+
+
+@pytest.mark.parametrize("streamed", [True, False])
+def test_smartctl_read_end_to_end(tmp_path, monkeypatch, streamed):
+    if streamed:
+        pytest.importorskip("ijson")
+    else:
+        monkeypatch.setattr(smart_collector, "_ijson", None)
+    fixture = tmp_path / "smartctl.json"
+    fixture.write_text(json.dumps(SMARTCTL_ATA))
+    smartctl = tmp_path / "smartctl"
+    smartctl.write_text(f"#!/bin/sh\ncat {fixture}\nexit 64\n")    # 64: error log has entries
+    smartctl.chmod(0o755)
+    monkeypatch.setattr(smart_collector, "_smartctl_path", lambda: str(smartctl))
+
+    assert smart_collector._get_smart_data_smartctl("/dev/sda") == {
+        "smart_5": 3, "smart_9": 12034, "smart_194": 193275871267, "smart_199": 0,
+    }
@@ -0,0 +1,263 @@
+"""
+SENTINEL-DISK Pro — SMARTReader scan sharing and smartctl parsing tests
+
+Run with: python -m pytest -q test_smart_reader.py
+"""
+
+import asyncio
+import json
+import os
+import threading
+import time
+
+import smart_reader
+from health_engine import HealthPredictionEngine
+from smart_reader import SMARTReader
+
+
+def _drive(drive_id="_dev_sda"):
+    return {
+        "drive_id": drive_id,
+        "device_path": "/dev/sda",
+        "model": "Test Drive",
+        "serial": "T1",
+        "smart_values": {"smart_5": 0, "smart_9": 1200, "smart_194": 35},
+        "smart_passed": True,
+        "timestamp": "2026-01-01T00:00:00",
+        "is_simulated": False,
+    }
+
+
+def _reader_with_slow_async_scan(monkeypatch, drives):
+    """A reader whose async (Linux) scan takes 0.2 s; counts scans of either kind"""
+    reader = SMARTReader()
+    scans = {"async": 0, "sync": 0}
+
+    async def slow_scan():
+        scans["async"] += 1
+        await asyncio.sleep(0.2)
+        return drives
+
+    def sync_scan():
+        scans["sync"] += 1
+        return drives
+
+    monkeypatch.setattr(smart_reader.platform, "system", lambda: "Linux")
+    monkeypatch.setattr(reader, "_get_drives_linux_async", slow_scan)
+    monkeypatch.setattr(reader, "_detect_drives", sync_scan)
+    return reader, scans
+
+
+def _run_with_deadline(coro_fn, seconds=5):
+    """Run coro_fn() on a fresh loop in a thread; fail (not hang) if the loop wedges"""
+    outcome = {}
+
+    def target():
+        outcome["value"] = asyncio.run(coro_fn())
+
+    thread = threading.Thread(target=target, daemon=True)
+    thread.start()
+    thread.join(seconds)
+    assert not thread.is_alive(), "event loop blocked on a scan owned by the same loop"
+    return outcome["value"]
+
+
+# ─── Sync and async callers sharing one scan ───
+
+def test_sync_call_on_loop_does_not_block_async_owned_scan(monkeypatch):
+    reader, scans = _reader_with_slow_async_scan(monkeypatch, [_drive()])
+
+    async def scenario():
+        owner = asyncio.create_task(reader.get_all_drives_async())
+        await asyncio.sleep(0)       # the task now owns the in-flight scan
+        history = reader.get_smart_history("_dev_sda", days=5)   # sync, on the loop
+        return history, await owner
+
+    history, drives = _run_with_deadline(scenario)
+    assert len(history) == 5
+    assert [d["drive_id"] for d in drives] == ["_dev_sda"]
+    assert scans["async"] == 1
+
+
+def test_sync_call_on_loop_serves_previous_scan_while_async_refreshes(monkeypatch):
+    reader, scans = _reader_with_slow_async_scan(monkeypatch, [_drive()])
+    reader.get_all_drives()          # fills the cache with a sync scan
+
+    async def scenario():
+        owner = asyncio.create_task(reader.get_all_drives_async(refresh=True))
+        await asyncio.sleep(0)
+        drives = reader.get_all_drives(refresh=True)
+        await owner
+        return drives
+
+    drives = _run_with_deadline(scenario)
+    assert [d["drive_id"] for d in drives] == ["_dev_sda"]
+    # The loop-thread caller reused the cached scan instead of starting another
+    assert scans == {"async": 1, "sync": 1}
+
+
+def test_worker_thread_joins_async_owned_scan(monkeypatch):
+    reader, scans = _reader_with_slow_async_scan(monkeypatch, [_drive()])
+
+    async def scenario():
+        owner = asyncio.create_task(reader.get_all_drives_async())
+        await asyncio.sleep(0)
+        # Off the loop, waiting on the shared future is safe and expected
+        drives = await asyncio.to_thread(reader.get_all_drives)
+        await owner
+        return drives
+
+    drives = _run_with_deadline(scenario)
+    assert [d["drive_id"] for d in drives] == ["_dev_sda"]
+    assert scans == {"async": 1, "sync": 0}
+
+
+# ─── Batched smartctl ───
+
+def _smartctl_json(reallocated):
+    return json.dumps({
+        "model_name": "Test Drive",
+        "serial_number": "T1",
+        "ata_smart_attributes": {"table": [
+            {"id": 5,   "raw": {"value": reallocated}},
+            {"id": 194, "raw": {"value": 35}},
+        ]},
+        "smart_status": {"passed": True},
+    }).encode()
+
+
+def test_parse_smartctl_batch_splits_on_separators():
+    reader = SMARTReader()
+    stdout = (
+        _smartctl_json(0) + b"\n===SEP=== 0\n"
+        + _smartctl_json(8) + b"\n===SEP=== 4\n"
+    )
+    first, second = reader._parse_smartctl_batch(["/dev/sda", "/dev/sdb"], stdout)
+    assert first["drive_id"] == "_dev_sda"
+    assert first["smart_values"] == {"smart_5": 0, "smart_194": 35}
+    assert second["drive_id"] == "_dev_sdb"
+    assert second["smart_values"]["smart_5"] == 8
+
+
+def test_parse_smartctl_batch_missing_separator_drops_only_that_device():
+    reader = SMARTReader()
+    # sdb was cut off mid-output (no separator); sdc never started
+    stdout = _smartctl_json(0) + b"\n===SEP=== 0\n" + _smartctl_json(8)[:20]
+    readings = reader._parse_smartctl_batch(["/dev/sda", "/dev/sdb", "/dev/sdc"], stdout)
+    assert readings[0]["smart_values"]["smart_5"] == 0
+    assert readings[1:] == [None, None]
+
+
+def test_parse_smartctl_batch_bad_json_drops_only_that_device():
+    reader = SMARTReader()
+    stdout = b"garbage\n===SEP=== 1\n" + _smartctl_json(3) + b"\n===SEP=== 0\n"
+    readings = reader._parse_smartctl_batch(["/dev/sda", "/dev/sdb"], stdout)
+    assert readings[0] is None
+    assert readings[1]["smart_values"]["smart_5"] == 3
+
+
+def _fake_smartctl(tmp_path, monkeypatch):
+    """A smartctl on PATH that answers at once, except for */hang which sleeps"""
+    pidfile = tmp_path / "hung.pid"
+    script = tmp_path / "smartctl"
+    script.write_text(
+        "#!/bin/sh\n"
+        'for last; do :; done\n'
+        f'case "$last" in */hang) echo $$ > {pidfile}; exec sleep 30;; esac\n'
+        f"echo '{_smartctl_json(2).decode()}'\n"
+    )
+    script.chmod(0o755)
+    monkeypatch.setenv("PATH", f"{tmp_path}:{os.environ['PATH']}")
+    return pidfile
+
+
+def _assert_killed(pidfile):
+    pid = int(pidfile.read_text())
+    for _ in range(50):
+        try:
+            with open(f"/proc/{pid}/stat") as f:
+                # A zombie is dead, just not yet reaped by whoever inherited it
+                if f.read().rpartition(")")[2].split()[0] == "Z":
+                    return
+        except FileNotFoundError:
+            return
+        time.sleep(0.05)
+    raise AssertionError(f"hung smartctl {pid} still running")
+
+
+DEVICES = ["/dev/sda", "/dev/hang", "/dev/sdb"]
+
+
+def test_batch_per_device_timeout_keeps_the_other_disks(tmp_path, monkeypatch):
+    pidfile = _fake_smartctl(tmp_path, monkeypatch)
+    monkeypatch.setattr(smart_reader, "_SMARTCTL_BATCH_SCRIPT",
+                        smart_reader._SMARTCTL_BATCH_SCRIPT.replace("timeout 15 ", "timeout 1 "))
+    readings = SMARTReader()._read_smartctl_batch(DEVICES)
+    assert [r and r["drive_id"] for r in readings] == ["_dev_sda", None, "_dev_sdb"]
+    _assert_killed(pidfile)
+
+
+def test_batch_deadline_keeps_finished_disks_and_kills_the_group(tmp_path, monkeypatch):
+    pidfile = _fake_smartctl(tmp_path, monkeypatch)
+    # No per-device timeout, so only the overall deadline stops the hung read
+    monkeypatch.setattr(smart_reader, "_SMARTCTL_BATCH_SCRIPT",
+                        smart_reader._SMARTCTL_BATCH_SCRIPT.replace("timeout 15 ", ""))
+    monkeypatch.setattr(smart_reader, "_SMARTCTL_TIMEOUT_S", 0.5)
+    monkeypatch.setattr(smart_reader, "_SMARTCTL_BATCH_SLACK_S", 0)
+
+    readings = SMARTReader()._read_smartctl_batch(DEVICES)
+    assert [r and r["drive_id"] for r in readings] == ["_dev_sda", None, None]
+    _assert_killed(pidfile)
+
+    pidfile.unlink()
+    readings = asyncio.run(SMARTReader()._read_smartctl_batch_async(DEVICES))
+    assert [r and r["drive_id"] for r in readings] == ["_dev_sda", None, None]
+    _assert_killed(pidfile)
+
+
+# ─── Drives left in standby ───
+
+def test_standby_drive_keeps_its_last_real_reading():
+    reader = SMARTReader()
+    failing = _drive()
+    failing["smart_values"] = {"smart_5": 120, "smart_197": 40}
+    scan, _, _ = reader._join_scan()
+    reader._finish_scan(scan, [failing])
+
+    asleep = reader._standby_reading("_dev_sda", "/dev/sda")
+    scan, _, _ = reader._join_scan()
+    reader._finish_scan(scan, [asleep])
+
+    drive, = reader.get_all_drives()
+    assert drive["standby"] is True
+    assert drive["smart_values"] == {"smart_5": 120, "smart_197": 40}
+    assert drive["serial"] == "T1"
+
+
+def test_standby_drive_without_a_reading_gets_no_made_up_history():
+    reader = SMARTReader()
+    scan, _, _ = reader._join_scan()
+    reader._finish_scan(scan, [reader._standby_reading("_dev_sda", "/dev/sda")])
+
+    drive, = reader.get_all_drives()
+    assert drive["standby"] is True and drive["smart_values"] == {}
+    history = reader.get_smart_history("_dev_sda")
+    assert history == []
+    assert HealthPredictionEngine().predict(history)["risk_level"] == "Unknown"
+
+
+def test_drive_without_attributes_that_is_awake_keeps_its_history(monkeypatch):
+    # macOS drives come back with no SMART attributes but are not in standby
+    import main
+
+    reader = SMARTReader()
+    apple = {**_drive("disk0"), "smart_values": {}, "smart_passed": True}
+    scan, _, _ = reader._join_scan()
+    reader._finish_scan(scan, [apple])
+
+    assert len(reader.get_smart_history("disk0", days=30)) == 30
+
+    monkeypatch.setattr(main, "smart_reader", reader)
+    response = asyncio.run(main.get_drive_health("disk0"))
+    assert response["drive_id"] == "disk0"
+    assert response["prediction"]["risk_level"] != "Unknown"
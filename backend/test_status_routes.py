@@ -0,0 +1,91 @@
+"""
+SENTINEL-DISK Pro — /drives and /status conditional GET (ETag / 304) tests
+
+The route coroutines are called directly with a bare ASGI request.
+
+Run with: python -m pytest -q test_status_routes.py
+"""
+
+import asyncio
+import json
+
+from starlette.requests import Request
+
+from routes import status as status_routes
+
+
+def _request(if_none_match=None):
+    headers = [(b"if-none-match", if_none_match.encode())] if if_none_match else []
+    return Request({"type": "http", "method": "GET", "path": "/", "query_string": b"", "headers": headers})
+
+
+def _get_status(drive_id, if_none_match=None, view="full", fields=None):
+    return asyncio.run(status_routes.get_status(_request(if_none_match), drive_id, view, fields))
+
+
+def test_not_modified_header_forms():
+    etag = '"abc"'
+    assert not status_routes._not_modified(_request(), etag)
+    assert status_routes._not_modified(_request('"abc"'), etag)
+    assert status_routes._not_modified(_request('"zzz", W/"abc"'), etag)
+    assert status_routes._not_modified(_request("*"), etag)
+    assert not status_routes._not_modified(_request('"abcd"'), etag)
+
+
+def test_drive_list_revalidates_with_304():
+    first = asyncio.run(status_routes.list_drives(_request()))
+    assert first.status_code == 200
+    etag = first.headers["etag"]
+    assert first.headers["cache-control"] == "no-cache"
+    assert any(d["drive_id"] == "REAL_DRIVE" for d in json.loads(first.body))
+
+    again = asyncio.run(status_routes.list_drives(_request(etag)))
+    assert again.status_code == 304
+    assert again.body == b""
+    assert again.headers["etag"] == etag
+
+
+def test_simulated_status_body_and_304():
+    first = _get_status("DRIVE_A_HEALTHY")
+    assert first.status_code == 200
+    payload = json.loads(first.body)       # last_updated is spliced into the cached bytes
+    assert payload["drive_id"] == "DRIVE_A_HEALTHY"
+    assert list(payload)[-1] == "last_updated"
+    etag = first.headers["etag"]
+
+    # The per-request timestamp doesn't change the ETag
+    assert _get_status("DRIVE_A_HEALTHY").headers["etag"] == etag
+    not_modified = _get_status("DRIVE_A_HEALTHY", if_none_match=etag)
+    assert not_modified.status_code == 304 and not_modified.body == b""
+
+    stale = _get_status("DRIVE_A_HEALTHY", if_none_match='"stale"')
+    assert stale.status_code == 200
+
+
+def test_projections_have_their_own_etags():
+    full = _get_status("DRIVE_B_WARNING")
+    summary = _get_status("DRIVE_B_WARNING", view="summary")
+    health = _get_status("DRIVE_B_WARNING", fields="health")
+    etags = {full.headers["etag"], summary.headers["etag"], health.headers["etag"]}
+    assert len(etags) == 3
+    assert set(json.loads(health.body)) == {"drive_id", "health", "last_updated"}
+    # A full-payload ETag must not validate the summary
+    assert _get_status("DRIVE_B_WARNING", if_none_match=full.headers["etag"], view="summary").status_code == 200
+
+
+def test_real_drive_etag_follows_refresh(monkeypatch):
+    snapshot = {"drive_id": "REAL_DRIVE", "health": {"score": 90}, "last_updated": "t1"}
+
+    async def cached_real_status():
+        return dict(snapshot)
+
+    monkeypatch.setattr(status_routes, "_cached_real_status", cached_real_status)
+    first = _get_status("REAL_DRIVE")
+    etag = first.headers["etag"]
+    assert json.loads(first.body) == snapshot
+    assert _get_status("REAL_DRIVE", if_none_match=etag).status_code == 304
+
+    snapshot["last_updated"] = "t2"          # the TTL cache refreshed
+    refreshed = _get_status("REAL_DRIVE", if_none_match=etag)
+    assert refreshed.status_code == 200
+    assert refreshed.headers["etag"] != etag
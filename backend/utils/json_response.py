@@ -0,0 +1,39 @@
+"""
+SENTINEL-DISK Pro — JSON Encoding
+
+Response class and byte encoder shared by the app and the pre-encoded route
+caches. Uses orjson when installed and falls back to the stdlib encoder with
+the same compact output FastAPI's JSONResponse produces.
+"""
+
+import json
+from typing import Any
+
+from fastapi.responses import JSONResponse
+
+try:
+    import orjson
+    _ORJSON_OPTS = (orjson.OPT_NAIVE_UTC | orjson.OPT_UTC_Z
+                    | orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY)
+except ImportError:
+    orjson = None
+
+
+def dumps(content: Any) -> bytes:
+    """Encode already JSON-compatible content to UTF-8 bytes."""
+    if orjson is not None:
+        return orjson.dumps(content, option=_ORJSON_OPTS)
+    return json.dumps(
+        content,
+        ensure_ascii=False,
+        allow_nan=False,
+        indent=None,
+        separators=(",", ":"),
+    ).encode("utf-8")
+
+
+class ORJSONResponse(JSONResponse):
+    """Default response class — orjson-encoded when available."""
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
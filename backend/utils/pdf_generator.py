@@ -9,12 +9,20 @@ from reportlab.platypus import (
     SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle,
     HRFlowable, KeepTogether
 )
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+from reportlab.lib.styles import ParagraphStyle
 from reportlab.lib import colors
 from reportlab.lib.units import inch, mm
 from reportlab.lib.enums import TA_CENTER, TA_LEFT, TA_RIGHT
 from io import BytesIO
+from collections import OrderedDict
 from datetime import datetime
+import copy
+import functools
+import hashlib
+import json
+import os
+import threading
+import time
 
 
 # ── Brand colours ────────────────────────────────────────────────────────────
@@ -26,19 +34,153 @@ BRAND_GREEN  = colors.HexColor("#10B981")
 BRAND_GREY   = colors.HexColor("#64748B")
 BRAND_LITE   = colors.HexColor("#F1F5F9")
 BRAND_WHITE  = colors.white
+BORDER_LITE  = colors.HexColor("#E2E8F0")
+BORDER_GRID  = colors.HexColor("#CBD5E1")
+PANEL_BG     = colors.HexColor("#F8FAFC")
 
+# "0x..." strings for inline <font color> markup, for the colours picked per report
+HEXVALS = {c: c.hexval() for c in (BRAND_GREEN, BRAND_AMBER, BRAND_RED)}
 
-# ── SMART attribute metadata ──────────────────────────────────────────────────
-SMART_ATTRS = [
-    ("5",   "Reallocated Sectors Count",     "smart_5",   0,     "Count of reallocated sectors. Any non-zero value is a warning."),
-    ("187", "Reported Uncorrectable Errors",  "smart_187", 0,     "Errors that could not be recovered. Must be 0."),
-    ("188", "Command Timeout",               "smart_188", 0,     "Commands that timed out. Should be 0."),
-    ("197", "Current Pending Sector Count",  "smart_197", 0,     "Sectors waiting for transfer — may indicate imminent failure."),
-    ("198", "Offline Uncorrectable Sectors", "smart_198", 0,     "Sectors that could not be corrected during offline scan."),
-    ("194", "Drive Temperature (°C)",        "smart_194", 55,    "Operating temperature. Safe range: 15–50 °C."),
-    ("9",   "Power-On Hours",               "smart_9",   50000, "Total hours the drive has been powered on."),
-    ("12",  "Power Cycle Count",            "smart_12",  5000,  "Number of times the drive has been powered on/off."),
+
+# ── Paragraph styles (fixed, so built once rather than per report / per cell) ─
+TITLE_STYLE = ParagraphStyle(
+    "SentinelTitle",
+    fontSize=20, fontName="Helvetica-Bold",
+    textColor=BRAND_DARK, spaceAfter=2,
+)
+SECTION_STYLE = ParagraphStyle(
+    "SentinelSection",
+    fontSize=10, fontName="Helvetica-Bold",
+    textColor=BRAND_DARK, spaceBefore=14, spaceAfter=6,
+)
+NOTE_STYLE = ParagraphStyle(
+    "SentinelNote",
+    fontSize=7.5, fontName="Helvetica-Oblique",
+    textColor=BRAND_GREY, leading=11,
+)
+HEADER_STYLE     = ParagraphStyle("hdr", fontSize=9, fontName="Helvetica", alignment=TA_RIGHT, leading=14)
+OF100_STYLE      = ParagraphStyle("of100", fontSize=10, fontName="Helvetica",
+                                  textColor=BRAND_GREY, alignment=TA_CENTER)
+PREDICTION_STYLE = ParagraphStyle("pl", fontSize=7.5, fontName="Helvetica",
+                                  textColor=BRAND_GREY, alignment=TA_CENTER, spaceBefore=2)
+TH_CENTER_STYLE  = ParagraphStyle("th", fontSize=8, fontName="Helvetica-Bold", textColor=BRAND_WHITE, alignment=TA_CENTER)
+TH_LEFT_STYLE    = ParagraphStyle("th", fontSize=8, fontName="Helvetica-Bold", textColor=BRAND_WHITE)
+TD_STYLE         = ParagraphStyle("td", fontSize=8, fontName="Helvetica")
+TD_NOTE_STYLE    = ParagraphStyle("td", fontSize=7, fontName="Helvetica", textColor=BRAND_GREY, leading=10)
+REC_STYLE        = ParagraphStyle("rec", fontSize=8.5, fontName="Helvetica", leading=13)
+FOOTER_STYLE     = ParagraphStyle("footer", fontSize=7, fontName="Helvetica", textColor=BRAND_GREY,
+                                  alignment=TA_CENTER, leading=10)
+
+# Score and risk label take the health colour; one style per _health_color result
+SCORE_STYLES = {
+    color: ParagraphStyle("hs", fontSize=46, fontName="Helvetica-Bold",
+                          textColor=color, alignment=TA_CENTER)
+    for color in (BRAND_GREEN, BRAND_AMBER, BRAND_RED)
+}
+RISK_STYLES = {
+    color: ParagraphStyle("rl", fontSize=11, fontName="Helvetica-Bold",
+                          textColor=color, alignment=TA_CENTER, spaceBefore=4)
+    for color in (BRAND_GREEN, BRAND_AMBER, BRAND_RED)
+}
+
+
+# ── Table styles (setStyle only reads them, so one instance serves every report) ─
+HEADER_TABLE_STYLE = TableStyle([
+    ("VALIGN",      (0, 0), (-1, -1), "MIDDLE"),
+    ("LEFTPADDING", (0, 0), (-1, -1), 0),
+    ("RIGHTPADDING",(0, 0), (-1, -1), 0),
+])
+INFO_TABLE_STYLE = TableStyle([
+    ("FONTNAME",    (0, 0), (-1, -1), "Helvetica"),
+    ("FONTSIZE",    (0, 0), (-1, -1), 8.5),
+    ("FONTNAME",    (0, 0), (0, -1),  "Helvetica-Bold"),
+    ("TEXTCOLOR",   (0, 0), (0, -1),  BRAND_GREY),
+    ("TEXTCOLOR",   (1, 0), (1, -1),  BRAND_DARK),
+    ("ROWBACKGROUNDS", (0,0), (-1,-1), [BRAND_LITE, BRAND_WHITE]),
+    ("LEFTPADDING", (0, 0), (-1, -1), 8),
+    ("TOPPADDING",  (0, 0), (-1, -1), 5),
+    ("BOTTOMPADDING",(0,0),(-1,-1),   5),
+    ("GRID",        (0, 0), (-1, -1), 0.3, BORDER_LITE),
+])
+HEALTH_TABLE_STYLE = TableStyle([
+    ("ALIGN",       (0, 0), (-1, -1), "CENTER"),
+    ("TOPPADDING",  (0, 0), (-1, -1), 3),
+    ("BOTTOMPADDING",(0,0),(-1,-1),   3),
+    ("ROUNDEDCORNERS", [6]),
+    ("BOX",  (0,0),(-1,-1), 0.5, BORDER_LITE),
+])
+COMBO_TABLE_STYLE = TableStyle([
+    ("VALIGN",      (0, 0), (-1, -1), "MIDDLE"),
+    ("LEFTPADDING", (0, 0), (-1, -1), 0),
+    ("RIGHTPADDING",(0, 0), (-1, -1), 0),
+    ("RIGHTPADDING",(0, 0), (0, 0),   12),
+])
+# The SMART table's status colours are appended per report.
+# ID, value and status cells are plain strings styled here: they are short and
+# never wrap, so they skip Paragraph's markup parsing
+SMART_TABLE_CMDS = [
+    ("BACKGROUND",  (0, 0), (-1, 0),  BRAND_DARK),
+    ("ROWBACKGROUNDS", (0,1),(-1,-1), [BRAND_LITE, BRAND_WHITE]),   # cycles over the rows
+    ("FONTNAME",    (0, 1), (-1, -1), "Helvetica-Bold"),
+    ("FONTSIZE",    (0, 1), (-1, -1), 8),
+    ("ALIGN",       (0, 1), (0, -1),  "CENTER"),
+    ("ALIGN",       (2, 1), (3, -1),  "CENTER"),
+    ("GRID",        (0, 0), (-1, -1), 0.25, BORDER_GRID),
+    ("VALIGN",      (0, 0), (-1, -1), "MIDDLE"),
+    ("TOPPADDING",  (0, 0), (-1, -1), 5),
+    ("BOTTOMPADDING",(0,0),(-1,-1),   5),
+    ("LEFTPADDING", (0, 0), (-1, -1), 6),
+    ("RIGHTPADDING",(0, 0), (-1, -1), 6),
 ]
+# Recommendation box, outlined in the recommendation's colour
+REC_TABLE_STYLES = {
+    color: TableStyle([
+        ("BACKGROUND",   (0,0),(-1,-1), PANEL_BG),
+        ("BOX",          (0,0),(-1,-1), 1.5, color),
+        ("LEFTPADDING",  (0,0),(-1,-1), 12),
+        ("RIGHTPADDING", (0,0),(-1,-1), 12),
+        ("TOPPADDING",   (0,0),(-1,-1), 10),
+        ("BOTTOMPADDING",(0,0),(-1,-1), 10),
+    ])
+    for color in (BRAND_GREEN, BRAND_AMBER, BRAND_RED)
+}
+
+
+# ── Warranty recommendation ───────────────────────────────────────────────────
+# (title, body) per health colour; parsed into Paragraphs once at import
+REC_TEXT = {
+    BRAND_GREEN: ("Drive is Operating Normally",
+                  "This drive is within healthy operating parameters. No immediate replacement "
+                  "is required. Continue regular monitoring and maintain backup schedules."),
+    BRAND_AMBER: ("Drive Shows Signs of Wear — Backup Recommended",
+                  "Health degradation detected. Data backup is strongly recommended. "
+                  "Evaluate warranty replacement based on age and usage. Contact the drive "
+                  "manufacturer with this report if errors are present in SMART attributes."),
+    BRAND_RED:   ("⚠ Critical — Warranty Replacement Recommended",
+                  "Drive health is critically low. Immediate data backup is essential. "
+                  "Submit this document to your drive manufacturer warranty department for "
+                  "replacement consideration. Do not rely on this drive as primary storage."),
+}
+REC_PARAGRAPHS = {
+    color: Paragraph(f"<font color='{HEXVALS[color]}'><b>{title}</b></font><br/>"
+                     f"<font color='#334155' size='8'>{body}</font>",
+                     REC_STYLE)
+    for color, (title, body) in REC_TEXT.items()
+}
+
+
+# ── SMART attribute metadata ──────────────────────────────────────────────────
+# (id, name, key, threshold, note, value formatter)
+SMART_ATTRS = (
+    ("5",   "Reallocated Sectors Count",     "smart_5",   0,     "Count of reallocated sectors. Any non-zero value is a warning.", str),
+    ("187", "Reported Uncorrectable Errors",  "smart_187", 0,     "Errors that could not be recovered. Must be 0.", str),
+    ("188", "Command Timeout",               "smart_188", 0,     "Commands that timed out. Should be 0.", str),
+    ("197", "Current Pending Sector Count",  "smart_197", 0,     "Sectors waiting for transfer — may indicate imminent failure.", str),
+    ("198", "Offline Uncorrectable Sectors", "smart_198", 0,     "Sectors that could not be corrected during offline scan.", str),
+    ("194", "Drive Temperature (°C)",        "smart_194", 55,    "Operating temperature. Safe range: 15–50 °C.", lambda v: f"{v} °C"),
+    ("9",   "Power-On Hours",               "smart_9",   50000, "Total hours the drive has been powered on.", lambda v: f"{int(v):,} h"),
+    ("12",  "Power Cycle Count",            "smart_12",  5000,  "Number of times the drive has been powered on/off.", lambda v: f"{int(v):,}"),
+)
 
 
 def _health_color(score: float):
@@ -47,22 +189,57 @@ def _health_color(score: float):
     return BRAND_RED
 
 
+# (status_text, color) results, shared rather than rebuilt per row
+STATUS_OK     = ("✔ OK",     BRAND_GREEN)
+STATUS_FAIL   = ("⚠ FAIL",   BRAND_RED)
+STATUS_EXCEED = ("⚠ EXCEED", BRAND_RED)
+STATUS_WARN   = ("△ WARN",   BRAND_AMBER)
+STATUS_NA     = ("N/A",      BRAND_GREY)
+
+
 def _status_for_attr(key, value, threshold):
     """Return (status_text, color) for a SMART attribute."""
+    # Readings repeat across reports (zero sector counts above all); values
+    # that can't be hashed skip the cache
     try:
-        v = float(value)
-    except (TypeError, ValueError):
-        return "N/A", BRAND_GREY
+        return _cached_status_for_attr(key, value, threshold)
+    except TypeError:
+        return _compute_status_for_attr(key, value, threshold)
 
-    if threshold == 0:
-        if v > 0:
-            return "⚠ FAIL", BRAND_RED
-        return "✔ OK", BRAND_GREEN
+
+def _compute_status_for_attr(key, value, threshold):
+    if isinstance(value, (int, float)):   # the usual case: no float() / try
+        v = value
     else:
-        ratio = v / threshold
-        if ratio >= 1.0:   return "⚠ EXCEED", BRAND_RED
-        if ratio >= 0.75:  return "△ WARN",   BRAND_AMBER
-        return "✔ OK",     BRAND_GREEN
+        try:
+            v = float(value)
+        except (TypeError, ValueError):
+            return STATUS_NA
+
+    if threshold == 0:
+        return STATUS_FAIL if v > 0 else STATUS_OK
+    ratio = v / threshold
+    if ratio >= 1.0:   return STATUS_EXCEED
+    if ratio >= 0.75:  return STATUS_WARN
+    return STATUS_OK
+
+
+_cached_status_for_attr = functools.lru_cache(maxsize=512)(_compute_status_for_attr)
+
+
+# zlib page compression: ~2.7x smaller files for ~10% of the build time; set
+# PDF_PAGE_COMPRESSION=0 where reports only travel over a local link
+PDF_PAGE_COMPRESSION = os.environ.get("PDF_PAGE_COMPRESSION", "1") != "0"
+
+
+# ── Rendered report cache ─────────────────────────────────────────────────────
+# Repeat downloads of an unchanged drive get the same document (same report ID)
+# instead of another reportlab build; the TTL bounds how old its "Generated"
+# stamp can be. Keyed by a digest of drive_data, so new SMART data misses.
+PDF_CACHE_TTL_S = 300
+PDF_CACHE_MAX   = 32
+_pdf_cache      = OrderedDict()   # digest → (expires_at monotonic, pdf bytes)
+_pdf_cache_lock = threading.Lock()
 
 
 def generate_pdf_report(drive_data: dict) -> BytesIO:
@@ -73,46 +250,38 @@ def generate_pdf_report(drive_data: dict) -> BytesIO:
         model, serial_number, capacity_gb,
         health_score, risk_level, days_to_failure, smart_history (list of dicts)
     """
+    key = hashlib.blake2b(
+        json.dumps(drive_data, sort_keys=True, default=str).encode(), digest_size=16
+    ).digest()
+    now = time.monotonic()
+
+    with _pdf_cache_lock:
+        cached = _pdf_cache.get(key)
+        if cached is not None and cached[0] > now:
+            _pdf_cache.move_to_end(key)
+            return BytesIO(cached[1])
+
+    pdf = _render_pdf_report(drive_data)
+
+    with _pdf_cache_lock:
+        _pdf_cache[key] = (now + PDF_CACHE_TTL_S, pdf)
+        _pdf_cache.move_to_end(key)
+        while len(_pdf_cache) > PDF_CACHE_MAX:
+            _pdf_cache.popitem(last=False)
+
+    # Each caller gets its own stream over the shared bytes
+    return BytesIO(pdf)
+
+
+def _render_pdf_report(drive_data: dict) -> bytes:
+    """Build the report with reportlab; see generate_pdf_report."""
     buffer = BytesIO()
     doc = SimpleDocTemplate(
         buffer,
         pagesize=letter,
         leftMargin=0.65*inch, rightMargin=0.65*inch,
         topMargin=0.6*inch,  bottomMargin=0.6*inch,
-    )
-
-    styles = getSampleStyleSheet()
-
-    # ── Custom styles ─────────────────────────────────────────────────────────
-    title_style = ParagraphStyle(
-        "SentinelTitle",
-        fontSize=20, fontName="Helvetica-Bold",
-        textColor=BRAND_DARK, spaceAfter=2,
-    )
-    subtitle_style = ParagraphStyle(
-        "SentinelSub",
-        fontSize=9, fontName="Helvetica",
-        textColor=BRAND_GREY, spaceAfter=0,
-    )
-    section_style = ParagraphStyle(
-        "SentinelSection",
-        fontSize=10, fontName="Helvetica-Bold",
-        textColor=BRAND_DARK, spaceBefore=14, spaceAfter=6,
-    )
-    body_style = ParagraphStyle(
-        "SentinelBody",
-        fontSize=8.5, fontName="Helvetica",
-        textColor=BRAND_DARK, leading=13,
-    )
-    note_style = ParagraphStyle(
-        "SentinelNote",
-        fontSize=7.5, fontName="Helvetica-Oblique",
-        textColor=BRAND_GREY, leading=11,
-    )
-    score_style = ParagraphStyle(
-        "Score",
-        fontSize=38, fontName="Helvetica-Bold",
-        textColor=BRAND_DARK, alignment=TA_CENTER,
+        pageCompression=int(PDF_PAGE_COMPRESSION),
     )
 
     story = []
@@ -122,20 +291,16 @@ def generate_pdf_report(drive_data: dict) -> BytesIO:
     generated  = datetime.now().strftime("%B %d, %Y at %H:%M UTC")
 
     header_data = [[
-        Paragraph("SENTINEL-DISK<br/><font color='#3B82F6' size='8'>Pro</font>", title_style),
+        Paragraph("SENTINEL-DISK<br/><font color='#3B82F6' size='8'>Pro</font>", TITLE_STYLE),
         Paragraph(
             f"<b>DRIVE HEALTH WARRANTY CLAIM REPORT</b><br/>"
             f"<font color='#64748B'>Report ID: {report_id}<br/>"
             f"Generated: {generated}</font>",
-            ParagraphStyle("hdr", fontSize=9, fontName="Helvetica", alignment=TA_RIGHT, leading=14)
+            HEADER_STYLE
         ),
     ]]
     hdr_tbl = Table(header_data, colWidths=[3.2*inch, 4.1*inch])
-    hdr_tbl.setStyle(TableStyle([
-        ("VALIGN",      (0, 0), (-1, -1), "MIDDLE"),
-        ("LEFTPADDING", (0, 0), (-1, -1), 0),
-        ("RIGHTPADDING",(0, 0), (-1, -1), 0),
-    ]))
+    hdr_tbl.setStyle(HEADER_TABLE_STYLE)
     story.append(hdr_tbl)
     story.append(HRFlowable(width="100%", thickness=1, color=BRAND_BLUE, spaceAfter=12))
 
@@ -157,116 +322,81 @@ def generate_pdf_report(drive_data: dict) -> BytesIO:
         ["Report ID",         report_id],
     ]
     info_tbl = Table(info_rows, colWidths=[1.6*inch, 3.0*inch])
-    info_tbl.setStyle(TableStyle([
-        ("FONTNAME",    (0, 0), (-1, -1), "Helvetica"),
-        ("FONTSIZE",    (0, 0), (-1, -1), 8.5),
-        ("FONTNAME",    (0, 0), (0, -1),  "Helvetica-Bold"),
-        ("TEXTCOLOR",   (0, 0), (0, -1),  BRAND_GREY),
-        ("TEXTCOLOR",   (1, 0), (1, -1),  BRAND_DARK),
-        ("ROWBACKGROUNDS", (0,0), (-1,-1), [BRAND_LITE, BRAND_WHITE]),
-        ("LEFTPADDING", (0, 0), (-1, -1), 8),
-        ("TOPPADDING",  (0, 0), (-1, -1), 5),
-        ("BOTTOMPADDING",(0,0),(-1,-1),   5),
-        ("GRID",        (0, 0), (-1, -1), 0.3, colors.HexColor("#E2E8F0")),
-    ]))
+    info_tbl.setStyle(INFO_TABLE_STYLE)
 
     prediction_label = (
         f"Estimated {days_left} days remaining" if days_left
         else "No imminent failure predicted"
     )
     health_block = [
-        [Paragraph(f"<font color='{hcolor.hexval()}'><b>{int(health)}</b></font>",
-                   ParagraphStyle("hs", fontSize=46, fontName="Helvetica-Bold",
-                                  textColor=hcolor, alignment=TA_CENTER))],
-        [Paragraph("/100", ParagraphStyle("of100", fontSize=10, fontName="Helvetica",
-                                           textColor=BRAND_GREY, alignment=TA_CENTER))],
-        [Paragraph(f"<b>{risk_level}</b>",
-                   ParagraphStyle("rl", fontSize=11, fontName="Helvetica-Bold",
-                                  textColor=hcolor, alignment=TA_CENTER, spaceBefore=4))],
-        [Paragraph(prediction_label,
-                   ParagraphStyle("pl", fontSize=7.5, fontName="Helvetica",
-                                  textColor=BRAND_GREY, alignment=TA_CENTER, spaceBefore=2))],
+        [Paragraph(f"<font color='{HEXVALS[hcolor]}'><b>{int(health)}</b></font>", SCORE_STYLES[hcolor])],
+        [Paragraph("/100", OF100_STYLE)],
+        [Paragraph(f"<b>{risk_level}</b>", RISK_STYLES[hcolor])],
+        [Paragraph(prediction_label, PREDICTION_STYLE)],
     ]
     health_tbl = Table(health_block, colWidths=[2.1*inch])
-    health_tbl.setStyle(TableStyle([
-        ("ALIGN",       (0, 0), (-1, -1), "CENTER"),
-        ("TOPPADDING",  (0, 0), (-1, -1), 3),
-        ("BOTTOMPADDING",(0,0),(-1,-1),   3),
-        ("ROUNDEDCORNERS", [6]),
-        ("BOX",  (0,0),(-1,-1), 0.5, colors.HexColor("#E2E8F0")),
-    ]))
+    health_tbl.setStyle(HEALTH_TABLE_STYLE)
 
     combo = Table([[info_tbl, health_tbl]], colWidths=[4.75*inch, 2.55*inch])
-    combo.setStyle(TableStyle([
-        ("VALIGN",      (0, 0), (-1, -1), "MIDDLE"),
-        ("LEFTPADDING", (0, 0), (-1, -1), 0),
-        ("RIGHTPADDING",(0, 0), (-1, -1), 0),
-        ("RIGHTPADDING",(0, 0), (0, 0),   12),
-    ]))
+    combo.setStyle(COMBO_TABLE_STYLE)
     story.append(combo)
     story.append(Spacer(1, 14))
 
     # ── SMART Attributes Table ────────────────────────────────────────────────
-    story.append(Paragraph("SMART Attribute Analysis", section_style))
+    story.append(Paragraph("SMART Attribute Analysis", SECTION_STYLE))
 
     # Flatten smart history — pick last non-empty entry
     hist = drive_data.get("smart_history", [])
     smart = {}
     for entry in reversed(hist):
+        if not isinstance(entry, dict):
+            continue
         # Entry may be raw flat dict or may have 'smart_values' key
-        candidate = entry.get("smart_values", entry) if isinstance(entry, dict) else {}
-        if candidate and any(v not in (None, "") for v in candidate.values()):
-            smart = candidate
-            break
+        candidate = entry.get("smart_values", entry)
+        if not candidate:
+            continue
+        # Plain loop rather than any(genexpr): no generator per entry, stops at
+        # the first real value
+        for v in candidate.values():
+            if v is not None and v != "":
+                break
+        else:
+            continue
+        smart = candidate
+        break
 
     smart_rows = [[
-        Paragraph("<b>ID</b>",    ParagraphStyle("th", fontSize=8, fontName="Helvetica-Bold", textColor=BRAND_WHITE, alignment=TA_CENTER)),
-        Paragraph("<b>Attribute</b>",  ParagraphStyle("th", fontSize=8, fontName="Helvetica-Bold", textColor=BRAND_WHITE)),
-        Paragraph("<b>Value</b>", ParagraphStyle("th", fontSize=8, fontName="Helvetica-Bold", textColor=BRAND_WHITE, alignment=TA_CENTER)),
-        Paragraph("<b>Status</b>",ParagraphStyle("th", fontSize=8, fontName="Helvetica-Bold", textColor=BRAND_WHITE, alignment=TA_CENTER)),
-        Paragraph("<b>Note</b>",  ParagraphStyle("th", fontSize=8, fontName="Helvetica-Bold", textColor=BRAND_WHITE)),
+        Paragraph("<b>ID</b>",        TH_CENTER_STYLE),
+        Paragraph("<b>Attribute</b>", TH_LEFT_STYLE),
+        Paragraph("<b>Value</b>",     TH_CENTER_STYLE),
+        Paragraph("<b>Status</b>",    TH_CENTER_STYLE),
+        Paragraph("<b>Note</b>",      TH_LEFT_STYLE),
     ]]
 
-    row_colors = []
-    for i, (attr_id, name, key, threshold, note) in enumerate(SMART_ATTRS):
+    status_cmds = []
+    for i, (attr_id, name, key, threshold, note, fmt) in enumerate(SMART_ATTRS):
         raw_val = smart.get(key)
-        display = str(raw_val) if raw_val is not None else "N/A"
-        if key == "smart_194" and raw_val is not None:
-            display = f"{raw_val} °C"
-        if key == "smart_9" and raw_val is not None:
+        if raw_val is None:
+            display = "N/A"
+        else:
             try:
-                display = f"{int(raw_val):,} h"
-            except: pass
-        if key == "smart_12" and raw_val is not None:
-            try:
-                display = f"{int(raw_val):,}"
-            except: pass
+                display = fmt(raw_val)
+            except (TypeError, ValueError, OverflowError):   # e.g. "abc" or inf hours
+                display = str(raw_val)
 
         status_text, status_color = _status_for_attr(key, raw_val, threshold)
-        bg = BRAND_LITE if i % 2 == 0 else BRAND_WHITE
 
         smart_rows.append([
-            Paragraph(attr_id,     ParagraphStyle("td", fontSize=8, fontName="Helvetica-Bold", alignment=TA_CENTER)),
-            Paragraph(name,        ParagraphStyle("td", fontSize=8, fontName="Helvetica")),
-            Paragraph(display,     ParagraphStyle("td", fontSize=8, fontName="Helvetica-Bold", alignment=TA_CENTER)),
-            Paragraph(f"<font color='{status_color.hexval()}'><b>{status_text}</b></font>",
-                      ParagraphStyle("td", fontSize=8, fontName="Helvetica-Bold", alignment=TA_CENTER)),
-            Paragraph(note,        ParagraphStyle("td", fontSize=7, fontName="Helvetica", textColor=BRAND_GREY, leading=10)),
+            attr_id,
+            Paragraph(name,        TD_STYLE),
+            display,
+            status_text,
+            Paragraph(note,        TD_NOTE_STYLE),
         ])
-        row_colors.append(bg)
+        status_cmds.append(("TEXTCOLOR", (3, i + 1), (3, i + 1), status_color))
 
     smart_tbl = Table(smart_rows, colWidths=[0.35*inch, 1.7*inch, 0.7*inch, 0.75*inch, 3.8*inch])
-    style_cmds = [
-        ("BACKGROUND",  (0, 0), (-1, 0),  BRAND_DARK),
-        ("ROWBACKGROUNDS", (0,1),(-1,-1), row_colors),
-        ("GRID",        (0, 0), (-1, -1), 0.25, colors.HexColor("#CBD5E1")),
-        ("VALIGN",      (0, 0), (-1, -1), "MIDDLE"),
-        ("TOPPADDING",  (0, 0), (-1, -1), 5),
-        ("BOTTOMPADDING",(0,0),(-1,-1),   5),
-        ("LEFTPADDING", (0, 0), (-1, -1), 6),
-        ("RIGHTPADDING",(0, 0), (-1, -1), 6),
-    ]
-    smart_tbl.setStyle(TableStyle(style_cmds))
+    smart_tbl.setStyle(TableStyle(SMART_TABLE_CMDS + status_cmds))
     story.append(smart_tbl)
 
     if not smart:
@@ -275,46 +405,18 @@ def generate_pdf_report(drive_data: dict) -> BytesIO:
             "⚠ SMART attribute data is not available for this drive. This is typical for Apple "
             "Silicon internal SSDs, which report health status through the OS rather than standard "
             "SMART protocol. The drive OS health status is: <b>Verified (Healthy)</b>.",
-            note_style
+            NOTE_STYLE
         ))
 
     story.append(Spacer(1, 14))
 
     # ── Warranty Recommendation ────────────────────────────────────────────────
-    story.append(Paragraph("Warranty & Service Recommendation", section_style))
-
-    if health >= 80:
-        rec_color = BRAND_GREEN
-        rec_title = "Drive is Operating Normally"
-        rec_body  = ("This drive is within healthy operating parameters. No immediate replacement "
-                     "is required. Continue regular monitoring and maintain backup schedules.")
-    elif health >= 50:
-        rec_color = BRAND_AMBER
-        rec_title = "Drive Shows Signs of Wear — Backup Recommended"
-        rec_body  = ("Health degradation detected. Data backup is strongly recommended. "
-                     "Evaluate warranty replacement based on age and usage. Contact the drive "
-                     "manufacturer with this report if errors are present in SMART attributes.")
-    else:
-        rec_color = BRAND_RED
-        rec_title = "⚠ Critical — Warranty Replacement Recommended"
-        rec_body  = ("Drive health is critically low. Immediate data backup is essential. "
-                     "Submit this document to your drive manufacturer warranty department for "
-                     "replacement consideration. Do not rely on this drive as primary storage.")
-
-    rec_data = [[
-        Paragraph(f"<font color='{rec_color.hexval()}'><b>{rec_title}</b></font><br/>"
-                  f"<font color='#334155' size='8'>{rec_body}</font>",
-                  ParagraphStyle("rec", fontSize=8.5, fontName="Helvetica", leading=13))
-    ]]
+    story.append(Paragraph("Warranty & Service Recommendation", SECTION_STYLE))
+
+    # Copy the prebuilt paragraph: wrap()/split() store layout state on it
+    rec_data = [[copy.copy(REC_PARAGRAPHS[hcolor])]]
     rec_tbl = Table(rec_data, colWidths=[7.3*inch])
-    rec_tbl.setStyle(TableStyle([
-        ("BACKGROUND",   (0,0),(-1,-1), colors.HexColor("#F8FAFC")),
-        ("BOX",          (0,0),(-1,-1), 1.5, rec_color),
-        ("LEFTPADDING",  (0,0),(-1,-1), 12),
-        ("RIGHTPADDING", (0,0),(-1,-1), 12),
-        ("TOPPADDING",   (0,0),(-1,-1), 10),
-        ("BOTTOMPADDING",(0,0),(-1,-1), 10),
-    ]))
+    rec_tbl.setStyle(REC_TABLE_STYLES[hcolor])
     story.append(rec_tbl)
     story.append(Spacer(1, 14))
 
@@ -324,10 +426,8 @@ def generate_pdf_report(drive_data: dict) -> BytesIO:
         f"Generated by <b>SENTINEL-DISK Pro v2.0</b> · Report {report_id} · {generated}<br/>"
         "This document is auto-generated for drive warranty claim purposes. "
         "SMART data accuracy depends on drive firmware, OS permissions, and hardware support.",
-        ParagraphStyle("footer", fontSize=7, fontName="Helvetica", textColor=BRAND_GREY,
-                       alignment=TA_CENTER, leading=10)
+        FOOTER_STYLE
     ))
 
     doc.build(story)
-    buffer.seek(0)
-    return buffer
+    return buffer.getvalue()
@@ -0,0 +1,21 @@
+"""
+SENTINEL-DISK Pro — SMART Binary Layouts
+
+Struct formats for the raw SMART pages read straight from devices, shared by
+the Linux ioctl path (smart_collector) and the Windows DeviceIoControl path
+(smart_reader) so the two decoders can't drift apart.
+"""
+
+import struct
+
+# One ATA SMART attribute entry: id, flags, current, worst, raw (low 32 + high 16 bits), reserved
+ATA_ATTR = struct.Struct("<BHBBIHx")
+
+# The 30-entry attribute table of a 512-byte SMART READ DATA page (after the revision word)
+ATA_ATTR_COUNT = 30
+ATA_TABLE = slice(2, 2 + ATA_ATTR_COUNT * ATA_ATTR.size)
+
+# NVMe SMART / Health Information log (LID 02h): composite temperature (K) at
+# byte 1, then the low 64 bits of power cycles @112, power-on hours @128 and
+# media errors @160
+NVME_HEALTH = struct.Struct("<xH109xQ8xQ24xQ")
@@ -0,0 +1,23 @@
+"""
+SENTINEL-DISK Pro — Timestamp Helpers
+
+UTC ISO-8601 timestamps for API responses. Requests arriving within the
+same second share one formatted string instead of each building a datetime.
+"""
+
+import time
+
+# (epoch second, formatted stamp) — swapped as one tuple so threads never
+# see a second paired with another second's string
+_cached = (-1, "")
+
+
+def iso_now() -> str:
+    """Current UTC time as 'YYYY-MM-DDTHH:MM:SSZ'."""
+    global _cached
+    now = int(time.time())
+    second, stamp = _cached
+    if second != now:
+        stamp = time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime(now))
+        _cached = (now, stamp)
+    return stamp